@@ -0,0 +1 @@
+"""Benchmark suite for the converter routes; see benchmarks/run.py."""
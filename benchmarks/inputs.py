@@ -0,0 +1,117 @@
+"""
+Synthetic, seeded benchmark inputs.
+
+The same seed always produces byte-identical files, so runs on different
+releases convert exactly the same documents.
+"""
+import io
+import json
+import random
+
+import fitz
+from PIL import Image
+
+
+def make_photo(width, height, seed=0, quality=90):
+    """A photo-like JPEG: smooth gradients with a layer of sensor-style noise."""
+    rng = random.Random(seed)
+
+    gradient = Image.linear_gradient("L").resize((width, height))
+    red = gradient
+    green = gradient.rotate(90).resize((width, height))
+    blue = Image.radial_gradient("L").resize((width, height))
+    base = Image.merge("RGB", (red, green, blue))
+
+    noise = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    img = Image.blend(base, noise, 0.15)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def make_pdf(pages, images, seed=0, image_size=(1200, 900)):
+    """
+    A PDF with `pages` pages of text and `images` distinct embedded JPEGs,
+    spread round-robin over the pages.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    for page_num in range(pages):
+        page = doc.new_page()
+        words = " ".join(rng.choice(WORDS) for _ in range(400))
+        page.insert_textbox(fitz.Rect(50, 50, 545, 420), f"Page {page_num + 1}. {words}", fontsize=9)
+
+    for image_num in range(images):
+        page = doc[image_num % pages]
+        # Stack images on the lower half of the page
+        slot = image_num // pages
+        top = 430 + (slot % 3) * 130
+        page.insert_image(
+            fitz.Rect(50, top, 230, top + 120),
+            stream=make_photo(*image_size, seed=seed + image_num + 1)
+        )
+
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def make_record(rng, depth, index):
+    record = {
+        "id": index,
+        "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+        "score": round(rng.random() * 100, 3),
+        "active": rng.random() < 0.5,
+    }
+
+    node = record
+    for level in range(depth):
+        child = {
+            "key": f"k{level}",
+            "value": rng.randint(0, 10 ** 6),
+            "label": rng.choice(WORDS),
+        }
+        node[f"level{level}"] = child
+        node = child
+
+    record["tags"] = [rng.choice(WORDS) for _ in range(3)]
+    return record
+
+
+def make_json(records, depth, seed=0, ndjson=False):
+    """`records` objects nested `depth` levels deep, as a JSON array or NDJSON."""
+    rng = random.Random(seed)
+    rows = [make_record(rng, depth, i) for i in range(records)]
+
+    if ndjson:
+        return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+    # Indented like a typical export, so minifying has work to do
+    return json.dumps(rows, indent=2).encode("utf-8")
+
+
+def make_qr_payloads():
+    """Payloads from a short string up to one that needs a large QR version."""
+    return {
+        "short": "GoFormate",
+        "url": "https://example.com/some/longer/path?utm_source=benchmark&id=1234567890",
+        "text_1k": ("lorem ipsum dolor sit amet " * 40)[:1000],
+    }
+
+
+def make_qr_image(payload):
+    import qrcode
+
+    img = qrcode.make(payload)
+    buffer = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor whiskey "
+    "xray yankee zulu invoice report summary quarterly revenue margin forecast"
+).split()
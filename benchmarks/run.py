@@ -0,0 +1,555 @@
+"""
+Benchmarks every converter route through the Flask test client.
+
+    python -m benchmarks.run                       # full matrix, JSON on stdout
+    python -m benchmarks.run --quick -o new.json   # small inputs, few iterations
+    python -m benchmarks.run --compare old.json    # also print deltas vs a baseline
+
+Inputs are generated from a fixed seed (see benchmarks.inputs). Each case
+runs in its own interpreter, so peak RSS belongs to that case alone and
+lazily imported modules are paid for by the first (warm-up) request only.
+The result cache is disabled unless --with-cache is given.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from importlib import metadata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHOTO_SIZES = {
+    "small": (640, 480),
+    "medium": (1920, 1080),
+    "large": (4000, 3000),
+}
+
+CV_FIELDS = {
+    "name": "Jane Example",
+    "title": "Senior Data Engineer",
+    "profile_text": "Builds reliable data platforms and pipelines. " * 6,
+    "experiences": "Lead Engineer\nAcme Corp 2020-2024\nDesigned the ingestion platform.\n" * 4,
+    "education": "MSc Computer Science\nSome University 2016",
+    "skills": "Python\nSQL\nSpark\nKubernetes",
+    "languages": "English\nFrench",
+    "hobbies": "Climbing\nChess",
+    "phone": "+1 555 0100",
+    "email": "jane@example.com",
+    "address": "1 Example Street",
+}
+
+
+# ---------------- INPUTS AND CASES ----------------
+
+def generate_inputs(directory, args):
+    """Writes every synthetic input file and returns {name: path}."""
+    from benchmarks import inputs
+
+    files = {}
+
+    def write(name, data):
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        files[name] = path
+
+    write("document.pdf", inputs.make_pdf(args.pages, args.images, seed=args.seed))
+    write("records.json", inputs.make_json(args.records, args.depth, seed=args.seed))
+
+    for size_name in args.photo_sizes:
+        width, height = PHOTO_SIZES[size_name]
+        write(f"photo_{size_name}.jpg", inputs.make_photo(width, height, seed=args.seed))
+
+    # Candidates for /bulk-cv, all sharing the medium photo
+    with io.StringIO() as buffer:
+        writer = csv.DictWriter(buffer, fieldnames=["id", *CV_FIELDS])
+        writer.writeheader()
+        for candidate_id in range(1, args.candidates + 1):
+            writer.writerow({"id": candidate_id, **CV_FIELDS})
+        write("candidates.csv", buffer.getvalue().encode("utf-8"))
+
+    with io.BytesIO() as buffer:
+        with zipfile.ZipFile(buffer, "w") as photos:
+            photo = inputs.make_photo(*PHOTO_SIZES["medium"], seed=args.seed)
+            for candidate_id in range(1, args.candidates + 1):
+                photos.writestr(f"{candidate_id}.jpg", photo)
+        write("photos.zip", buffer.getvalue())
+
+    try:
+        write("qr.png", inputs.make_qr_image(inputs.make_qr_payloads()["url"]))
+    except ImportError:
+        pass
+
+    return files
+
+
+def build_cases(files, args):
+    from benchmarks import inputs
+
+    pdf_params = {"pages": args.pages, "images": args.images}
+    json_params = {"records": args.records, "depth": args.depth}
+    cv_photo = "photo_medium.jpg" if "photo_medium.jpg" in files else f"photo_{args.photo_sizes[0]}.jpg"
+
+    cases = [
+        {
+            "name": "cv_generate_pdf",
+            "route": "/generate-pdf",
+            "fields": CV_FIELDS,
+            "files": {"photo": files[cv_photo]},
+            "params": {"photo": cv_photo},
+        },
+        {
+            "name": "cv_bulk",
+            "route": "/bulk-cv",
+            "fields": {},
+            "files": {"records": files["candidates.csv"], "photos": files["photos.zip"]},
+            "params": {"candidates": args.candidates},
+        },
+        {
+            "name": "pdf_to_jpg_stream",
+            "route": "/pdf-jpg",
+            "fields": {"mode": "stream"},
+            "files": {"file": files["document.pdf"]},
+            "params": pdf_params,
+        },
+        {
+            "name": "pdf_to_jpg_thumbnails",
+            "route": "/pdf-jpg",
+            "fields": {"mode": "stream", "thumbnail": "1"},
+            "files": {"file": files["document.pdf"]},
+            "params": pdf_params,
+        },
+        {
+            # convert_pdf_to_jpg_and_zip
+            "name": "pdf_to_jpg_zip",
+            "route": "/pdf-jpg",
+            "fields": {"mode": "file"},
+            "files": {"file": files["document.pdf"]},
+            "params": pdf_params,
+        },
+        {
+            "name": "compress_pdf",
+            "route": "/compress",
+            "fields": {},
+            "files": {"file": files["document.pdf"]},
+            "params": pdf_params,
+        },
+        {
+            "name": "compress_json",
+            "route": "/compress",
+            "fields": {},
+            "files": {"file": files["records.json"]},
+            "params": json_params,
+        },
+        {
+            "name": "compress_json_gzip",
+            "route": "/compress",
+            "fields": {"container": "gzip"},
+            "files": {"file": files["records.json"]},
+            "params": json_params,
+        },
+        {
+            "name": "json_to_csv",
+            "route": "/json-to-csv",
+            "fields": {},
+            "files": {"file": files["records.json"]},
+            "params": json_params,
+        },
+        {
+            "name": "json_to_csv_sample",
+            "route": "/json-to-csv",
+            "fields": {"schema": "sample"},
+            "files": {"file": files["records.json"]},
+            "params": json_params,
+        },
+    ]
+
+    for size_name in args.photo_sizes:
+        photo = files[f"photo_{size_name}.jpg"]
+        params = {"width": PHOTO_SIZES[size_name][0], "height": PHOTO_SIZES[size_name][1]}
+
+        cases.append({
+            "name": f"jpg_to_pdf_{size_name}",
+            "route": "/jpgtopdf",
+            "fields": {},
+            "files": {"file": photo},
+            "params": params,
+        })
+        cases.append({
+            "name": f"jpg_to_ico_{size_name}",
+            "route": "/jpgtoico",
+            "fields": {},
+            "files": {"image": photo},
+            "params": params,
+        })
+        cases.append({
+            "name": f"jpg_to_ico_bundle_{size_name}",
+            "route": "/jpgtoico",
+            "fields": {"bundle": "1"},
+            "files": {"image": photo},
+            "params": params,
+        })
+
+    cases.append({
+        "name": "compress_images_target",
+        "route": "/compress",
+        "fields": {"target_kb": "150"},
+        "files": {"file": [files[f"photo_{size_name}.jpg"] for size_name in args.photo_sizes]},
+        "params": {"images": len(args.photo_sizes), "target_kb": 150},
+    })
+    cases.append({
+        "name": "jpg_to_pdf_batch_a4",
+        "route": "/jpgtopdf",
+        "fields": {"page_size": "a4"},
+        "files": {"file": [files[f"photo_{size_name}.jpg"] for size_name in args.photo_sizes] * 4},
+        "params": {"images": len(args.photo_sizes) * 4},
+    })
+
+    for payload_name, payload in inputs.make_qr_payloads().items():
+        cases.append({
+            "name": f"qr_generate_{payload_name}",
+            "route": "/generate",
+            "fields": {"data": payload},
+            "files": {},
+            "params": {"payload_chars": len(payload)},
+        })
+
+    if "qr.png" in files:
+        cases.append({
+            "name": "qr_scan",
+            "route": "/scan",
+            "fields": {},
+            "files": {"qr_image": files["qr.png"]},
+            "params": {},
+        })
+
+    if args.only:
+        cases = [case for case in cases if any(part in case["name"] for part in args.only)]
+
+    return cases
+
+
+# ---------------- ONE CASE (child process) ----------------
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def peak_rss_mb(pid="self"):
+    """
+    High-water RSS of one process in MB. /proc's VmHWM is per process,
+    unlike ru_maxrss, which Linux carries over from the parent across exec.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    if pid != "self":
+        return None
+
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def children_peak_rss_mb():
+    """Summed high-water RSS of live worker processes (e.g. the render pool)."""
+    import multiprocessing
+
+    peaks = [peak_rss_mb(child.pid) for child in multiprocessing.active_children()]
+    peaks = [peak for peak in peaks if peak is not None]
+    return round(sum(peaks), 1) if peaks else 0.0
+
+
+def run_case(case, iterations, warmup, with_cache, workdir):
+    """Times `iterations` requests of one case and returns its result record."""
+    from goformate import create_app
+
+    app = create_app({
+        "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+        "OUTPUT_FOLDER": os.path.join(workdir, "converted"),
+        "CACHE_FOLDER": os.path.join(workdir, "cache"),
+        "JANITOR_MANIFEST": os.path.join(workdir, "janitor.sqlite3"),
+        "JOBS_DB": os.path.join(workdir, "jobs.sqlite3"),
+        # Every entry is evicted as soon as it is stored, so nothing hits
+        "CACHE_MAX_ITEMS": 1000 if with_cache else 0,
+    })
+    client = app.test_client()
+
+    # A field maps to one path, or to a list of paths for multi-file uploads
+    uploads = {}
+    for field, paths in case["files"].items():
+        uploads[field] = []
+        for path in paths if isinstance(paths, list) else [paths]:
+            with open(path, "rb") as f:
+                uploads[field].append((os.path.basename(path), f.read()))
+    input_bytes = sum(len(data) for files in uploads.values() for _, data in files)
+
+    def request_once():
+        data = dict(case["fields"])
+        for field, files in uploads.items():
+            data[field] = [(io.BytesIO(content), filename) for filename, content in files]
+
+        started = time.perf_counter()
+        response = client.post(case["route"], data=data, content_type="multipart/form-data")
+        # Drain streamed bodies inside the timing
+        body = response.get_data()
+        response.close()
+        elapsed = time.perf_counter() - started
+
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}: {body[:200]!r}")
+
+        return elapsed, len(body)
+
+    first_request, output_bytes = request_once()
+    for _ in range(warmup - 1):
+        request_once()
+
+    rss_before = peak_rss_mb()
+
+    latencies = []
+    for _ in range(iterations):
+        elapsed, output_bytes = request_once()
+        latencies.append(elapsed)
+
+    total = sum(latencies)
+    latencies.sort()
+
+    return {
+        "case": case["name"],
+        "route": case["route"],
+        "params": case["params"],
+        "iterations": iterations,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "throughput_per_s": round(iterations / total, 3),
+        "input_mb_per_s": round(input_bytes * iterations / total / 1e6, 3),
+        "latency_ms": {
+            "min": round(latencies[0] * 1000, 2),
+            "mean": round(total / iterations * 1000, 2),
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+        # Includes lazy imports of the converter's dependencies
+        "first_request_ms": round(first_request * 1000, 2),
+        "rss_after_warmup_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_children_rss_mb": children_peak_rss_mb(),
+    }
+
+
+def child_main(spec):
+    """Entry point of the per-case interpreter: prints one JSON result."""
+    sys.path.insert(0, ROOT)
+
+    # The app logs with print(); keep stdout for the result
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            result = run_case(
+                spec["case"], spec["iterations"], spec["warmup"],
+                spec["with_cache"], spec["workdir"]
+            )
+        except Exception as e:
+            result = {"case": spec["case"]["name"], "route": spec["case"]["route"], "error": str(e)}
+
+    print(json.dumps(result))
+
+
+def run_in_subprocess(case, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{case['name']}-")
+    spec = {
+        "case": case,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "with_cache": args.with_cache,
+        "workdir": workdir,
+    }
+
+    # Converters that write to tempfile.gettempdir() clean up inside workdir too
+    env = dict(os.environ, TMPDIR=workdir, TEMP=workdir, TMP=workdir)
+
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--child", json.dumps(spec)],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=None if args.verbose else subprocess.DEVNULL,
+            text=True
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"case": case["name"], "route": case["route"], "error": f"benchmark process exited with {proc.returncode}"}
+
+    return json.loads(lines[-1])
+
+
+# ---------------- REPORT ----------------
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    versions = {}
+    for package in ("Flask", "PyMuPDF", "pillow", "pdf2docx", "reportlab", "qrcode"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def compare(baseline, current, out):
+    """Prints p50/p99/throughput/RSS of each case against a baseline run."""
+    old_results = {result["case"]: result for result in baseline["results"]}
+
+    def delta(old, new):
+        if old is None or new is None or not old:
+            return "      n/a"
+        return f"{(new - old) / old * 100:+8.1f}%"
+
+    out.write(f"{'case':<26}{'p50 ms':>10}{'Δ':>10}{'p99 ms':>10}{'Δ':>10}{'req/s':>9}{'Δ':>10}{'RSS MB':>9}{'Δ':>10}\n")
+
+    for result in current["results"]:
+        old = old_results.get(result["case"])
+
+        if "error" in result or old is None or "error" in old:
+            status = result.get("error") or "not in baseline"
+            out.write(f"{result['case']:<26}  {status}\n")
+            continue
+
+        out.write(
+            f"{result['case']:<26}"
+            f"{result['latency_ms']['p50']:>10.1f}{delta(old['latency_ms']['p50'], result['latency_ms']['p50']):>10}"
+            f"{result['latency_ms']['p99']:>10.1f}{delta(old['latency_ms']['p99'], result['latency_ms']['p99']):>10}"
+            f"{result['throughput_per_s']:>9.2f}{delta(old['throughput_per_s'], result['throughput_per_s']):>10}"
+            f"{result['peak_rss_mb'] or 0:>9.1f}{delta(old['peak_rss_mb'], result['peak_rss_mb']):>10}\n"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small inputs and 3 iterations")
+    parser.add_argument("--iterations", type=int, help="timed requests per case (default 10, quick 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests per case first")
+    parser.add_argument("--pages", type=int, help="pages of the synthetic PDF (default 20, quick 4)")
+    parser.add_argument("--images", type=int, help="images embedded in the PDF (default 10, quick 2)")
+    parser.add_argument("--records", type=int, help="records in the JSON input (default 20000, quick 2000)")
+    parser.add_argument("--depth", type=int, help="nesting depth of each JSON record (default 3, quick 2)")
+    parser.add_argument("--candidates", type=int, help="records in the /bulk-cv input (default 200, quick 20)")
+    parser.add_argument("--photo-sizes", nargs="+", choices=sorted(PHOTO_SIZES), help="photo resolutions to test")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="run cases whose name contains any of these")
+    parser.add_argument("--with-cache", action="store_true", help="leave the result cache on (measures hits)")
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON report to print deltas against")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the app's own output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child_main(json.loads(args.child))
+        return
+
+    quick = args.quick
+    args.iterations = args.iterations or (3 if quick else 10)
+    args.warmup = max(1, args.warmup)
+    args.pages = args.pages or (4 if quick else 20)
+    args.images = args.images if args.images is not None else (2 if quick else 10)
+    args.records = args.records or (2000 if quick else 20000)
+    args.depth = args.depth if args.depth is not None else (2 if quick else 3)
+    args.candidates = args.candidates or (20 if quick else 200)
+    args.photo_sizes = args.photo_sizes or (["small", "medium"] if quick else ["small", "medium", "large"])
+
+    sys.path.insert(0, ROOT)
+    input_dir = tempfile.mkdtemp(prefix="bench-inputs-")
+
+    try:
+        # Keep stdout for the report (PyMuPDF prints notices on import)
+        with contextlib.redirect_stdout(sys.stderr):
+            files = generate_inputs(input_dir, args)
+        cases = build_cases(files, args)
+
+        if args.list:
+            for case in cases:
+                print(case["name"])
+            return
+
+        results = []
+        for case in cases:
+            print(f"Benchmarking {case['name']} ...", file=sys.stderr)
+            result = run_in_subprocess(case, args)
+            if "error" in result:
+                print(f"  failed: {result['error']}", file=sys.stderr)
+            results.append(result)
+    finally:
+        shutil.rmtree(input_dir, ignore_errors=True)
+
+    report = {
+        "environment": environment(),
+        "settings": {
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "with_cache": args.with_cache,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report, sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import importlib
+import os
+import time
+
+from flask import Flask
+
+from . import common, lazy
+from .config import Config, ROOT
+
+
+def create_app(config=None):
+    """
+    Builds the Flask app with one blueprint per converter.
+
+    Heavy converter dependencies (PyMuPDF, pdf2docx, ...) are only
+    imported on first use, unless the converter is listed in WARM_UP.
+    """
+    started = time.perf_counter()
+
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(ROOT, 'Templates'),
+        static_folder=os.path.join(ROOT, 'static')
+    )
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+
+    common.init_app(app)
+
+    for name in app.config['CONVERTERS']:
+        bp_started = time.perf_counter()
+        module = importlib.import_module(f".{name}", __name__)
+        lazy.BLUEPRINT_SECONDS.setdefault(name, time.perf_counter() - bp_started)
+        app.register_blueprint(module.bp)
+
+    if app.config['WARM_UP']:
+        failed = lazy.warm_up(app.config['WARM_UP'])
+        for module_name, error in failed.items():
+            print(f"Warm-up: could not import {module_name}: {error}")
+
+    app.extensions['startup_seconds'] = time.perf_counter() - started
+    return app
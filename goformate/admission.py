@@ -0,0 +1,201 @@
+"""
+Admission control per converter class.
+
+Conversion routes are grouped into classes (heavy, medium, light), each
+with its own limit of concurrent requests and a bounded wait queue. A
+burst of heavy uploads can then only take its own slots, and cheap
+requests like /generate keep being served. Requests beyond the queue
+limit, or that waited longer than the class timeout, get an immediate
+503 with a Retry-After estimated from the recent service time.
+
+A slot is held until the response body is closed, so streamed
+conversions count for as long as they run.
+"""
+import math
+import threading
+import time
+
+from flask import jsonify, request
+from werkzeug.wsgi import ClosingIterator
+
+# Holds (class, start time) of an admitted request in the WSGI environ
+SLOT_KEY = 'goformate.admission'
+
+# Weight of the newest request in the moving average of service time
+SERVICE_TIME_WEIGHT = 0.2
+
+MAX_RETRY_AFTER = 300
+
+
+class AdmissionClass:
+    """Concurrency limit and bounded wait queue shared by the routes of one class."""
+
+    def __init__(self, name, concurrency, queue, timeout):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # Moving average of how long an admitted request holds its slot
+        self.service_seconds = 1.0
+
+    def acquire(self):
+        """
+        Takes a slot, waiting up to `timeout` seconds for one. Returns
+        False straight away when the queue is full, or once the wait
+        times out.
+        """
+        with self._cond:
+            # Newcomers do not overtake requests that are already waiting
+            if self.active < self.concurrency and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return True
+
+            if self.waiting >= self.queue:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: self.active < self.concurrency, self.timeout):
+                    self.timed_out += 1
+                    return False
+            finally:
+                self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self, seconds):
+        with self._cond:
+            self.active -= 1
+            self.service_seconds += (seconds - self.service_seconds) * SERVICE_TIME_WEIGHT
+            self._cond.notify()
+
+    def retry_after(self):
+        """Seconds until the queue ahead of a new request has probably drained."""
+        with self._cond:
+            backlog = self.active + self.waiting
+            seconds = self.service_seconds * backlog / self.concurrency
+
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(seconds)))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "queue_limit": self.queue,
+                "timeout": self.timeout,
+                "active": self.active,
+                "queued": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "service_seconds": round(self.service_seconds, 4),
+            }
+
+
+class AdmissionControl:
+    """
+    Admits requests of the routes listed in `routes` ("METHOD /rule" ->
+    class name) through the limits in `classes` (class name -> dict of
+    concurrency, queue and timeout). Other routes are not limited.
+    """
+
+    def __init__(self, classes, routes):
+        self.classes = {
+            name: AdmissionClass(name, limits['concurrency'], limits['queue'], limits['timeout'])
+            for name, limits in classes.items()
+        }
+
+        self.routes = {}
+        for route, name in routes.items():
+            if name not in self.classes:
+                raise Exception(f"Unknown admission class '{name}' for {route}")
+            self.routes[route] = self.classes[name]
+
+    def init_app(self, app, metrics=None):
+        control = self
+
+        @app.before_request
+        def _admit():
+            rule = request.url_rule
+            if rule is None:
+                return None
+
+            admission_class = control.routes.get(f"{request.method} {rule.rule}")
+            if admission_class is None:
+                return None
+
+            if not admission_class.acquire():
+                retry_after = admission_class.retry_after()
+                response = jsonify({
+                    "error": "Server busy, try again later",
+                    "class": admission_class.name,
+                    "retry_after": retry_after,
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+
+            request.environ[SLOT_KEY] = (admission_class, time.perf_counter())
+            return None
+
+        app.wsgi_app = self.wsgi_middleware(app.wsgi_app)
+
+        if metrics is not None:
+            metrics.add_collector(
+                'goformate_admission_active', 'gauge',
+                'Admitted requests holding a slot, per converter class.',
+                lambda: [({"class": name}, c.active) for name, c in self.classes.items()]
+            )
+            metrics.add_collector(
+                'goformate_admission_queued', 'gauge',
+                'Requests waiting for a slot, per converter class.',
+                lambda: [({"class": name}, c.waiting) for name, c in self.classes.items()]
+            )
+            metrics.add_collector(
+                'goformate_admission_rejected_total', 'counter',
+                'Requests answered with 503 because the queue was full or the wait timed out.',
+                lambda: [({"class": name}, c.rejected + c.timed_out) for name, c in self.classes.items()]
+            )
+
+    def wsgi_middleware(self, wsgi_app):
+        def release(environ):
+            slot = environ.pop(SLOT_KEY, None)
+            if slot is not None:
+                admission_class, started = slot
+                admission_class.release(time.perf_counter() - started)
+
+        def middleware(environ, start_response):
+            try:
+                body = wsgi_app(environ, start_response)
+            except Exception:
+                release(environ)
+                raise
+
+            if SLOT_KEY not in environ:
+                return body
+
+            # The server's own file wrapper must reach it unwrapped; the
+            # conversion is over once only a file is left to send
+            file_wrapper = environ.get('wsgi.file_wrapper')
+            if isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+                release(environ)
+                return body
+
+            return ClosingIterator(body, lambda: release(environ))
+
+        return middleware
+
+    def stats(self):
+        """Limits, current queue depth and counters per class."""
+        return {name: admission_class.stats() for name, admission_class in self.classes.items()}
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Another filesystem, or no hardlinks there
+        shutil.copyfile(src, dst)
+
+
+class ConversionCache:
+    """
+    Content-addressed cache for conversion results.
+
+    Artifacts are stored as files named by their key inside `directory`.
+    A small SQLite index next to them tracks size and last use, so several
+    worker processes can share the cache safely. The cache is bounded by
+    total size and item count; the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, max_items=1000):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.db_path = os.path.join(self.directory, "index.sqlite3")
+
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER, last_used REAL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "name TEXT PRIMARY KEY, value INTEGER)"
+            )
+
+    def _connect(self):
+        # One connection per operation: safe across threads and processes
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _count(self, db, name):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    # ---------------- KEYS ----------------
+
+    @staticmethod
+    def make_key(content_hash, converter, **params):
+        """Builds a cache key from the upload hash, converter name and its parameters."""
+        raw = json.dumps(
+            [content_hash, converter, params],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def key_for_upload(self, file, converter, **params):
+        """
+        Hashes an uploaded file (werkzeug FileStorage) without saving it,
+        then rewinds the stream so it can still be read or saved.
+        """
+        digest = hashlib.sha256()
+        stream = file.stream
+
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+        stream.seek(0)
+
+        return self.make_key(digest.hexdigest(), converter, **params)
+
+    # ---------------- LOOKUP ----------------
+
+    def link(self, key, dest_path):
+        """
+        Puts the cached artifact at `dest_path` and returns True, or returns
+        False on a miss. `dest_path` is a hardlink (a copy across
+        filesystems), made while the index is locked, so it stays readable
+        even if another process evicts the entry right after.
+        """
+        path = self._path(key)
+
+        with self._connect() as db:
+            # Holds the index write lock, which _evict needs, until the link exists
+            updated = db.execute(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                (time.time(), key)
+            ).rowcount
+
+            if updated:
+                try:
+                    _link_or_copy(path, dest_path)
+                except FileNotFoundError:
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    updated = 0
+
+            self._count(db, "hits" if updated else "misses")
+
+        return bool(updated)
+
+    # ---------------- STORE ----------------
+
+    def pending_path(self, key):
+        """Temporary path to write a new artifact to before `commit`."""
+        return self._path(f"{key}.{uuid.uuid4().hex}.tmp")
+
+    def commit(self, key, tmp_path):
+        """Atomically publishes a file written to `pending_path` under `key`."""
+        path = self._path(key)
+        os.replace(tmp_path, path)
+
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, last_used) VALUES (?, ?, ?)",
+                (key, os.path.getsize(path), time.time())
+            )
+            self._evict(db)
+
+        return path
+
+    def discard(self, tmp_path):
+        """Drops a pending artifact that was not completed."""
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+    def put_file(self, key, src_path):
+        """Copies an existing result file into the cache."""
+        tmp_path = self.pending_path(key)
+        shutil.copyfile(src_path, tmp_path)
+        return self.commit(key, tmp_path)
+
+    def put_bytes(self, key, data):
+        """Stores an in-memory result in the cache."""
+        tmp_path = self.pending_path(key)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return self.commit(key, tmp_path)
+
+    def _evict(self, db):
+        total_size, total_items = db.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+        ).fetchone()
+
+        if total_size <= self.max_bytes and total_items <= self.max_items:
+            return
+
+        rows = db.execute(
+            "SELECT key, size FROM entries ORDER BY last_used ASC"
+        ).fetchall()
+
+        for key, size in rows:
+            if total_size <= self.max_bytes and total_items <= self.max_items:
+                break
+
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total_size -= size
+            total_items -= 1
+            self._count(db, "evictions")
+
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                # Still being served (Windows); it is unreferenced now anyway
+                pass
+
+    # ---------------- STATS ----------------
+
+    def stats(self):
+        """Hit/miss counters and current usage."""
+        with self._connect() as db:
+            counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+            total_size, total_items = db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+            ).fetchone()
+
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "items": total_items,
+            "bytes": total_size,
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,444 @@
+"""Helpers and process-wide services shared by the converter blueprints."""
+import io
+import mimetypes
+import mmap
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from flask import Request, current_app, request, jsonify, send_file, url_for
+
+from .admission import AdmissionControl
+from .cache import ConversionCache
+from .janitor import Janitor
+from .jobs import JobManager, JobQueueFull
+from .metrics import Metrics
+
+# Define allowed extensions
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'pdf', 'docx', 'ppt', 'pptx', 'ico', 'png', 'csv', 'xlsx', 'xls', 'json', 'ndjson', 'jsonl'}
+
+# Set up by init_app()
+janitor = None
+result_cache = None
+job_manager = None
+metrics = None
+admission = None
+upload_folder = None
+output_folder = None
+upload_spool_max_bytes = None
+
+
+def init_app(app):
+    """
+    Creates the folders and the janitor, result cache, job manager,
+    request metrics and admission control for `app`, and makes it spool
+    uploads in memory (SpooledRequest).
+    """
+    global janitor, result_cache, job_manager, metrics, admission, upload_folder, output_folder, upload_spool_max_bytes
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    output_folder = app.config['OUTPUT_FOLDER']
+    os.makedirs(upload_folder, exist_ok=True)
+    os.makedirs(output_folder, exist_ok=True)
+
+    upload_spool_max_bytes = app.config['UPLOAD_SPOOL_MAX_BYTES']
+    app.request_class = SpooledRequest
+
+    # Flask's send_file emits X-Sendfile instead of the body
+    app.config['USE_X_SENDFILE'] = app.config['FILE_DELIVERY'] == 'x-sendfile'
+
+    # One background thread handles every scheduled deletion
+    janitor = Janitor(app.config['JANITOR_MANIFEST'])
+
+    result_cache = ConversionCache(
+        app.config['CACHE_FOLDER'],
+        max_bytes=app.config['CACHE_MAX_BYTES'],
+        max_items=app.config['CACHE_MAX_ITEMS']
+    )
+
+    job_manager = JobManager(
+        app.config['JOBS_DB'],
+        limits=app.config['JOB_WORKERS'],
+        result_ttl=app.config['JOB_RESULT_TTL'],
+        on_expire=delete_file_later,
+        app=app,
+        max_queued=app.config['JOB_MAX_QUEUED']
+    )
+
+    # Per-route latency, bytes and errors, served at /metrics
+    metrics = Metrics()
+    metrics.init_app(app)
+
+    # Concurrency limits and bounded queues per converter class
+    admission = AdmissionControl(app.config['ADMISSION_CLASSES'], app.config['ADMISSION_ROUTES'])
+    admission.init_app(app, metrics)
+
+
+def allowed_file(filename):
+    """Checks if the file extension is allowed."""
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def upload_path(filename):
+    return os.path.join(upload_folder, filename)
+
+
+def output_path(filename):
+    return os.path.join(output_folder, filename)
+
+
+# ---------------- UPLOAD STORAGE ----------------
+
+class SpooledRequest(Request):
+    """
+    Keeps each uploaded file in memory up to UPLOAD_SPOOL_MAX_BYTES and
+    spills larger ones to an anonymous temporary file in UPLOAD_FOLDER.
+    Converters read the upload from there (upload_buffer, open_text or
+    file.stream) instead of saving it and opening the copy again.
+    Parsing the body is timed as the `receive` stage.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=upload_spool_max_bytes, mode='rb+', dir=upload_folder)
+
+    def _load_form_data(self):
+        # Bodyless requests (e.g. GET /generate) are not worth a sample
+        if 'form' in self.__dict__ or not self.content_length:
+            return super()._load_form_data()
+
+        with metrics.stage('receive'):
+            super()._load_form_data()
+
+
+def save_upload(file, path):
+    """Saves an upload to `path`, timed as the `save` stage."""
+    with metrics.stage('save'):
+        file.save(path)
+
+
+def upload_buffer(file):
+    """
+    The bytes of an upload without copying it to disk: the in-memory
+    data, or a read-only memory map once the upload spilled to a file.
+    Suitable for fitz.open(stream=...) and other buffer readers.
+    """
+    stream = file.stream
+    # SpooledTemporaryFile holds a BytesIO until it rolls over
+    inner = getattr(stream, '_file', stream)
+
+    if isinstance(inner, io.BytesIO):
+        return inner.getvalue()
+
+    stream.flush()
+    if os.fstat(inner.fileno()).st_size == 0:
+        return b""
+
+    return memoryview(mmap.mmap(inner.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+@contextmanager
+def open_text(source, encoding='utf-8'):
+    """
+    Reads a path or a binary upload stream as text from the start. The
+    upload stream stays open afterwards, so it can be read again.
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding=encoding) as f:
+            yield f
+        return
+
+    source.seek(0)
+    text = io.TextIOWrapper(source, encoding=encoding)
+    try:
+        yield text
+    finally:
+        text.detach()
+
+
+def source_size(source):
+    """Size in bytes of a path or a seekable binary stream."""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+# ---------------- FILE DELIVERY ----------------
+
+def send_output(path, download_name, mimetype=None, delete=False):
+    """
+    Sends a result file as an attachment, according to FILE_DELIVERY:
+
+    'direct'      Flask streams the file (Range requests are answered
+                  with 206). With `delete` it is unlinked as soon as
+                  send_file has opened it, so the open handle keeps
+                  serving it and the space is freed when the response
+                  closes.
+    'x-sendfile'  Apache/lighttpd read the file themselves (X-Sendfile).
+    'x-accel'     nginx serves it from the internal location that
+                  X_ACCEL_LOCATIONS maps its folder to (X-Accel-Redirect).
+
+    The proxy reads the file after this response is finished, and
+    handles Range itself, so offloaded files with `delete` are removed
+    by the janitor after OFFLOADED_FILE_TTL instead.
+    """
+    config = current_app.config
+    mode = config['FILE_DELIVERY']
+    path = os.path.abspath(path)
+
+    if mode == 'direct':
+        response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name)
+        if delete:
+            # call_on_close is skipped for direct-passthrough file responses
+            remove_output(path)
+        return response
+
+    if delete:
+        delete_file_later(path, config['OFFLOADED_FILE_TTL'])
+
+    if mode == 'x-sendfile':
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name)
+
+    if mode != 'x-accel':
+        raise Exception(f"Unknown FILE_DELIVERY '{mode}'")
+
+    for folder_key, location in config['X_ACCEL_LOCATIONS'].items():
+        folder = os.path.abspath(config[folder_key])
+        if os.path.dirname(path) == folder:
+            break
+    else:
+        raise Exception(f"No X_ACCEL_LOCATIONS entry covers {path}")
+
+    response = current_app.response_class(
+        mimetype=mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    )
+    response.headers['X-Accel-Redirect'] = location.rstrip('/') + '/' + os.path.basename(path)
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response
+
+
+def remove_with_response(response, paths):
+    """
+    Removes the files a streamed response reads from (e.g. the saved
+    upload) once the response is closed. The body generator cannot do it
+    alone: a generator closed before its first chunk, say because the
+    client went away, never runs its `finally`. The janitor also gets the
+    paths after STREAMED_UPLOAD_TTL, in case the response is never closed.
+    """
+    paths = [path for path in paths if path]
+
+    for path in paths:
+        delete_file_later(path, current_app.config['STREAMED_UPLOAD_TTL'])
+
+    def cleanup():
+        for path in paths:
+            remove_output(path)
+
+    response.call_on_close(cleanup)
+    return response
+
+
+def remove_output(path):
+    """Deletes a file now, or through the janitor if it is still locked (Windows)."""
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        # Still open elsewhere (Windows), retry later
+        delete_file_later(path)
+
+# ---------------- DELETE TEMP FILE ----------------
+
+def delete_file_later(filepath, delay=120):
+    """
+    Deletes a file after a delay.
+
+    delay=120 means 2 minutes
+    """
+    janitor.schedule(filepath, delay)
+
+
+# ---------------- PROCESS POOL ----------------
+
+PDF_RENDER_WORKERS = os.cpu_count() or 1
+
+_render_pool = None
+
+
+def get_render_pool():
+    """Returns the shared process pool used for CPU-heavy PDF page work."""
+    global _render_pool
+
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS)
+
+    return _render_pool
+
+
+_worker_docs = {}
+
+
+def open_worker_document(pdf_path):
+    """
+    Opens a PDF inside a pool worker. The document is kept per process so
+    consecutive pages of the same PDF do not reopen the file; only the
+    most recent one stays open. It is keyed by path and mtime, so a file
+    replaced at the same path is opened again, and one that was deleted
+    is closed (see release_worker_documents).
+    """
+    import fitz
+
+    try:
+        stamp = os.stat(pdf_path).st_mtime_ns
+    except FileNotFoundError:
+        close_worker_documents(pdf_path)
+        raise
+
+    cached = _worker_docs.get(pdf_path)
+
+    if cached is None or cached[0] != stamp:
+        close_worker_documents()
+        cached = _worker_docs[pdf_path] = (stamp, fitz.open(pdf_path))
+
+    return cached[1]
+
+
+def close_worker_documents(pdf_path=None):
+    """Pool worker: closes the kept document of `pdf_path`, or any kept document."""
+    for path in list(_worker_docs):
+        if pdf_path is None or path == pdf_path:
+            _worker_docs.pop(path)[1].close()
+
+
+def release_worker_documents(pdf_path):
+    """
+    Asks the pool workers to close `pdf_path` once a job is done with it,
+    so the file's disk space is freed when it is deleted. One task per
+    worker is queued without waiting; a worker that does not get one
+    drops the document on its next task.
+    """
+    pool = get_render_pool()
+
+    for _ in range(PDF_RENDER_WORKERS):
+        pool.submit(close_worker_documents, pdf_path)
+
+
+class ZipStream:
+    """
+    Write-only file object for zipfile.ZipFile.
+    It has no tell()/seek(), so zipfile writes data descriptors and the
+    collected bytes can be handed to the client after every entry.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parse_page_ranges(spec, page_count):
+    """
+    Turns a page range string like "1-3,5,8-" (1-based, as users see it)
+    into a sorted list of 0-based page indexes. An empty spec selects
+    every page. Raises ValueError for malformed or out-of-range input.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+
+    indexes = set()
+
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        if '-' in part:
+            first, last = part.split('-', 1)
+            first = int(first) if first.strip() else 1
+            last = int(last) if last.strip() else page_count
+        else:
+            first = last = int(part)
+
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(f"Invalid page range: {part}")
+
+        indexes.update(range(first - 1, last))
+
+    if not indexes:
+        raise ValueError("No pages selected")
+
+    return sorted(indexes)
+
+
+# ---------------- ASYNC JOBS ----------------
+
+def wants_async():
+    """True if the client asked for job-submission mode."""
+    return request.values.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def submit_job(converter, func, *args, download_name, mimetype=None, cleanup=()):
+    """
+    Queues a conversion and answers with the job id and polling URLs, or
+    with 503 and Retry-After when the converter's job queue is full.
+    """
+    try:
+        job_id = job_manager.submit(
+            converter, func, *args,
+            download_name=download_name,
+            mimetype=mimetype,
+            cleanup=cleanup
+        )
+    except JobQueueFull as e:
+        for path in cleanup:
+            remove_output(path)
+
+        response = jsonify({
+            "error": str(e),
+            "converter": converter,
+            "retry_after": e.retry_after,
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for('core.job_status', job_id=job_id),
+        "download_url": url_for('core.job_download', job_id=job_id),
+    }), 202
+
+
+def from_cache(cache_key, dest_path):
+    """Puts a cached result at `dest_path`; returns False on a miss."""
+    return bool(cache_key) and result_cache.link(cache_key, dest_path)
+
+
+def send_cached(cache_key, download_name, mimetype=None):
+    """
+    Sends a cached result like send_output, or returns None on a miss.
+    The response serves a private link to the cached file, so evicting
+    the entry meanwhile does not break the download.
+    """
+    path = output_path(f"{uuid.uuid4()}_{os.path.basename(download_name)}")
+
+    if not from_cache(cache_key, path):
+        return None
+
+    return send_output(path, download_name=download_name, mimetype=mimetype, delete=True)
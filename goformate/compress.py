@@ -0,0 +1,799 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+import tempfile
+import time
+import uuid
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify, request, render_template as render, send_file
+from werkzeug.utils import secure_filename
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('compress', __name__)
+
+fitz = lazy_import('fitz', 'compress')
+Image = lazy_import('PIL.Image', 'compress')
+ImageOps = lazy_import('PIL.ImageOps', 'compress')
+PILfeatures = lazy_import('PIL.features', 'compress')
+
+
+# ---------------- PDF COMPRESSION ----------------
+
+PDF_IMAGE_MAX_SIZE = (1200, 1200)
+PDF_IMAGE_QUALITY = 40
+
+
+def recompress_pdf_image(img_bytes, max_size=PDF_IMAGE_MAX_SIZE, quality=PDF_IMAGE_QUALITY):
+    """
+    Pool worker: decodes an extracted PDF image, downsizes it and
+    re-encodes it as JPEG. Returns the JPEG bytes and the new size.
+    """
+    image = Image.open(io.BytesIO(img_bytes))
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    image.thumbnail(max_size)
+
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue(), image.size
+
+
+def compress_pdf(file_path, stats=None):
+    """
+    Recompresses the images of a PDF, given as a path or as a buffer
+    (common.upload_buffer).
+
+    Every image xref is processed once, however many pages share it,
+    and decoding/re-encoding runs in the process pool, a bounded window
+    of images at a time. A new stream only
+    replaces the original when it is smaller. If `stats` is a dict it is
+    filled with per-document numbers (bytes saved, time spent, ...).
+    """
+    started = time.perf_counter()
+    min_bytes = current_app.config['PDF_IMAGE_MIN_BYTES']
+
+    if isinstance(file_path, str):
+        doc = fitz.open(file_path)
+    else:
+        doc = fitz.open(stream=file_path)
+
+    xrefs = sorted({img[0] for page in doc for img in page.get_images(full=True)})
+
+    counts = {"images": len(xrefs), "recompressed": 0, "kept": 0, "skipped": 0, "failed": 0}
+    image_bytes_saved = 0
+
+    candidates = []
+
+    for xref in xrefs:
+        # Stencil masks are 1-bit and not worth (or safe) to turn into JPEG
+        if doc.xref_get_key(xref, "ImageMask")[1] == "true":
+            counts["skipped"] += 1
+            continue
+
+        original_size = len(doc.xref_stream_raw(xref) or b"")
+
+        if original_size < min_bytes:
+            counts["skipped"] += 1
+            continue
+
+        candidates.append((xref, original_size))
+
+    # Images are extracted only as the window has room, so a bounded
+    # number of them is held in memory and in the pool's queue
+    pool = common.get_render_pool()
+    window = common.PDF_RENDER_WORKERS * 2
+    pending = deque()
+    next_index = 0
+
+    while next_index < len(candidates) or pending:
+        while next_index < len(candidates) and len(pending) < window:
+            xref, original_size = candidates[next_index]
+            base = doc.extract_image(xref)
+            pending.append((xref, original_size, pool.submit(recompress_pdf_image, base["image"])))
+            next_index += 1
+
+        xref, original_size, future = pending.popleft()
+
+        try:
+            data, (width, height) = future.result()
+        except Exception as e:
+            print(f"Image recompression error (xref {xref}): {e}")
+            counts["failed"] += 1
+            continue
+
+        if len(data) >= original_size:
+            counts["kept"] += 1
+            continue
+
+        # Store the JPEG as-is and describe it, so viewers decode it correctly
+        doc.update_stream(xref, data, compress=0)
+        doc.xref_set_key(xref, "Filter", "/DCTDecode")
+        doc.xref_set_key(xref, "DecodeParms", "null")
+        doc.xref_set_key(xref, "Decode", "null")
+        doc.xref_set_key(xref, "ColorSpace", "/DeviceRGB")
+        doc.xref_set_key(xref, "BitsPerComponent", "8")
+        doc.xref_set_key(xref, "Width", str(width))
+        doc.xref_set_key(xref, "Height", str(height))
+
+        counts["recompressed"] += 1
+        image_bytes_saved += original_size - len(data)
+
+    out = io.BytesIO()
+    doc.save(out, garbage=4, deflate=True, clean=True)
+    doc.close()
+    out.seek(0)
+
+    if stats is not None:
+        original_bytes = os.path.getsize(file_path) if isinstance(file_path, str) else len(file_path)
+        compressed_bytes = out.getbuffer().nbytes
+
+        stats.update(counts)
+        stats.update({
+            "image_bytes_saved": image_bytes_saved,
+            "original_bytes": original_bytes,
+            "compressed_bytes": compressed_bytes,
+            "bytes_saved": original_bytes - compressed_bytes,
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+
+    return out
+
+
+# ---------------- JSON COMPRESSION ----------------
+
+# A complete JSON string; everything between two of them is outside strings
+JSON_STRING = re.compile(rb'("(?:[^"\\]++|\\.)*+")', re.S)
+
+JSON_WHITESPACE = b' \t\r\n'
+
+# Bytes a JSON text can start with
+JSON_START = frozenset(b'{["-0123456789tfn')
+
+JSON_READ_BYTES = 4 * 1024 * 1024
+
+# Deletes everything but brackets, to check the nesting outside strings
+JSON_NOT_BRACKETS = bytes(b for b in range(256) if b not in b'[]{}')
+JSON_CLOSERS = {ord('['): ord(']'), ord('{'): ord('}')}
+
+# container -> (file extension, mimetype)
+JSON_CONTAINERS = {
+    'gzip': ('gz', 'application/gzip'),
+    'bz2': ('bz2', 'application/x-bzip2'),
+    'xz': ('xz', 'application/x-xz'),
+}
+
+
+def reduce_brackets(brackets):
+    """
+    Removes every matched [] and {} pair from a sequence of brackets.
+    What is left of a valid prefix are the brackets still open.
+    """
+    # Each pass removes one level of nesting
+    for _ in range(32):
+        reduced = brackets.replace(b'[]', b'').replace(b'{}', b'')
+        if reduced == brackets:
+            return brackets
+        brackets = reduced
+
+    # Deeply nested: finish with a stack
+    stack = bytearray()
+    for b in brackets:
+        if stack and JSON_CLOSERS.get(stack[-1]) == b:
+            stack.pop()
+        else:
+            stack.append(b)
+    return bytes(stack)
+
+
+def minify_json_chunks(source, read_bytes=JSON_READ_BYTES):
+    """
+    Yields the JSON of a path or binary stream with all whitespace
+    outside strings removed, without parsing it into objects. Memory
+    stays at a few read buffers (plus the longest string).
+
+    The input is only checked structurally: its first byte, matching
+    brackets, closed strings and nothing after the top-level array or
+    object. Raises ValueError otherwise; chunks already yielded are
+    then incomplete.
+    """
+    f = open(source, 'rb') if isinstance(source, str) else source
+    if f is source:
+        f.seek(0)
+
+    carry = b""
+    started = False
+    # Closer of the top-level array or object, and the brackets open inside it
+    closer = None
+    open_brackets = b""
+    closed = False
+
+    try:
+        while True:
+            block = f.read(read_bytes)
+            if not block:
+                break
+
+            # Alternating outside/string parts; a quote left in the last
+            # outside part opens a string that continues in the next block
+            parts = JSON_STRING.split(carry + block)
+            tail = parts[-1]
+            quote = tail.find(b'"')
+            if quote >= 0:
+                carry = tail[quote:]
+                parts[-1] = tail[:quote]
+            else:
+                carry = b""
+
+            parts[::2] = [part.translate(None, JSON_WHITESPACE) for part in parts[::2]]
+            data = b"".join(parts)
+
+            if not data:
+                continue
+
+            if closed:
+                raise ValueError("Unexpected data after the end of the JSON")
+
+            brackets = b"".join(parts[::2]).translate(None, JSON_NOT_BRACKETS)
+
+            if not started:
+                if data[0] not in JSON_START:
+                    raise ValueError("Input is not JSON")
+                started = True
+
+                closer = JSON_CLOSERS.get(data[0])
+                if closer is not None:
+                    # The top-level opener is tracked by `closer` alone
+                    brackets = brackets[1:]
+
+            if closer is None:
+                if brackets:
+                    raise ValueError("Unexpected bracket after a JSON value")
+            else:
+                reduced = reduce_brackets(open_brackets + brackets)
+
+                if reduced.translate(None, b'[{'):
+                    # A closer is left: valid only if it is the top-level one, as
+                    # the last byte, with everything before it balanced
+                    if data[-1] != closer or reduce_brackets(open_brackets + brackets[:-1]):
+                        raise ValueError("Mismatched brackets")
+                    reduced = b""
+                    closed = True
+
+                open_brackets = reduced
+
+            yield data
+
+        if carry:
+            raise ValueError("Unterminated string at the end of the JSON")
+        if not started:
+            raise ValueError("Empty JSON file")
+        if closer is not None and not closed:
+            raise ValueError("Unexpected end of the JSON: unclosed brackets")
+
+    finally:
+        if f is not source:
+            f.close()
+
+
+def compress_block(container, data):
+    """One complete gzip, bz2 or xz stream. Concatenated streams are valid files."""
+    if container == 'gzip':
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if container == 'bz2':
+        return bz2.compress(data, 9)
+    return lzma.compress(data, preset=6)
+
+
+def _stream_compressor(container):
+    if container == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if container == 'bz2':
+        return bz2.BZ2Compressor(9)
+    return lzma.LZMACompressor(preset=6)
+
+
+def _parallel_blocks(chunks, container, block_bytes, workers):
+    """
+    Compresses `block_bytes` pieces of the minified JSON on a thread pool
+    (zlib, bz2 and lzma release the GIL) and yields them in order. Only
+    a window of blocks is in flight at a time.
+    """
+    window = workers * 2
+    pending = deque()
+    buffer = []
+    buffered = 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compress-json") as pool:
+        def submit():
+            pending.append(pool.submit(compress_block, container, b"".join(buffer)))
+            buffer.clear()
+
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+
+            if buffered >= block_bytes:
+                submit()
+                buffered = 0
+
+                while len(pending) >= window:
+                    yield pending.popleft().result()
+
+        if buffer:
+            submit()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def compress_json(source, output_path, container=None):
+    """
+    Writes the minified JSON of a path or binary stream to `output_path`,
+    optionally inside a gzip, bz2 or xz container. Inputs of at least
+    JSON_COMPRESS_PARALLEL_MIN_BYTES are compressed in parallel blocks.
+    Returns original/compressed sizes and the compression ratio.
+    """
+    config = current_app.config
+    original_bytes = common.source_size(source)
+    compressed_bytes = 0
+
+    chunks = minify_json_chunks(source)
+
+    if container is None:
+        output = chunks
+    elif original_bytes >= config['JSON_COMPRESS_PARALLEL_MIN_BYTES'] and common.PDF_RENDER_WORKERS > 1:
+        output = _parallel_blocks(chunks, container, config['JSON_COMPRESS_BLOCK_BYTES'], common.PDF_RENDER_WORKERS)
+    else:
+        compressor = _stream_compressor(container)
+
+        def output_stream():
+            for chunk in chunks:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+
+        output = output_stream()
+
+    with open(output_path, 'wb') as f:
+        for data in output:
+            f.write(data)
+            compressed_bytes += len(data)
+
+    return {
+        "original_bytes": original_bytes,
+        "compressed_bytes": compressed_bytes,
+        "bytes_saved": original_bytes - compressed_bytes,
+        # e.g. 4.2 means the output is 4.2 times smaller
+        "ratio": round(original_bytes / compressed_bytes, 3) if compressed_bytes else 0,
+    }
+
+
+# ---------------- IMAGE COMPRESSION ----------------
+
+IMAGE_FORMATS = {
+    'jpg': 'JPEG',
+    'jpeg': 'JPEG',
+    'png': 'PNG',
+    'webp': 'WEBP',
+}
+
+IMAGE_MIMETYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+}
+
+# Encoder quality range searched in target-size mode (JPEG, WebP); for
+# PNG the searched setting is the palette size
+IMAGE_MIN_QUALITY = 10
+IMAGE_MAX_QUALITY = 95
+
+
+def image_options(values):
+    """
+    Reads quality (1-100), target_kb and keep_metadata from request
+    values. Raises ValueError for anything out of range.
+    """
+    try:
+        quality = int(values.get('quality') or 75)
+        target_kb = float(values.get('target_kb') or 0)
+    except (TypeError, ValueError):
+        raise ValueError("quality and target_kb must be numbers")
+
+    if not 1 <= quality <= 100:
+        raise ValueError("quality must be between 1 and 100")
+    if target_kb < 0:
+        raise ValueError("target_kb must be positive")
+
+    keep_metadata = str(values.get('keep_metadata', '')).lower() in ('1', 'on', 'true', 'yes')
+
+    return quality, int(target_kb * 1024) or None, keep_metadata
+
+
+def _encode_image(img, fmt, setting, save_args, final=True):
+    """
+    One encode at a given quality (JPEG, WebP) or palette size (PNG).
+    Non-final PNG encodes skip the slow zlib search; it only makes the
+    file slightly smaller.
+    """
+    buf = io.BytesIO()
+
+    if fmt == 'PNG':
+        if setting < 256 or img.mode not in ('P', 'L', '1'):
+            img = quantize_image(img, setting)
+        if final:
+            img.save(buf, format='PNG', optimize=True, **save_args)
+        else:
+            img.save(buf, format='PNG', compress_level=6, **save_args)
+    elif fmt == 'JPEG':
+        img.save(buf, format='JPEG', quality=setting, optimize=True, progressive=True, **save_args)
+    else:
+        img.save(buf, format='WEBP', quality=setting, method=4, **save_args)
+
+    return buf.getvalue()
+
+
+def quantize_image(img, colors):
+    """Reduces an image to a palette of at most `colors` entries, keeping alpha."""
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+    # Octree is ~30x faster than median cut on photos and handles alpha
+    if PILfeatures.check('libimagequant'):
+        method = Image.Quantize.LIBIMAGEQUANT
+    else:
+        method = Image.Quantize.FASTOCTREE
+
+    return img.quantize(colors=colors, method=method, dither=Image.Dither.FLOYDSTEINBERG)
+
+
+def compress_image(data, ext, quality=75, target_bytes=None, keep_metadata=False):
+    """
+    Pool worker: recompresses one JPEG, PNG or WebP image in its own
+    format and returns (bytes, report).
+
+    The image is decoded once. In quality mode it is encoded once; JPEG
+    and WebP use `quality` and PNG is quantized to a palette of
+    quality% of 256 colors. With `target_bytes`, the highest quality (or
+    palette size) that fits is found by binary search. Unless
+    `keep_metadata`, EXIF/XMP are dropped (after applying the EXIF
+    rotation); ICC profiles are always kept so colors do not shift. The
+    original is returned when re-encoding does not make it smaller.
+    """
+    fmt = IMAGE_FORMATS[ext]
+    img = Image.open(io.BytesIO(data))
+    img.load()
+
+    save_args = {}
+    if img.info.get('icc_profile'):
+        save_args['icc_profile'] = img.info['icc_profile']
+
+    if keep_metadata:
+        for key in ('exif', 'xmp'):
+            if img.info.get(key):
+                save_args[key] = img.info[key]
+    else:
+        img = ImageOps.exif_transpose(img)
+
+    if fmt == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+        img = img.convert('RGB')
+    elif fmt == 'WEBP' and img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+    if fmt == 'PNG':
+        low, high = 2, 256
+        setting = max(2, round(quality / 100 * 256))
+    else:
+        low, high = IMAGE_MIN_QUALITY, IMAGE_MAX_QUALITY
+        setting = quality
+
+    encodes = 0
+
+    def encode(value, final=True):
+        nonlocal encodes
+        encodes += 1
+        return _encode_image(img, fmt, value, save_args, final)
+
+    if target_bytes:
+        # Largest setting whose output fits; size grows with the setting
+        output = None
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = encode(mid, final=False)
+
+            if len(candidate) <= target_bytes:
+                output, setting = candidate, mid
+                low = mid + 1
+            else:
+                high = mid - 1
+
+        if output is None:
+            # Even the lowest setting is too large; return the smallest
+            setting = 2 if fmt == 'PNG' else IMAGE_MIN_QUALITY
+            output = encode(setting)
+        elif fmt == 'PNG':
+            output = encode(setting)
+    else:
+        output = encode(setting)
+
+    kept_original = len(output) >= len(data)
+    if kept_original:
+        output = data
+
+    report = {
+        "format": fmt.lower(),
+        "width": img.width,
+        "height": img.height,
+        "original_bytes": len(data),
+        "compressed_bytes": len(output),
+        "bytes_saved": len(data) - len(output),
+        "kept_original": kept_original,
+        "encodes": encodes,
+    }
+    report["colors" if fmt == 'PNG' else "quality"] = setting
+
+    if target_bytes:
+        report["target_bytes"] = target_bytes
+        report["target_met"] = len(output) <= target_bytes
+
+    return output, report
+
+
+def _run_compress_image(job):
+    index, data, ext, options = job
+    try:
+        output, report = compress_image(data, ext, *options)
+        return index, output, report, None
+    except Exception as e:
+        return index, None, None, str(e)
+
+
+def unique_name(filename, used_names):
+    """
+    `filename`, or "<n>_<filename>" with the first free n, so names stay
+    unique inside an archive. The chosen name is added to `used_names`.
+    """
+    name = filename
+    n = 1
+    while name in used_names:
+        name = f"{n}_{filename}"
+        n += 1
+
+    used_names.add(name)
+    return name
+
+
+def compress_images(uploads, options):
+    """
+    Compresses several (filename, ext, data) uploads on the process pool,
+    a bounded window at a time, and returns the ZIP buffer (with a
+    report.json of per-image sizes) and the report.
+    """
+    pool = common.get_render_pool()
+    window = common.PDF_RENDER_WORKERS * 2
+    pending = deque()
+    next_index = 0
+
+    report = []
+    used_names = set()
+    buffer = io.BytesIO()
+
+    # JPEG, PNG and WebP data is already compressed
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+        while next_index < len(uploads) or pending:
+            while next_index < len(uploads) and len(pending) < window:
+                _, ext, data = uploads[next_index]
+                pending.append(pool.submit(_run_compress_image, (next_index, data, ext, options)))
+                next_index += 1
+
+            index, output, image_report, error = pending.popleft().result()
+            filename = uploads[index][0]
+
+            entry = {"file": filename}
+            if error:
+                print(f"Image compression error ({filename}): {error}")
+                entry["error"] = error
+            else:
+                name = unique_name(filename, used_names)
+
+                zipf.writestr(name, output)
+                entry.update(image_report)
+                entry["file"] = name
+
+            report.append(entry)
+
+        zipf.writestr("report.json", json.dumps(report, indent=2), zipfile.ZIP_DEFLATED)
+
+    buffer.seek(0)
+    return buffer, report
+
+
+def compress_image_upload(files):
+    """Single image: the compressed file; several: a ZIP with report.json."""
+    try:
+        options = image_options(request.values)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_images = current_app.config['COMPRESS_MAX_IMAGES']
+    if len(files) > max_images:
+        return jsonify({"error": f"At most {max_images} images per request"}), 400
+
+    uploads = []
+    for file in files:
+        filename = secure_filename(file.filename) or "image"
+        uploads.append((filename, filename.rsplit(".", 1)[-1].lower(), file.read()))
+
+    if len(uploads) > 1:
+        with common.metrics.stage('convert'):
+            buffer, report = compress_images(uploads, options)
+
+        response = send_file(buffer, mimetype='application/zip', as_attachment=True,
+                             download_name='compressed_images.zip')
+        response.headers['X-Original-Bytes'] = str(sum(e.get("original_bytes", 0) for e in report))
+        response.headers['X-Compressed-Bytes'] = str(sum(e.get("compressed_bytes", 0) for e in report))
+        return response
+
+    filename, ext, data = uploads[0]
+    try:
+        with common.metrics.stage('convert'):
+            output, report = compress_image(data, ext, *options)
+    except Exception as e:
+        print(f"Image compression error ({filename}): {e}")
+        return jsonify({"error": f"Could not compress image: {e}"}), 400
+
+    response = send_file(io.BytesIO(output), mimetype=IMAGE_MIMETYPES[IMAGE_FORMATS[ext]],
+                         as_attachment=True, download_name=f"compressed.{ext}")
+    response.headers['X-Original-Bytes'] = str(report["original_bytes"])
+    response.headers['X-Compressed-Bytes'] = str(report["compressed_bytes"])
+    response.headers['X-Bytes-Saved'] = str(report["bytes_saved"])
+    response.headers['X-Image-Report'] = json.dumps(report)
+    return response
+
+
+# ---------------- ROUTE ----------------
+@bp.route("/compress", methods=["POST"])
+def compress():
+    files = [f for f in request.files.getlist("file") if f.filename]
+
+    if not files:
+        return "No file uploaded", 400
+
+    exts = [secure_filename(f.filename).split(".")[-1].lower() for f in files]
+
+    # JPEG, PNG and WebP; several at once are compressed in parallel
+    if all(ext in IMAGE_FORMATS for ext in exts):
+        return compress_image_upload(files)
+
+    if len(files) > 1:
+        return "Only images can be compressed several at a time", 400
+
+    file = files[0]
+    filename = secure_filename(file.filename)
+    ext = exts[0]
+
+    if ext not in ("pdf", "json"):
+        return "Unsupported file type"
+
+    download_name = f"compressed.{ext}"
+    mimetype = None
+    container = None
+
+    if ext == "json":
+        # Optionally wrapped in a gzip, bz2 or xz container
+        container = request.values.get("container", "").lower() or None
+
+        if container is not None:
+            if container not in JSON_CONTAINERS:
+                return "container must be gzip, bz2 or xz", 400
+
+            download_name += f".{JSON_CONTAINERS[container][0]}"
+            mimetype = JSON_CONTAINERS[container][1]
+
+        cache_key = common.result_cache.key_for_upload(file, "compress_json", container=container)
+    else:
+        cache_key = common.result_cache.key_for_upload(file, f"compress_{ext}")
+
+    if common.wants_async():
+        temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}_{filename}")
+        common.save_upload(file, temp_path)
+
+        return common.submit_job(
+            'compress',
+            run_compress, temp_path, ext, cache_key, container,
+            download_name=download_name,
+            mimetype=mimetype,
+            cleanup=[temp_path]
+        )
+
+    output_path = common.output_path(f"{uuid.uuid4()}_{download_name}")
+
+    if common.from_cache(cache_key, output_path):
+        cached_bytes = os.path.getsize(output_path)
+        response = common.send_output(output_path, download_name=download_name, mimetype=mimetype, delete=True)
+        if ext == "json":
+            set_ratio_headers(response, common.source_size(file.stream), cached_bytes)
+        return response
+
+    if ext == "json":
+        # Minified (and compressed) to disk, straight from the spooled upload
+        try:
+            with common.metrics.stage('convert'):
+                stats = compress_json(file.stream, output_path, container)
+        except ValueError as e:
+            common.remove_output(output_path)
+            return f"Invalid JSON: {e}", 400
+
+        common.result_cache.put_file(cache_key, output_path)
+
+        response = common.send_output(output_path, download_name=download_name, mimetype=mimetype, delete=True)
+        set_ratio_headers(response, stats["original_bytes"], stats["compressed_bytes"])
+        return response
+
+    # Compress straight from the spooled upload
+    stats = {}
+
+    with common.metrics.stage('convert'):
+        output = compress_pdf(common.upload_buffer(file), stats)
+
+    common.result_cache.put_bytes(cache_key, output.getvalue())
+    response = send_file(output, as_attachment=True, download_name=download_name)
+
+    if stats:
+        response.headers['X-Bytes-Saved'] = str(stats["bytes_saved"])
+        response.headers['X-Compress-Seconds'] = str(stats["seconds"])
+        response.headers['X-Images-Recompressed'] = str(stats["recompressed"])
+
+    return response
+
+
+def set_ratio_headers(response, original_bytes, compressed_bytes):
+    response.headers['X-Original-Bytes'] = str(original_bytes)
+    response.headers['X-Compressed-Bytes'] = str(compressed_bytes)
+    response.headers['X-Bytes-Saved'] = str(original_bytes - compressed_bytes)
+    if compressed_bytes:
+        response.headers['X-Compression-Ratio'] = str(round(original_bytes / compressed_bytes, 3))
+
+
+@bp.route('/compress-pdf')
+def CompressPDF():
+    return render("compress_pdf.html")
+
+@bp.route('/compress-json')
+def CompressJSON():
+    return render("compress_json.html")
+
+@bp.route('/compress-img')
+def CompressImage():
+    return render("compress_img.html")
+
+
+# ---------------- ASYNC JOBS ----------------
+
+def run_compress(file_path, ext, cache_key=None, container=None):
+    output_path = common.output_path(f"{uuid.uuid4()}.{ext}")
+
+    if not common.from_cache(cache_key, output_path):
+        if ext == "json":
+            compress_json(file_path, output_path, container)
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(compress_pdf(file_path).getvalue())
+
+        if cache_key:
+            common.result_cache.put_file(cache_key, output_path)
+
+    return output_path
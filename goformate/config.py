@@ -0,0 +1,172 @@
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Config:
+    SECRET_KEY = 'super_secret_key_for_flash'
+
+    # Set a safe directory for uploads
+    UPLOAD_FOLDER = os.path.join(ROOT, 'uploads')
+    OUTPUT_FOLDER = os.path.join(ROOT, 'converted')
+
+    # Uploaded files up to this size stay in memory and are handed to the
+    # converters as buffers; larger ones spill to a temp file.
+    UPLOAD_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+    # How result files reach the client: 'direct' (streamed by Flask and
+    # deleted when the response closes), 'x-sendfile' (Apache, lighttpd) or
+    # 'x-accel' (nginx). With 'x-accel' each folder must be exposed as an
+    # internal location, e.g.
+    #   location /_goformate/converted/ { internal; alias /srv/goformate/converted/; }
+    FILE_DELIVERY = os.environ.get('GOFORMATE_FILE_DELIVERY', 'direct')
+    X_ACCEL_LOCATIONS = {
+        'OUTPUT_FOLDER': '/_goformate/converted/',
+        'UPLOAD_FOLDER': '/_goformate/uploads/',
+    }
+    # The proxy reads offloaded files after the response, so they are only
+    # removed this many seconds later
+    OFFLOADED_FILE_TTL = 600
+    # Uploads read by a streamed response are removed when it closes; the
+    # janitor removes them after this many seconds if it never does
+    STREAMED_UPLOAD_TTL = 6 * 3600
+
+    # Conversion results keyed by a hash of the upload bytes plus the
+    # converter name and its parameters, shared by all worker processes.
+    CACHE_FOLDER = os.path.join(ROOT, 'cache')
+    CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+    CACHE_MAX_ITEMS = 1000
+
+    # Scheduled deletions survive restarts through this manifest
+    JANITOR_MANIFEST = os.path.join(ROOT, 'janitor.sqlite3')
+
+    # POSTing a long-running converter with async=1 queues a job
+    JOBS_DB = os.path.join(ROOT, 'jobs.sqlite3')
+    JOB_WORKERS = {
+        'pdf_to_docx': 2,
+        'pdf_to_jpg': 2,
+        'compress': 4,
+        'excel_to_pdf': 1,
+        'docx_to_pdf': 1,
+    }
+    JOB_RESULT_TTL = 3600  # seconds a finished result stays available
+    # Jobs a converter accepts beyond its running ones, per process; more
+    # submissions get 503 with Retry-After
+    JOB_MAX_QUEUED = 20
+
+    # Admission control: each class admits `concurrency` requests at a
+    # time and lets up to `queue` more wait for `timeout` seconds; the
+    # rest get 503 with Retry-After. Routes are "METHOD /rule" -> class,
+    # unlisted routes are not limited.
+    ADMISSION_CLASSES = {
+        'heavy': {'concurrency': 2, 'queue': 4, 'timeout': 30},
+        'medium': {'concurrency': 4, 'queue': 16, 'timeout': 15},
+        'light': {'concurrency': 32, 'queue': 128, 'timeout': 5},
+    }
+    ADMISSION_ROUTES = {
+        # pdf2docx and Office
+        'POST /pdf-to-docx': 'heavy',
+        'POST /ppt-to-pdf': 'heavy',
+        'POST /excel-to-pdf': 'heavy',
+        'POST /docx-to-pdf': 'heavy',
+        'POST /bulk-cv': 'heavy',
+        # PDF rendering, compression and other per-file work
+        'POST /pdf-jpg': 'medium',
+        'POST /compress': 'medium',
+        'POST /jpgtopdf': 'medium',
+        'POST /json-to-csv': 'medium',
+        'POST /scan': 'medium',
+        'POST /generate-batch': 'medium',
+        'POST /generate-pdf': 'medium',
+        # QR codes and icons
+        'GET /generate': 'light',
+        'POST /generate': 'light',
+        'POST /jpgtoico': 'light',
+    }
+
+    PDF_JPG_MODE = 'stream'  # 'stream' or 'file' (legacy ZIP on disk)
+
+    # /pdf-jpg rendering: default and highest `dpi`, the longest side of
+    # `thumbnail` previews, and the largest raster rendered in one piece.
+    # Bigger pages are rendered in strips: PNG pages are joined again,
+    # JPEG and WebP pages come out as <page>_part_N images.
+    PDF_JPG_DPI = 144
+    PDF_JPG_MAX_DPI = 600
+    PDF_JPG_THUMBNAIL_SIZE = 256
+    PDF_JPG_MAX_PIXMAP_BYTES = 64 * 1024 * 1024
+
+    # Documents with at least this many selected pages are split into page
+    # batches that are parsed on separate cores (parallel=auto).
+    PDF_DOCX_PARALLEL_MIN_PAGES = 20
+
+    # Inputs at least this large are converted with the streaming path.
+    JSON_CSV_STREAM_MIN_BYTES = 64 * 1024 * 1024
+    # Largest record the streaming path decodes; a malformed or bigger one
+    # is rejected instead of reading the rest of the input into memory
+    JSON_CSV_MAX_RECORD_CHARS = 16 * 1024 * 1024
+    # Records whose keys make up the columns with schema=sample.
+    JSON_CSV_SCHEMA_SAMPLE = 1000
+
+    # Images whose stream is smaller than this are left untouched.
+    PDF_IMAGE_MIN_BYTES = 10 * 1024
+
+    # /compress JSON: inputs at least this large are compressed (gzip, bz2,
+    # xz) in blocks of JSON_COMPRESS_BLOCK_BYTES on several cores
+    JSON_COMPRESS_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+    JSON_COMPRESS_BLOCK_BYTES = 8 * 1024 * 1024
+
+    # Images per /compress request; several are compressed on the process pool
+    COMPRESS_MAX_IMAGES = 100
+
+    # /jpgtopdf: uploads at least this large in total are streamed back
+    # page by page instead of being assembled in memory
+    JPG_PDF_STREAM_MIN_BYTES = 32 * 1024 * 1024
+    JPG_PDF_MAX_IMAGES = 500
+
+    # /bulk-cv limits
+    CV_BULK_MAX_RECORDS = 10000
+    CV_BULK_MAX_PHOTO_BYTES = 20 * 1024 * 1024
+
+    # /generate-batch: payload limit, and batches at least this large are
+    # rendered on the process pool
+    QR_BATCH_MAX = 5000
+    QR_BATCH_PARALLEL_MIN = 50
+
+    # /scan: PDF pages are rasterized at this resolution, on the process pool
+    QR_SCAN_PDF_DPI = 150
+    QR_SCAN_MAX_PAGES = 100
+
+    # 'msoffice' (COM, Windows), 'soffice' (warm LibreOffice pool) or 'auto'
+    OFFICE_BACKEND = os.environ.get('GOFORMATE_OFFICE_BACKEND', 'auto')
+    SOFFICE_PATH = os.environ.get('SOFFICE_PATH', 'soffice')
+    OFFICE_POOL_SIZE = 2  # soffice processes kept warm per app process
+    OFFICE_MAX_JOBS_PER_PROCESS = 50  # recycle a soffice process after this many jobs
+    OFFICE_JOB_TIMEOUT = 120  # seconds before a conversion is killed
+    OFFICE_ACQUIRE_TIMEOUT = 30  # seconds a request waits for a free worker
+    OFFICE_STARTUP_TIMEOUT = 30
+    OFFICE_PROFILE_FOLDER = os.path.join(ROOT, 'office-profiles')
+    # Without LibreOffice's `uno` module soffice cannot be kept warm and
+    # every job starts a cold process; set this to refuse to run that way
+    OFFICE_REQUIRE_WARM_POOL = os.environ.get('GOFORMATE_OFFICE_REQUIRE_WARM', '') == '1'
+
+    # One blueprint per converter, registered in this order
+    CONVERTERS = [
+        'core',
+        'cv',
+        'jpg_pdf',
+        'pdf_jpg',
+        'pdf_docx',
+        'ico',
+        'office',
+        'json_csv',
+        'qr',
+        'compress',
+    ]
+
+    # Converters whose heavy dependencies are imported at startup instead
+    # of on first use, e.g. GOFORMATE_WARM_UP=pdf_jpg,compress or =all
+    WARM_UP = [
+        name.strip()
+        for name in os.environ.get('GOFORMATE_WARM_UP', '').split(',')
+        if name.strip()
+    ]
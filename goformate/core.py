@@ -0,0 +1,99 @@
+import os
+
+from flask import Blueprint, Response, current_app, render_template as render, jsonify, url_for
+
+from . import common, lazy
+
+bp = Blueprint('core', __name__)
+
+
+@bp.route('/')
+def home():
+    # Placeholder to serve the main HTML file
+    return render("index.html")
+
+
+@bp.route('/cache-stats')
+def cache_stats():
+    """Hit/miss counters and usage of the conversion result cache."""
+    return jsonify(common.result_cache.stats())
+
+
+@bp.route('/janitor-stats')
+def janitor_stats():
+    """Pending scheduled deletions of the file janitor."""
+    return jsonify(common.janitor.stats())
+
+
+@bp.route('/startup-report')
+def startup_report():
+    """App build time and the import cost of each converter so far."""
+    return jsonify({
+        "startup_seconds": round(current_app.extensions['startup_seconds'], 4),
+        "converters": lazy.report(),
+    })
+
+
+@bp.route('/admission-stats')
+def admission_stats():
+    """Limits, active and queued requests per converter class."""
+    return jsonify(common.admission.stats())
+
+
+@bp.route('/metrics')
+def metrics():
+    """Per-route latency histograms, byte and error counters (Prometheus text format)."""
+    return Response(
+        common.metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# ---------------- ASYNC JOBS ----------------
+
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = common.job_manager.get(job_id)
+
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    payload = {
+        "job_id": job_id,
+        "converter": job["converter"],
+        "status": job["status"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "expires": job["expires"],
+    }
+
+    if job["status"] == "failed":
+        payload["error"] = job["error"]
+    elif job["status"] == "done":
+        payload["download_url"] = url_for('core.job_download', job_id=job_id)
+
+    return jsonify(payload)
+
+
+@bp.route('/jobs/<job_id>/download')
+def job_download(job_id):
+    job = common.job_manager.get(job_id)
+
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    if job["status"] != "done" or not os.path.exists(job["result_path"]):
+        return jsonify({"error": "Result not ready", "status": job["status"]}), 409
+
+    return common.send_output(
+        job["result_path"],
+        download_name=job["download_name"],
+        mimetype=job["mimetype"]
+    )
+
+
+@bp.route('/jobs')
+def job_queues():
+    """Queued and running jobs per converter."""
+    return jsonify(common.job_manager.queue_depths())
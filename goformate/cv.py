@@ -0,0 +1,541 @@
+import csv
+import io
+import json
+import os
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from io import BytesIO
+
+from flask import Blueprint, Response, current_app, jsonify, request, render_template as render, send_file
+from werkzeug.utils import secure_filename
+
+from . import common, text_layout
+from .lazy import lazy_import
+
+bp = Blueprint('cv', __name__)
+
+canvas = lazy_import('reportlab.pdfgen.canvas', 'cv')
+pagesizes = lazy_import('reportlab.lib.pagesizes', 'cv')
+colors = lazy_import('reportlab.lib.colors', 'cv')
+utils = lazy_import('reportlab.lib.utils', 'cv')
+Image = lazy_import('PIL.Image', 'cv')
+
+
+# JPEG quality of the embedded profile photo
+PHOTO_QUALITY = 90
+
+
+def make_circular_image(file_stream, size_px):
+    """
+    Prepares the profile photo: a centre-cropped square of `size_px`,
+    returned as a JPEG ImageReader. ReportLab embeds JPEGs as they are, so
+    the PDF carries a small DCT stream instead of a raw RGBA image; the
+    circle itself is drawn by draw_circular_image().
+    """
+    try:
+        img = Image.open(file_stream)
+
+        # Let the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding;
+        # the result still covers size_px on its shorter side.
+        if img.format == "JPEG":
+            img.draft("RGB", (size_px, size_px))
+
+        if img.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency onto the white page background
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        # crop to square and resize in one pass; reducing_gap first shrinks
+        # large images by an integer factor before the LANCZOS filter
+        min_side = min(img.size)
+        left = (img.width - min_side) // 2
+        top = (img.height - min_side) // 2
+        img = img.resize(
+            (size_px, size_px), Image.LANCZOS,
+            box=(left, top, left + min_side, top + min_side),
+            reducing_gap=3.0
+        )
+
+        b = BytesIO()
+        img.save(b, format="JPEG", quality=PHOTO_QUALITY)
+        b.seek(0)
+        return utils.ImageReader(b)
+    except Exception:
+        return None
+
+
+def draw_circular_image(canvas_obj, image_reader, x, y, size):
+    """Draws the photo clipped to a circle, with a white ring on top."""
+    radius = size / 2.0
+    cx, cy = x + radius, y + radius
+
+    canvas_obj.saveState()
+    clip = canvas_obj.beginPath()
+    clip.circle(cx, cy, radius)
+    canvas_obj.clipPath(clip, stroke=0, fill=0)
+    canvas_obj.drawImage(image_reader, x, y, width=size, height=size)
+    canvas_obj.restoreState()
+
+    # optional white border
+    canvas_obj.saveState()
+    canvas_obj.setStrokeColor(colors.white)
+    canvas_obj.setLineWidth(3)
+    canvas_obj.circle(cx, cy, radius - 1.5, stroke=1, fill=0)
+    canvas_obj.restoreState()
+
+@bp.route('/form')
+def form():
+    # Placeholder to serve the form HTML file
+    return render("form.html")
+
+# Form fields of a resume and their defaults
+CV_FIELDS = {
+    "name": "Your Name",
+    "title": "Job Title",
+    "profile_text": "A brief professional summary...",
+    "experiences": "",
+    "education": "",
+    "skills": "",
+    "languages": "",
+    "hobbies": "",
+    "phone": "",
+    "email": "",
+    "address": "",
+}
+
+
+@bp.route('/generate-pdf', methods=['POST'])
+def generate_pdf():
+    # Collect fields
+    fields = {key: request.form.get(key, default) for key, default in CV_FIELDS.items()}
+
+    # Profile image processing
+    profile_file = request.files.get("photo")
+    image_reader = None
+    if profile_file and profile_file.filename:
+        with common.metrics.stage('decode'):
+            image_reader = make_circular_image(profile_file.stream, 120)
+
+    with common.metrics.stage('convert'):
+        buffer = BytesIO(render_cv(fields, image_reader))
+
+    return send_file(buffer, as_attachment=True,
+                     download_name=f"{fields['name'].replace(' ', '_')}_Resume.pdf",
+                     mimetype="application/pdf")
+
+
+def render_cv(fields, image_reader=None):
+    """
+    Lays out one resume from CV_FIELDS-style `fields` and returns the PDF
+    bytes. `image_reader` is the photo from make_circular_image(), if any.
+    """
+    name = fields["name"]
+    title = fields["title"]
+    profile = fields["profile_text"]
+    experiences = fields["experiences"]
+    education = fields["education"]
+    skills = fields["skills"]
+    languages = fields["languages"]
+    hobbies = fields["hobbies"]
+    phone = fields["phone"]
+    email = fields["email"]
+    address = fields["address"]
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=pagesizes.A4)
+    width, height = pagesizes.A4
+
+    # Colors and layout constants
+    blue = colors.HexColor("#2C3E50")  # Dark professional blue
+    light_gray = colors.HexColor("#F5F7FA")
+    black = colors.black
+    left_col_w = 190
+    margin = 40
+
+    # --- Top Section Layout (Name, Title, Image) ---
+
+    img_size = 120
+    img_x = margin
+    # Define top content start Y coordinate (40 pts from top margin)
+    y_start = height - margin
+    img_y = y_start - img_size - 10
+
+    name_x = img_x + img_size + 20
+    name_y = img_y + img_size - 35 # Align slightly below top of image
+    name_w = width - margin - name_x
+    # Long names and titles shrink to fit instead of running off the page
+    name_size = text_layout.fit_font_size(name, "Helvetica-Bold", 32, name_w, 12)
+    title_size = text_layout.fit_font_size(title, "Helvetica", 16, name_w, 9)
+
+    # New Y position for subsequent main content blocks (below the image area)
+    content_y_start = img_y - 30
+    # Continuation pages start below their running header
+    continued_top = height - margin - 10
+    bottom = margin + 10
+
+    layout = text_layout.PageLayout()
+
+    # --- Left Column (Sidebar) ---
+    left = text_layout.Column(
+        layout, margin + 10, left_col_w - margin - 10,
+        content_y_start - 10, bottom, continued_top
+    )
+    leading = 16 # Increased vertical spacing in left column
+
+    # CONTACT block (left)
+    left.heading("CONTACT", "Helvetica-Bold", 12, leading, blue, keep=leading)
+    if phone: left.paragraphs(phone, "Helvetica", 10, leading, black)
+    if email: left.paragraphs(email, "Helvetica", 10, leading, black)
+    if address:
+        left.space(4)
+        left.paragraphs(address, "Helvetica", 9, 14, black)
+
+    left.space(15)
+
+    # SKILLS, LANGUAGES and HOBBIES blocks
+    for heading, items in (("SKILLS", skills), ("LANGUAGES", languages), ("HOBBIES", hobbies)):
+        left.heading(heading, "Helvetica-Bold", 12, leading, blue, keep=leading)
+        for item in [i.strip() for i in items.split(",") if i.strip()]:
+            left.bullet(item, "Helvetica", 10, leading, black, indent=6)
+        left.space(10)
+
+    # --- Right Column Main Content ---
+    right_x = left_col_w + 30
+    right = text_layout.Column(
+        layout, right_x, width - right_x - margin,
+        content_y_start - 10, bottom, continued_top
+    )
+    leading_r = 16 # Increased vertical spacing in right column
+
+    # PROFILE (right) - Aligned with the start of the left column content
+    right.heading("PROFILE", "Helvetica-Bold", 14, leading_r, blue, keep=14)
+    right.paragraphs(profile, "Helvetica", 10, 14, black)
+    right.space(15)
+
+    # WORK EXPERIENCE
+    right.heading("WORK EXPERIENCE", "Helvetica-Bold", 14, leading_r, blue, keep=14 + 12)
+
+    # Parse experiences
+    exp_blocks = []
+    raw_blocks = [b.strip() for b in experiences.split("\n\n") if b.strip()]
+    for b in raw_blocks:
+        lines = [l for l in b.split("\n") if l.strip()]
+        if not lines: continue
+        title_line = lines[0]
+        company_dates = lines[1] if len(lines) > 1 else ""
+        bullets = lines[2:] if len(lines) > 2 else []
+        exp_blocks.append((title_line, company_dates, bullets))
+
+    for (job, company_dates, bullets) in exp_blocks:
+        # Keep the job title with its company line
+        right.ensure(14 + 12)
+        right.paragraphs(job, "Helvetica-Bold", 11, 14, black)
+
+        # Company / dates
+        if company_dates:
+            right.paragraphs(company_dates, "Helvetica", 9, 12, black)
+            right.space(-1)
+
+        # bullets
+        for bt in bullets:
+            right.bullet(bt, "Helvetica", 10, 14, black, indent=8)
+
+        right.space(18) # Increased vertical spacing between experience blocks
+
+    # EDUCATION
+    right.heading("EDUCATION", "Helvetica-Bold", 14, leading_r, blue, keep=14)
+
+    for line in [l for l in education.split("\n") if l.strip()]:
+        # Each education line may be "Degree - Institution (dates)"
+        right.paragraphs(line, "Helvetica", 10, 14, black)
+        right.space(6)
+
+    # --- Draw ---
+
+    def decorate(c, page):
+        if page == 0:
+            # 1. Image placement (top-left)
+            if image_reader:
+                draw_circular_image(c, image_reader, img_x, img_y, img_size)
+
+            # 2. Name and Title (next to image)
+            c.setFillColor(blue) # Use dark blue for the name
+            c.setFont("Helvetica-Bold", name_size)
+            c.drawString(name_x, name_y, name)
+            c.setFont("Helvetica", title_size)
+            c.drawString(name_x, name_y - 30, title)
+
+            sidebar_top = content_y_start
+        else:
+            # Add a small header/title on continuation pages
+            c.setFillColor(blue)
+            c.setFont("Helvetica-Bold", 14)
+            c.drawString(margin, height - 30, f"{name} - Continuation")
+
+            sidebar_top = height - margin
+
+        # Sidebar background on every page the left column reaches
+        if page <= left.page:
+            c.setFillColor(light_gray)
+            c.rect(margin, margin, left_col_w - margin + 10, sidebar_top - margin, fill=1, stroke=0)
+
+    layout.draw(c, decorate)
+
+    # Finish and save
+    c.showPage()
+    c.save()
+
+    return buffer.getvalue()
+
+
+# ---------------- BULK CV ----------------
+
+# Record keys that identify a candidate, checked in this order
+CV_ID_KEYS = ("id", "candidate_id")
+
+# How list values in JSON records are joined into the form's text fields
+CV_LIST_SEPARATORS = {
+    "skills": ", ",
+    "languages": ", ",
+    "hobbies": ", ",
+    "experiences": "\n\n",
+}
+
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def render_cv_record(row, fields, photo):
+    """
+    Renders one record of a bulk request inside a pool worker.
+    Returns (row, pdf_bytes, error, warning) so a bad record never ends
+    the batch.
+    """
+    warning = None
+
+    try:
+        image_reader = None
+        if photo:
+            image_reader = make_circular_image(BytesIO(photo), 120)
+            if image_reader is None:
+                warning = "Photo could not be read, rendered without it"
+
+        return row, render_cv(fields, image_reader), None, warning
+    except Exception as e:
+        return row, None, f"{type(e).__name__}: {e}", warning
+
+
+def read_cv_records(file):
+    """Parses uploaded CSV, JSON or NDJSON candidate records. Raises ValueError."""
+    ext = file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
+
+    try:
+        if ext == 'csv':
+            text = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+            records = list(csv.DictReader(text))
+        elif ext in ('ndjson', 'jsonl'):
+            records = [json.loads(line) for line in file.stream if line.strip()]
+        elif ext == 'json':
+            records = json.load(file.stream)
+            if isinstance(records, dict):
+                # {"records": [...]}
+                records = records.get("records")
+        else:
+            raise ValueError("Records must be a .csv, .json or .ndjson file")
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV: {e}")
+
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("JSON records must be an array of objects")
+
+    return records
+
+
+def record_fields(record):
+    """Maps one candidate record onto CV_FIELDS, like a form post would."""
+    fields = {}
+
+    for key, default in CV_FIELDS.items():
+        value = record.get(key)
+
+        if value is None:
+            value = default
+        elif isinstance(value, list):
+            value = CV_LIST_SEPARATORS.get(key, "\n").join(str(v) for v in value)
+        else:
+            value = str(value)
+
+        fields[key] = value
+
+    return fields
+
+
+def record_id(record):
+    for key in CV_ID_KEYS:
+        value = record.get(key)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def stream_cv_zip(records, photos_path, max_photo_bytes):
+    """
+    Renders the records on the shared process pool and yields a ZIP of
+    resumes, adding each PDF as soon as its worker finishes. A
+    report.json entry at the end lists the outcome of every record.
+    The saved photos ZIP is removed when the stream ends (and by
+    common.remove_with_response if it never starts).
+    """
+    pool = common.get_render_pool()
+    window = common.PDF_RENDER_WORKERS * 2
+    pending = {}
+    entries = {}
+    report = []
+    rows = iter(enumerate(records, start=1))
+    sink = common.ZipStream()
+
+    photos = zipfile.ZipFile(photos_path) if photos_path else None
+    photo_index = {}
+    if photos:
+        for info in photos.infolist():
+            stem, ext = os.path.splitext(os.path.basename(info.filename))
+            if not info.is_dir() and ext.lower() in PHOTO_EXTENSIONS:
+                photo_index.setdefault(stem, info)
+
+    def submit_next():
+        row, record = next(rows)
+        fields = record_fields(record)
+        candidate_id = record_id(record)
+
+        ident = candidate_id or fields["name"].replace(' ', '_')
+        entry = {
+            "record": row,
+            "id": candidate_id,
+            "file": f"{row:05d}_{secure_filename(ident) or 'resume'}_Resume.pdf",
+        }
+
+        photo = None
+        if photos and candidate_id:
+            info = photo_index.get(candidate_id)
+            if info is None:
+                entry["warning"] = "No photo in the ZIP for this id"
+            elif info.file_size > max_photo_bytes:
+                entry["warning"] = "Photo too large, skipped"
+            else:
+                photo = photos.read(info)
+
+        entries[row] = entry
+        pending[pool.submit(render_cv_record, row, fields, photo)] = row
+
+    try:
+        # reportlab already compresses the page streams
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+
+            while True:
+                try:
+                    while len(pending) < window:
+                        submit_next()
+                except StopIteration:
+                    pass
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    row = pending.pop(future)
+                    entry = entries.pop(row)
+
+                    try:
+                        _, pdf, error, warning = future.result()
+                    except Exception as e:
+                        # Worker process died
+                        pdf, error, warning = None, f"{type(e).__name__}: {e}", None
+
+                    if warning:
+                        entry["warning"] = warning
+
+                    if pdf:
+                        zipf.writestr(entry["file"], pdf)
+                        entry["status"] = "ok"
+                    else:
+                        entry["status"] = "failed"
+                        entry["error"] = error
+                        del entry["file"]
+                        print(f"Bulk CV: record {row} failed: {error}")
+
+                    report.append(entry)
+
+                yield sink.drain()
+
+            report.sort(key=lambda entry: entry["record"])
+            failed = sum(1 for entry in report if entry["status"] == "failed")
+
+            zipf.writestr("report.json", json.dumps({
+                "records": len(report),
+                "rendered": len(report) - failed,
+                "failed": failed,
+                "results": report,
+            }, indent=2))
+
+        # Central directory
+        yield sink.drain()
+
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if photos:
+            photos.close()
+            os.remove(photos_path)
+
+
+@bp.route('/bulk-cv', methods=['POST'])
+def bulk_cv():
+    """
+    Renders one resume per record of the uploaded `records` file (CSV,
+    JSON or NDJSON, with the /generate-pdf field names) and streams back
+    a ZIP. An optional `photos` ZIP supplies photos named <id>.jpg/.png.
+    """
+    records_file = request.files.get('records')
+
+    if not records_file or records_file.filename == '':
+        return jsonify({"error": "No records file uploaded"}), 400
+
+    try:
+        with common.metrics.stage('decode'):
+            records = read_cv_records(records_file)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_records = current_app.config['CV_BULK_MAX_RECORDS']
+
+    if not records:
+        return jsonify({"error": "No records in the file"}), 400
+    if len(records) > max_records:
+        return jsonify({"error": f"At most {max_records} records per request"}), 400
+
+    photos_path = None
+    photos_file = request.files.get('photos')
+
+    if photos_file and photos_file.filename:
+        # The stream outlives the request, so keep the ZIP on disk
+        photos_path = common.upload_path(f"{uuid.uuid4()}.zip")
+        common.save_upload(photos_file, photos_path)
+
+        if not zipfile.is_zipfile(photos_path):
+            os.remove(photos_path)
+            return jsonify({"error": "Photos must be a ZIP file"}), 400
+
+    response = Response(
+        stream_cv_zip(records, photos_path, current_app.config['CV_BULK_MAX_PHOTO_BYTES']),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': 'attachment; filename="resumes.zip"'
+        }
+    )
+    return common.remove_with_response(response, [photos_path])
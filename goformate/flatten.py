@@ -0,0 +1,240 @@
+"""
+Flattening of JSON records into CSV rows.
+
+Nested objects become columns named and ordered like pd.json_normalize
+makes them: 'parent.child', with the plain top-level keys first and the
+nested ones after them, depth first.
+
+The column schema is either collected over all records in a first pass
+('full') or taken from the first records ('sample'), and rows are
+written straight to a csv.writer without building a DataFrame.
+"""
+import csv
+import json
+from itertools import chain, islice
+
+# How list values are written: JSON text, items joined with a separator,
+# or one row per item (items that are objects become 'list.key' columns)
+LIST_MODES = ('json', 'join', 'explode')
+
+SCHEMA_MODES = ('full', 'sample')
+
+# json.dumps builds a new encoder per call when given options
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+class RecordFlattener:
+    """
+    Turns one JSON record into one or more {column: value} rows. Records
+    come from the json module, so only exact dicts and lists are nested.
+    """
+
+    def __init__(self, list_mode='json', separator='|'):
+        if list_mode not in LIST_MODES:
+            raise ValueError(f"list mode must be one of {', '.join(LIST_MODES)}")
+
+        self.list_mode = list_mode
+        self.separator = separator
+        self.explode = list_mode == 'explode'
+
+    def encode_list(self, items):
+        if self.list_mode == 'join':
+            return self.separator.join(
+                '' if item is None else _encode_json(item) if type(item) in (dict, list) else str(item)
+                for item in items
+            )
+        return _encode_json(items)
+
+    def cell(self, record):
+        """Single-column value of a record that is not an object."""
+        if type(record) is dict:
+            return _encode_json(record)
+        if type(record) is list:
+            return self.encode_list(record)
+        return record
+
+    # ---------------- ROWS ----------------
+
+    def _flatten(self, record, prefix, out, lists):
+        # Lists are collected in `lists` to be exploded, or encoded when it is None
+        nested = None
+
+        for key, value in record.items():
+            name = key if prefix is None else prefix + key
+            kind = type(value)
+
+            if kind is dict:
+                if prefix is None:
+                    # Nested keys go after the plain top-level keys
+                    if nested is None:
+                        nested = []
+                    nested.append((name, value))
+                else:
+                    self._flatten(value, name + '.', out, lists)
+            elif kind is list:
+                if lists is not None:
+                    lists.append((name, value))
+                else:
+                    out[name] = self.encode_list(value)
+            else:
+                out[name] = value
+
+        if nested:
+            for name, value in nested:
+                self._flatten(value, name + '.', out, lists)
+
+        return out
+
+    def rows(self, record):
+        """Yields the rows of a dict record: one, or one per list item with 'explode'."""
+        if not self.explode:
+            yield self._flatten(record, None, {}, None)
+            return
+
+        lists = []
+        base = self._flatten(record, None, {}, lists)
+
+        # Empty lists add nothing, like empty objects
+        length = max((len(items) for _, items in lists), default=0)
+        if length == 0:
+            yield base
+            return
+
+        # Lists of the same record are exploded side by side, padded with blanks
+        for index in range(length):
+            row = dict(base)
+
+            for name, items in lists:
+                item = items[index] if index < len(items) else None
+                kind = type(item)
+
+                if kind is dict:
+                    # Lists inside exploded items are not exploded again
+                    self._flatten(item, name + '.', row, None)
+                elif kind is list:
+                    row[name] = _encode_json(item)
+                else:
+                    row[name] = item
+
+            yield row
+
+    # ---------------- SCHEMA ----------------
+
+    def _keys(self, record, prefix, columns, lists):
+        # Same walk as _flatten, but only adds the column names to `columns`
+        nested = None
+
+        for key, value in record.items():
+            name = key if prefix is None else prefix + key
+            kind = type(value)
+
+            if kind is dict:
+                if prefix is None:
+                    if nested is None:
+                        nested = []
+                    nested.append((name, value))
+                else:
+                    self._keys(value, name + '.', columns, lists)
+            elif kind is list and lists is not None:
+                lists.append((name, value))
+            else:
+                # Assigning an existing key keeps its position
+                columns[name] = None
+
+        if nested:
+            for name, value in nested:
+                self._keys(value, name + '.', columns, lists)
+
+    def add_columns(self, record, columns):
+        """Adds the columns of a dict record to the ordered dict `columns`."""
+        if not self.explode:
+            self._keys(record, None, columns, None)
+            return
+
+        lists = []
+        self._keys(record, None, columns, lists)
+
+        for name, items in lists:
+            for item in items:
+                if type(item) is dict:
+                    self._keys(item, name + '.', columns, None)
+                else:
+                    columns[name] = None
+
+
+def _schema(records, flattener):
+    """Columns in first-appearance order, and whether every record is an object."""
+    columns = {}
+    all_dicts = True
+
+    for record in records:
+        if type(record) is dict:
+            flattener.add_columns(record, columns)
+        else:
+            all_dicts = False
+
+    return list(columns), all_dicts
+
+
+def write_records_csv(records, output_path, flattener, schema='full', sample_size=1000):
+    """
+    Writes `records` to a CSV at `output_path`. `records` is iterated
+    twice with the 'full' schema, so it must be re-iterable (a list, or a
+    reader that opens its input again); `records.column` names the single
+    column used when records are not objects.
+
+    With the 'sample' schema only the first `sample_size` records decide
+    the columns; keys first seen later are left out.
+    Returns the list of columns written and the sorted list of keys that
+    were left out.
+    """
+    if schema not in SCHEMA_MODES:
+        raise ValueError(f"schema must be one of {', '.join(SCHEMA_MODES)}")
+
+    if schema == 'full':
+        columns, all_dicts = _schema(records, flattener)
+        source = records
+    else:
+        remaining = iter(records)
+        head = list(islice(remaining, sample_size))
+        columns, all_dicts = _schema(head, flattener)
+        source = chain(head, remaining)
+
+    if not all_dicts:
+        columns = [records.column]
+
+    known = set(columns)
+    # Only a sampled schema can lack keys of later rows
+    check_keys = schema == 'sample' and all_dicts
+    dropped = set()
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(columns)
+
+        if not all_dicts:
+            writer.writerows([flattener.cell(record)] for record in source)
+        else:
+            writerow = writer.writerow
+            rows = flattener.rows
+
+            for record in source:
+                if type(record) is not dict:
+                    # Only possible after the sample
+                    record = {columns[0]: flattener.cell(record)}
+
+                for row in rows(record):
+                    if check_keys and not row.keys() <= known:
+                        dropped.update(row.keys() - known)
+
+                    writerow(map(row.get, columns))
+
+    return columns, sorted(dropped)
+
+
+class RecordList(list):
+    """Records already in memory, with the column name for non-object records."""
+
+    def __init__(self, records, column="value"):
+        super().__init__(records)
+        self.column = column
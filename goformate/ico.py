@@ -0,0 +1,216 @@
+import html
+import json
+import zipfile
+from io import BytesIO
+
+from flask import Blueprint, request, render_template as render, send_file
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('ico', __name__)
+
+Image = lazy_import('PIL.Image', 'ico')
+ImageOps = lazy_import('PIL.ImageOps', 'ico')
+
+
+@bp.route('/jpg-to-ico')
+def Jpg_To_Ico():
+    return render('jpg_to_ico.html')
+
+# ---------------- ICON SIZES ----------------
+
+# Sizes in the single ICO download
+ICO_SIZES = (32, 64, 128)
+
+# Sizes in the favicon.ico of the bundle
+BUNDLE_ICO_SIZES = (16, 32, 48, 64, 128, 256)
+
+# PNG icons of the bundle: file name -> size
+BUNDLE_PNGS = {
+    'favicon-16x16.png': 16,
+    'favicon-32x32.png': 32,
+    'favicon-96x96.png': 96,
+    'apple-touch-icon.png': 180,
+    'android-chrome-192x192.png': 192,
+    'android-chrome-512x512.png': 512,
+}
+
+
+def load_square_image(stream, max_size, crop=False):
+    """
+    Decodes the upload once into a square RGB(A) image of at least
+    `max_size` pixels (unless the source is smaller). Non-square images
+    are center-cropped with `crop`, otherwise padded with transparency.
+    """
+    img = Image.open(stream)
+
+    # Let the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding;
+    # both sides stay at least max_size
+    if img.format == "JPEG":
+        img.draft("RGB", (max_size, max_size))
+
+    img = ImageOps.exif_transpose(img)
+
+    if img.mode in ("RGBA", "LA", "P", "PA") or "transparency" in img.info:
+        img = img.convert("RGBA")
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    if img.width == img.height:
+        return img
+
+    if crop:
+        side = min(img.size)
+        left = (img.width - side) // 2
+        top = (img.height - side) // 2
+        return img.crop((left, top, left + side, top + side))
+
+    side = max(img.size)
+    square = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    square.paste(img, ((side - img.width) // 2, (side - img.height) // 2))
+    return square
+
+
+def downscale_chain(img, sizes):
+    """
+    Returns {size: image} for every size, largest first. Each step starts
+    from the previous level, which is halved with a cheap box reduce until
+    it is less than 4x the target; only the last 2-4x step uses LANCZOS.
+    """
+    icons = {}
+    level = img
+
+    for size in sorted(set(sizes), reverse=True):
+        while level.width >= size * 4:
+            level = level.reduce(2)
+
+        if level.width == size:
+            icons[size] = level
+        else:
+            icons[size] = level.resize((size, size), Image.LANCZOS)
+
+    return icons
+
+
+def encode_ico(icons, sizes):
+    """Multi-size ICO from already scaled images, so Pillow does not resize again."""
+    sizes = sorted(sizes, reverse=True)
+    largest = icons[sizes[0]]
+
+    buffer = BytesIO()
+    largest.save(
+        buffer, format='ICO',
+        sizes=[(size, size) for size in sizes],
+        append_images=[icons[size] for size in sizes[1:]]
+    )
+    return buffer.getvalue()
+
+
+def encode_png(img):
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def favicon_manifest(name, theme_color):
+    return json.dumps({
+        "name": name,
+        "short_name": name,
+        "icons": [
+            {"src": "/android-chrome-192x192.png", "sizes": "192x192", "type": "image/png"},
+            {"src": "/android-chrome-512x512.png", "sizes": "512x512", "type": "image/png"},
+        ],
+        "theme_color": theme_color,
+        "background_color": theme_color,
+        "display": "standalone",
+    }, indent=2)
+
+
+def favicon_head_snippet(theme_color):
+    return "\n".join([
+        '<link rel="icon" href="/favicon.ico" sizes="any">',
+        '<link rel="icon" type="image/png" sizes="32x32" href="/favicon-32x32.png">',
+        '<link rel="icon" type="image/png" sizes="16x16" href="/favicon-16x16.png">',
+        '<link rel="apple-touch-icon" sizes="180x180" href="/apple-touch-icon.png">',
+        '<link rel="manifest" href="/site.webmanifest">',
+        f'<meta name="theme-color" content="{html.escape(theme_color)}">',
+        '',
+    ])
+
+
+def build_favicon_bundle(stream, crop=False, name="", theme_color="#ffffff"):
+    """
+    favicon.ico, the PNG icons, site.webmanifest and an HTML <head>
+    snippet, as ZIP bytes. All sizes come from one decode.
+    """
+    sizes = set(BUNDLE_ICO_SIZES) | set(BUNDLE_PNGS.values())
+
+    with common.metrics.stage('decode'):
+        img = load_square_image(stream, max(sizes), crop)
+
+    with common.metrics.stage('convert'):
+        icons = downscale_chain(img, sizes)
+
+    buffer = BytesIO()
+
+    with common.metrics.stage('encode'), zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+        # ICO and PNG data is already compressed
+        zipf.writestr('favicon.ico', encode_ico(icons, BUNDLE_ICO_SIZES))
+
+        for filename, size in BUNDLE_PNGS.items():
+            zipf.writestr(filename, encode_png(icons[size]))
+
+        zipf.writestr('site.webmanifest', favicon_manifest(name, theme_color), zipfile.ZIP_DEFLATED)
+        zipf.writestr('favicon.html', favicon_head_snippet(theme_color), zipfile.ZIP_DEFLATED)
+
+    return buffer.getvalue()
+
+# ---------------- CONVERT ----------------
+
+@bp.route('/jpgtoico', methods=['GET', 'POST'])
+def jpgTo_ico():
+    if request.method == 'POST':
+        # 1. Get the file from the request
+        file = request.files.get('image')
+
+        if file:
+            crop = request.form.get('crop') in ('1', 'on', 'true')
+
+            try:
+                # 2. Favicon bundle: ICO, PNGs and manifest in one ZIP
+                if request.form.get('bundle') in ('1', 'on', 'true'):
+                    bundle = build_favicon_bundle(
+                        file.stream,
+                        crop=crop,
+                        name=request.form.get('app_name', '').strip(),
+                        theme_color=request.form.get('theme_color', '').strip() or '#ffffff'
+                    )
+
+                    return send_file(
+                        BytesIO(bundle),
+                        mimetype='application/zip',
+                        as_attachment=True,
+                        download_name='favicon_bundle.zip'
+                    )
+
+                # 3. Decode once and scale down step by step
+                # file.stream allows us to read the upload directly without saving it
+                with common.metrics.stage('decode'):
+                    img = load_square_image(file.stream, max(ICO_SIZES), crop)
+
+                with common.metrics.stage('convert'):
+                    icons = downscale_chain(img, ICO_SIZES)
+
+                with common.metrics.stage('encode'):
+                    ico = encode_ico(icons, ICO_SIZES)
+
+                # 4. Send the ICO back to the user
+                return send_file(
+                    BytesIO(ico),
+                    mimetype='image/x-icon',
+                    as_attachment=True,
+                    download_name='converted_icon.ico'
+                )
+            except Exception as e:
+                return f"Error processing image: {e}", 500
@@ -0,0 +1,136 @@
+import heapq
+import os
+import sqlite3
+import threading
+import time
+
+
+class Janitor:
+    """
+    Deletes files once their deadline has passed.
+
+    A single background thread sleeps until the earliest deadline in a heap,
+    instead of one sleeping thread per file. Every scheduled deletion is
+    also recorded in a SQLite manifest, so files whose deadline passed
+    while the process was down are removed on the next start.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = os.path.abspath(manifest_path)
+
+        self._heap = []
+        self._deadlines = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self.deleted = 0
+        self.errors = 0
+
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS deletions ("
+                "path TEXT PRIMARY KEY, deadline REAL)"
+            )
+            rows = db.execute("SELECT path, deadline FROM deletions").fetchall()
+
+        # Pick up deletions left over from a previous run
+        for path, deadline in rows:
+            self._push(path, deadline)
+
+        if rows:
+            self.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.manifest_path, timeout=30)
+
+    def _push(self, path, deadline):
+        self._deadlines[path] = deadline
+        heapq.heappush(self._heap, (deadline, path))
+
+    def start(self):
+        """Starts the background thread (once)."""
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="janitor",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def schedule(self, path, delay):
+        """Deletes `path` after `delay` seconds. Rescheduling a path replaces its deadline."""
+        path = os.path.abspath(path)
+        deadline = time.time() + delay
+
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO deletions (path, deadline) VALUES (?, ?)",
+                (path, deadline)
+            )
+
+        with self._cond:
+            self._push(path, deadline)
+            self._cond.notify()
+
+        self.start()
+
+    def pending(self):
+        """Number of files waiting to be deleted."""
+        with self._cond:
+            return len(self._deadlines)
+
+    def stats(self):
+        with self._cond:
+            next_deadline = self._heap[0][0] if self._heap else None
+            return {
+                "pending": len(self._deadlines),
+                "deleted": self.deleted,
+                "errors": self.errors,
+                "next_in_seconds": (
+                    max(0.0, next_deadline - time.time())
+                    if next_deadline is not None else None
+                ),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                deadline, path = self._heap[0]
+                now = time.time()
+
+                if deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+
+                heapq.heappop(self._heap)
+
+                # Skip stale heap entries of rescheduled paths
+                if self._deadlines.get(path) != deadline:
+                    continue
+                del self._deadlines[path]
+
+            self._remove(path, deadline)
+
+    def _remove(self, path, deadline):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Deleted: {path}")
+            self.deleted += 1
+
+        except Exception as e:
+            self.errors += 1
+            print(f"Delete Error: {e}")
+
+        try:
+            with self._connect() as db:
+                # Only drop the row if it was not rescheduled meanwhile
+                db.execute(
+                    "DELETE FROM deletions WHERE path = ? AND deadline = ?",
+                    (path, deadline)
+                )
+        except sqlite3.Error as e:
+            print(f"Delete Error: {e}")
@@ -0,0 +1,301 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Weight of the newest job in the moving average of job duration
+JOB_TIME_WEIGHT = 0.2
+
+MAX_RETRY_AFTER = 300
+
+
+class JobQueueFull(Exception):
+    """The converter already has as many jobs as it may queue."""
+
+    def __init__(self, converter, retry_after):
+        super().__init__(f"Too many queued {converter} jobs, try again later")
+        self.converter = converter
+        self.retry_after = retry_after
+
+
+def _process_alive(pid):
+    """True if a process with this pid exists on this machine."""
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Delete Error: {e}")
+
+
+class JobManager:
+    """
+    Runs long conversions in the background.
+
+    Each converter gets its own bounded thread pool, so a burst of one kind
+    of job cannot starve the others. Job records live in a SQLite file, so
+    any worker process can answer status polls and serve the result file
+    once it exists. Results expire `result_ttl` seconds after they finish.
+
+    Each converter takes at most `max_queued` jobs beyond its running ones
+    per process; further submissions raise JobQueueFull. Jobs left queued
+    or running by a process that is gone are marked failed on startup.
+    """
+
+    def __init__(self, db_path, limits=None, default_limit=2, result_ttl=3600, on_expire=None, app=None,
+                 max_queued=20):
+        self.db_path = os.path.abspath(db_path)
+        # Jobs run inside this Flask app's context, so they can read its config
+        self.app = app
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.result_ttl = result_ttl
+        # Called with the result path of each finished job, e.g. to schedule deletion
+        self.on_expire = on_expire
+        self.max_queued = max_queued
+
+        self._pools = {}
+        self._lock = threading.Lock()
+        # converter -> jobs of this process that are queued or running
+        self._active = {}
+        # converter -> moving average of job duration in seconds
+        self._job_seconds = {}
+
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, converter TEXT, status TEXT, error TEXT, "
+                "result_path TEXT, download_name TEXT, mimetype TEXT, "
+                "created REAL, started REAL, finished REAL, expires REAL)"
+            )
+
+            # Added later: the submitting process and the files to remove
+            columns = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            if "pid" not in columns:
+                db.execute("ALTER TABLE jobs ADD COLUMN pid INTEGER")
+            if "cleanup" not in columns:
+                db.execute("ALTER TABLE jobs ADD COLUMN cleanup TEXT")
+
+        self._reclaim_stale(startup=True)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _stale(self, pid, startup=False):
+        if pid is None:
+            # Recorded before jobs had an owner
+            return startup
+        if pid == os.getpid():
+            # Only an earlier process with the same pid can have left jobs at startup
+            return startup
+        return not _process_alive(pid)
+
+    def _reclaim_stale(self, startup=False):
+        """
+        Fails the queued and running jobs of processes that have exited,
+        gives them an expiry and removes their cleanup files. Called on
+        startup and whenever such a job is looked at, since worker
+        processes can die and be replaced without a new JobManager.
+        """
+        now = time.time()
+
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, pid, cleanup FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+
+            stale = [(job_id, cleanup) for job_id, pid, cleanup in rows if self._stale(pid, startup)]
+
+            db.executemany(
+                "UPDATE jobs SET status = 'failed', error = ?, finished = ?, expires = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                [("Interrupted: the server process running it exited", now, now + self.result_ttl, job_id)
+                 for job_id, _ in stale]
+            )
+
+        for _, cleanup in stale:
+            _remove_files(json.loads(cleanup) if cleanup else [])
+
+        if stale:
+            print(f"Jobs: marked {len(stale)} interrupted jobs as failed")
+
+    def _pool(self, converter):
+        with self._lock:
+            pool = self._pools.get(converter)
+
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=self.limits.get(converter, self.default_limit),
+                    thread_name_prefix=f"job-{converter}"
+                )
+                self._pools[converter] = pool
+
+            return pool
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+
+        with self._connect() as db:
+            db.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    # ---------------- SUBMIT ----------------
+
+    def submit(self, converter, func, *args, download_name=None, mimetype=None, cleanup=()):
+        """
+        Queues `func(*args)` on the converter's pool and returns the job id.
+        `func` must return the path of the result file. Paths in `cleanup`
+        (usually the saved upload) are removed when the job ends.
+        Raises JobQueueFull when the converter's queue is full.
+        """
+        workers = self.limits.get(converter, self.default_limit)
+
+        with self._lock:
+            active = self._active.get(converter, 0)
+            if active >= workers + self.max_queued:
+                seconds = self._job_seconds.get(converter, 1.0) * active / workers
+                raise JobQueueFull(converter, max(1, min(MAX_RETRY_AFTER, math.ceil(seconds))))
+            self._active[converter] = active + 1
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        try:
+            self._insert(job_id, converter, download_name, mimetype, cleanup, now)
+            self._pool(converter).submit(self._run, job_id, converter, func, args, cleanup)
+        except Exception:
+            self._finished(converter, None)
+            raise
+
+        return job_id
+
+    def _insert(self, job_id, converter, download_name, mimetype, cleanup, now):
+        with self._connect() as db:
+            # Forget records of expired jobs
+            db.execute("DELETE FROM jobs WHERE expires < ?", (now,))
+            db.execute(
+                "INSERT INTO jobs (id, converter, status, download_name, mimetype, created, pid, cleanup) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, converter, download_name, mimetype, now, os.getpid(),
+                 json.dumps([os.path.abspath(path) for path in cleanup]))
+            )
+
+    def _finished(self, converter, seconds):
+        with self._lock:
+            self._active[converter] -= 1
+            if seconds is not None:
+                average = self._job_seconds.get(converter, seconds)
+                self._job_seconds[converter] = average + (seconds - average) * JOB_TIME_WEIGHT
+
+    def _run(self, job_id, converter, func, args, cleanup):
+        started = time.perf_counter()
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    return self._run_job(job_id, func, args, cleanup)
+            return self._run_job(job_id, func, args, cleanup)
+        finally:
+            self._finished(converter, time.perf_counter() - started)
+
+    def _run_job(self, job_id, func, args, cleanup):
+        self._update(job_id, status="running", started=time.time())
+
+        try:
+            result_path = os.path.abspath(func(*args))
+
+        except Exception as e:
+            traceback.print_exc()
+            finished = time.time()
+            self._update(
+                job_id,
+                status="failed",
+                error=str(e),
+                finished=finished,
+                expires=finished + self.result_ttl
+            )
+
+        else:
+            finished = time.time()
+            self._update(
+                job_id,
+                status="done",
+                result_path=result_path,
+                finished=finished,
+                expires=finished + self.result_ttl
+            )
+
+            if self.on_expire:
+                self.on_expire(result_path, self.result_ttl)
+
+        finally:
+            _remove_files(cleanup)
+
+    # ---------------- STATUS ----------------
+
+    def get(self, job_id):
+        """Returns the job record as a dict, or None if unknown or expired."""
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(row)
+
+        if job["status"] in ("queued", "running") and self._stale(job["pid"]):
+            self._reclaim_stale()
+            return self.get(job_id)
+
+        if job["expires"] is not None and job["expires"] < time.time():
+            return None
+
+        return job
+
+    def queue_depths(self):
+        """Queued and running jobs per converter."""
+        self._reclaim_stale()
+
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT converter, status, COUNT(*) FROM jobs "
+                "WHERE status IN ('queued', 'running') GROUP BY converter, status"
+            ).fetchall()
+
+        depths = {}
+        for converter, status, count in rows:
+            depths.setdefault(converter, {"queued": 0, "running": 0})[status] = count
+
+        return depths
@@ -0,0 +1,373 @@
+import os
+import uuid
+import zlib
+from io import BytesIO
+
+from flask import Blueprint, Response, current_app, request, render_template as render, send_file, redirect
+from werkzeug.utils import secure_filename
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('jpg_pdf', __name__)
+
+Image = lazy_import('PIL.Image', 'jpg_pdf')
+ImageOps = lazy_import('PIL.ImageOps', 'jpg_pdf')
+
+# ---------------- PAGE LAYOUT ----------------
+
+# Portrait page sizes in points; 'fit' makes every page the size of its
+# image at 1 px = 1 pt
+PAGE_SIZES = {
+    'fit': None,
+    'a4': (595.28, 841.89),
+    'letter': (612.0, 792.0),
+}
+
+# Margin around images on A4 and Letter pages, in points
+PAGE_MARGIN = 36
+
+# EXIF orientations that are a pure rotation, so the JPEG data can be
+# embedded untouched and turned on the page instead
+JPEG_ROTATIONS = {1: 0, 3: 180, 6: 90, 8: 270}
+
+# Color spaces of JPEGs that are embedded as-is
+JPEG_COLORSPACES = {
+    'L': '/DeviceGray',
+    'RGB': '/DeviceRGB',
+    'CMYK': '/DeviceCMYK',
+}
+
+
+def load_pdf_image(source):
+    """
+    Reads one image (a path or a binary file object) for embedding.
+    JPEGs keep their compressed data as-is (DCTDecode); anything else is
+    decoded once, flattened onto white and Flate-compressed.
+    Returns a dict with width, height, colorspace, filter, decode, rotation
+    and data.
+    """
+    img = Image.open(source)
+
+    try:
+        if img.format == 'JPEG' and img.mode in JPEG_COLORSPACES:
+            rotation = JPEG_ROTATIONS.get(img.getexif().get(0x0112, 1))
+
+            if rotation is not None:
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+                    data = source.read()
+                else:
+                    with open(source, 'rb') as f:
+                        data = f.read()
+
+                decode = None
+                if img.mode == 'CMYK' and 'adobe' in img.info:
+                    # Adobe writes inverted CMYK
+                    decode = '[1 0 1 0 1 0 1 0]'
+
+                return {
+                    'width': img.width,
+                    'height': img.height,
+                    'colorspace': JPEG_COLORSPACES[img.mode],
+                    'filter': '/DCTDecode',
+                    'decode': decode,
+                    'rotation': rotation,
+                    'data': data,
+                }
+
+        # Other formats and mirrored JPEGs: decode and store losslessly
+        img = ImageOps.exif_transpose(img)
+
+        if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel('A'))
+        elif img.mode in ('1', 'L'):
+            img = img.convert('L')
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        return {
+            'width': img.width,
+            'height': img.height,
+            'colorspace': '/DeviceGray' if img.mode == 'L' else '/DeviceRGB',
+            'filter': '/FlateDecode',
+            'decode': None,
+            'rotation': 0,
+            'data': zlib.compress(img.tobytes(), 6),
+        }
+    finally:
+        img.close()
+
+
+def place_image(image, page_size):
+    """
+    Returns (page_width, page_height, matrix): the page for an image under
+    the 'fit', 'a4' or 'letter' policy and the `cm` matrix that draws the
+    image (turned by its EXIF rotation) centered on it.
+    """
+    rotation = image['rotation']
+    width, height = image['width'], image['height']
+    if rotation in (90, 270):
+        width, height = height, width
+
+    paper = PAGE_SIZES[page_size]
+
+    if paper is None:
+        page_w, page_h = width, height
+        scale = 1.0
+    else:
+        page_w, page_h = paper
+        if width > height:
+            # Landscape images get landscape pages
+            page_w, page_h = page_h, page_w
+        scale = min((page_w - 2 * PAGE_MARGIN) / width, (page_h - 2 * PAGE_MARGIN) / height)
+
+    w, h = width * scale, height * scale
+    x, y = (page_w - w) / 2, (page_h - h) / 2
+
+    # Maps the image's unit square onto the (x, y, w, h) box on the page
+    if rotation == 90:
+        matrix = (0, -h, w, 0, x, y + h)
+    elif rotation == 180:
+        matrix = (-w, 0, 0, -h, x + w, y + h)
+    elif rotation == 270:
+        matrix = (0, h, -w, 0, x + w, y)
+    else:
+        matrix = (w, 0, 0, h, x, y)
+
+    return page_w, page_h, matrix
+
+# ---------------- PDF WRITER ----------------
+
+def _num(value):
+    return f"{value:.4f}".rstrip('0').rstrip('.') or '0'
+
+
+class ImagePdfWriter:
+    """
+    Writes a PDF with one image per page, object by object. Every method
+    returns the bytes to append, so pages can be streamed out as soon as
+    they are added and only one image is held at a time. Objects 1 and 2
+    (catalog and page tree) are written last, since the page tree lists
+    every page.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+        self.pages = []
+        self.next_obj = 3
+
+    def _emit(self, chunks):
+        for chunk in chunks:
+            self.offset += len(chunk)
+        return chunks
+
+    def _object(self, body, stream=None):
+        num = self.next_obj
+        self.next_obj += 1
+        return num, self._write_object(num, body, stream)
+
+    def _write_object(self, num, body, stream=None):
+        self.offsets[num] = self.offset
+
+        if stream is None:
+            return self._emit([f"{num} 0 obj\n{body}\nendobj\n".encode('latin-1')])
+
+        return self._emit([
+            f"{num} 0 obj\n{body}\nstream\n".encode('latin-1'),
+            stream,
+            b"\nendstream\nendobj\n",
+        ])
+
+    def header(self):
+        # The binary comment marks the file as binary for transfer tools
+        return self._emit([b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"])
+
+    def add_page(self, image, page_size='fit'):
+        page_w, page_h, matrix = place_image(image, page_size)
+        chunks = []
+
+        image_dict = (
+            f"<< /Type /XObject /Subtype /Image /Width {image['width']} /Height {image['height']} "
+            f"/ColorSpace {image['colorspace']} /BitsPerComponent 8 /Filter {image['filter']} "
+        )
+        if image['decode']:
+            image_dict += f"/Decode {image['decode']} "
+        image_dict += f"/Length {len(image['data'])} >>"
+
+        image_obj, data = self._object(image_dict, image['data'])
+        chunks += data
+
+        content = f"q {' '.join(_num(v) for v in matrix)} cm /Im0 Do Q".encode('latin-1')
+        content_obj, data = self._object(f"<< /Length {len(content)} >>", content)
+        chunks += data
+
+        page_obj, data = self._object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(page_w)} {_num(page_h)}] "
+            f"/Resources << /XObject << /Im0 {image_obj} 0 R >> >> /Contents {content_obj} 0 R >>"
+        )
+        chunks += data
+
+        self.pages.append(page_obj)
+        return chunks
+
+    def close(self):
+        """Page tree, catalog, cross-reference table and trailer."""
+        kids = " ".join(f"{num} 0 R" for num in self.pages)
+        chunks = self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>")
+        chunks += self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.offset
+        size = self.next_obj
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[num]:010d} 00000 n \n" for num in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+
+        return chunks + self._emit(["".join(lines).encode('latin-1')])
+
+
+def generate_images_pdf(sources, page_size='fit', cache_key=None, cleanup=False):
+    """
+    Yields a PDF with one page per image source (paths or file objects),
+    loading each image only when its page is written. With a cache_key the
+    bytes are also stored in the result cache once the PDF is complete;
+    with `cleanup` the source files are removed as they are embedded
+    (common.remove_with_response covers a stream that never starts).
+    """
+    cache_path = None
+    cache_file = None
+    if cache_key:
+        cache_path = common.result_cache.pending_path(cache_key)
+        cache_file = open(cache_path, 'wb')
+
+    def emit(chunks):
+        if cache_file:
+            for chunk in chunks:
+                cache_file.write(chunk)
+        return chunks
+
+    writer = ImagePdfWriter()
+
+    try:
+        yield from emit(writer.header())
+
+        for source in sources:
+            image = load_pdf_image(source)
+            if cleanup:
+                os.remove(source)
+
+            yield from emit(writer.add_page(image, page_size))
+            del image
+
+        yield from emit(writer.close())
+
+        if cache_file:
+            cache_file.close()
+            common.result_cache.commit(cache_key, cache_path)
+            cache_file = None
+
+    except Exception as e:
+        print(f"Conversion error: {e}")
+        raise
+
+    finally:
+        if cache_file:
+            # Incomplete PDF (error or client went away)
+            cache_file.close()
+            common.result_cache.discard(cache_path)
+
+        if cleanup:
+            for source in sources:
+                if os.path.exists(source):
+                    os.remove(source)
+
+
+@bp.route('/jpg-to-pdf')
+def jpg_to_pdf():
+    return render('jpg_to_pdf.html')
+
+@bp.route('/jpgtopdf', methods=['POST'])
+def jpgToPdf():
+    """
+    Converts one or more uploaded images (`file`, repeatable) into a single
+    PDF, one page per image in upload order. `page_size` is 'fit' (page
+    matches the image), 'a4' or 'letter'. Small batches are assembled in
+    memory; larger ones are saved and streamed back page by page.
+    """
+    if request.method == 'POST':
+        # Check if the post request has the file part
+        if 'file' not in request.files:
+            return redirect(request.url)
+
+        files = [f for f in request.files.getlist('file') if f.filename != '']
+
+        # If user does not select file, browser also submits an empty part
+        if not files:
+            return redirect(request.url)
+
+        if not all(common.allowed_file(f.filename) for f in files):
+            return "Unsupported file type.", 400
+
+        if len(files) > current_app.config['JPG_PDF_MAX_IMAGES']:
+            return f"At most {current_app.config['JPG_PDF_MAX_IMAGES']} images per PDF.", 400
+
+        page_size = request.form.get('page_size', 'fit').lower()
+        if page_size not in PAGE_SIZES:
+            return "page_size must be fit, a4 or letter.", 400
+
+        # e.g., 'myimage.jpg' -> 'myimage.pdf'; batches are named after the first image
+        base_filename = os.path.splitext(secure_filename(files[0].filename))[0] or 'images'
+        pdf_filename = f"{base_filename}.pdf"
+
+        # Serve a previous result for the same images straight from the cache
+        upload_keys = [common.result_cache.key_for_upload(f, 'jpg_to_pdf') for f in files]
+        cache_key = common.result_cache.make_key(",".join(upload_keys), 'jpg_to_pdf', page_size=page_size)
+        cached = common.send_cached(cache_key, download_name=pdf_filename, mimetype='application/pdf')
+        if cached:
+            return cached
+
+        # Check every image header up front, so bad uploads fail before any output
+        total_bytes = 0
+        for f in files:
+            try:
+                # Only parses the header; closing would close the upload stream
+                Image.open(f.stream)
+            except Exception as e:
+                return f"Error reading {f.filename}: {e}", 400
+
+            f.stream.seek(0, os.SEEK_END)
+            total_bytes += f.stream.tell()
+            f.stream.seek(0)
+
+        if total_bytes < current_app.config['JPG_PDF_STREAM_MIN_BYTES']:
+            try:
+                with common.metrics.stage('convert'):
+                    pdf_data = b"".join(generate_images_pdf([f.stream for f in files], page_size, cache_key))
+            except Exception:
+                return "Error during conversion.", 500
+
+            return send_file(
+                BytesIO(pdf_data),
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=pdf_filename
+            )
+
+        # The stream outlives the request, so keep the images on disk
+        paths = []
+        for f in files:
+            path = common.upload_path(f"{uuid.uuid4()}_{secure_filename(f.filename)}")
+            common.save_upload(f, path)
+            paths.append(path)
+
+        response = Response(
+            generate_images_pdf(paths, page_size, cache_key, cleanup=True),
+            mimetype='application/pdf',
+            headers={
+                'Content-Disposition': f'attachment; filename="{pdf_filename}"'
+            }
+        )
+        return common.remove_with_response(response, paths)
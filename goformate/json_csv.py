@@ -0,0 +1,318 @@
+import json
+import os
+import uuid
+
+from flask import Blueprint, current_app, request, render_template as render
+
+from . import common
+from .flatten import LIST_MODES, SCHEMA_MODES, RecordFlattener, RecordList, write_records_csv
+
+bp = Blueprint('json_csv', __name__)
+
+
+@bp.route('/json-to-csv')
+def Json2CSV():
+    return render('json_to_csv.html')
+
+def convert_json_to_csv(input_path, output_dir, filename=None, list_mode='json', schema='full', separator='|'):
+    """
+    Converts a JSON path or binary upload stream to a CSV in `output_dir`,
+    named after `filename` (default: the input path).
+
+    `list_mode` and `separator` decide how list values are written (see
+    flatten.RecordFlattener); `schema` is 'full' (columns collected over
+    every record first) or 'sample' (columns of the first
+    JSON_CSV_SCHEMA_SAMPLE records, one pass over the input).
+
+    Returns the CSV path and the keys the sampled schema left out.
+    """
+    base_name = filename or os.path.basename(input_path)
+    filename_no_ext = os.path.splitext(base_name)[0]
+
+    output_path = os.path.join(
+        output_dir,
+        f"{filename_no_ext}.csv"
+    )
+
+    flattener = RecordFlattener(list_mode, separator)
+    sample_size = current_app.config['JSON_CSV_SCHEMA_SAMPLE']
+
+    try:
+
+        # Big files and NDJSON never get loaded as a whole
+        ndjson = is_ndjson(input_path, base_name)
+        if ndjson or common.source_size(input_path) >= current_app.config['JSON_CSV_STREAM_MIN_BYTES']:
+            try:
+                records = JsonRecords(input_path, ndjson, current_app.config['JSON_CSV_MAX_RECORD_CHARS'])
+                _, dropped = write_records_csv(records, output_path, flattener, schema, sample_size)
+                return output_path, dropped
+            except NotStreamable:
+                # A plain object without any list: small enough to load
+                pass
+
+        with common.open_text(input_path) as f:
+            data = json.load(f)
+
+        _, dropped = write_records_csv(loaded_records(data), output_path, flattener, schema, sample_size)
+
+        return output_path, dropped
+
+    except Exception as e:
+        raise Exception(f"JSON conversion error: {e}")
+
+
+def loaded_records(data):
+    """
+    The records of a parsed document, like JsonRecords picks them: a
+    top-level array, the first list-valued key of an object, or else the
+    object itself as the only record.
+    """
+    # CASE 1: List
+    if isinstance(data, list):
+        return RecordList(data)
+
+    # CASE 2: Dictionary
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, list):
+                return RecordList(value, key)
+
+        # Normal dictionary
+        return RecordList([data])
+
+    raise Exception("Unsupported JSON structure")
+
+# ---------------- JSON → CSV (STREAMING) ----------------
+
+JSON_READ_SIZE = 1024 * 1024
+
+
+class NotStreamable(Exception):
+    """The JSON document has no array of records to stream."""
+
+
+class JsonStreamReader:
+    """
+    Decodes JSON values one at a time from a text file, keeping only a
+    sliding window of the input in memory. Used to walk the elements of
+    a large array without building the whole document. A value that does
+    not decode within `max_value_chars` raises ValueError, so a malformed
+    or huge record does not pull the rest of the file into memory.
+    """
+
+    def __init__(self, f, max_value_chars):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.max_value_chars = max_value_chars
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # Grow geometrically so a single huge value is not re-parsed too often
+        more = self.f.read(max(JSON_READ_SIZE, len(self.buf) - self.pos))
+        if not more:
+            return False
+        self.buf = self.buf[self.pos:] + more
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at the end of the input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Expected '{ch}' at offset {self.pos}")
+        self.pos += 1
+
+    def _fill_value(self):
+        # More input for the value at self.pos, unless it already fills the window
+        if len(self.buf) - self.pos >= self.max_value_chars:
+            raise ValueError(
+                f"Malformed JSON, or a record over {self.max_value_chars} characters, at offset {self.pos}"
+            )
+        return self._fill()
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill_value():
+                    raise
+                continue
+
+            # A number at the end of the window may continue in the next read
+            if end == len(self.buf) and self._fill_value():
+                continue
+
+            self.pos = end
+            return obj
+
+    def items(self):
+        """Yields the elements of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        while True:
+            yield self.value()
+
+            ch = self.peek()
+            self.pos += 1
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1}")
+
+
+def is_ndjson(input_path, filename=None):
+    """
+    NDJSON is recognised by its extension, or by a first line that is a
+    complete JSON value followed by more content.
+    """
+    if (filename or input_path).rsplit('.', 1)[-1].lower() in ('ndjson', 'jsonl'):
+        return True
+
+    with common.open_text(input_path) as f:
+        first_line = f.readline(JSON_READ_SIZE)
+        if not first_line.endswith('\n'):
+            return False
+        try:
+            json.loads(first_line)
+        except ValueError:
+            return False
+        return any(line.strip() for line in iter(lambda: f.readline(JSON_READ_SIZE), ''))
+
+
+class JsonRecords:
+    """
+    The records to convert, read from the input: the top-level array, or
+    the first list-valued key of a top-level object, or one record per
+    line for NDJSON. Every iteration reads the input again, so the records
+    can be walked twice. `column` names the CSV column for non-dict
+    records; it is set once the first record has been read. Records
+    longer than `max_record_chars` raise ValueError.
+    """
+
+    def __init__(self, input_path, ndjson, max_record_chars):
+        self.input_path = input_path
+        self.ndjson = ndjson
+        self.max_record_chars = max_record_chars
+        self.column = "value"
+
+    def __iter__(self):
+        with common.open_text(self.input_path) as f:
+
+            if self.ndjson:
+                # A limited readline(), so one endless line is not read whole
+                for line in iter(lambda: f.readline(self.max_record_chars + 1), ''):
+                    if len(line) > self.max_record_chars:
+                        raise ValueError(f"NDJSON line over {self.max_record_chars} characters")
+                    if line.strip():
+                        yield json.loads(line)
+                return
+
+            reader = JsonStreamReader(f, self.max_record_chars)
+            ch = reader.peek()
+
+            if ch == '[':
+                yield from reader.items()
+                return
+
+            if ch != '{':
+                raise Exception("Unsupported JSON structure")
+
+            reader.expect('{')
+            while reader.peek() != '}':
+                key = reader.value()
+                reader.expect(':')
+
+                if reader.peek() == '[':
+                    self.column = key
+                    yield from reader.items()
+                    return
+
+                reader.value()  # skip non-list values
+                if reader.peek() == ',':
+                    reader.pos += 1
+
+            raise NotStreamable()
+
+
+# Left-out keys named in X-Dropped-Column-Names; X-Dropped-Columns has the count
+DROPPED_COLUMN_NAMES = 20
+
+
+def set_dropped_headers(response, dropped):
+    if dropped:
+        response.headers['X-Dropped-Columns'] = str(len(dropped))
+        # JSON keeps arbitrary key names ASCII-only and on one line
+        response.headers['X-Dropped-Column-Names'] = json.dumps(dropped[:DROPPED_COLUMN_NAMES])
+
+
+@bp.route('/json-to-csv', methods=['GET', 'POST'])
+def json_to_csv():
+    # error_msg = None
+    if request.method == 'POST':
+        file = request.files.get('file')
+        
+        list_mode = request.form.get('lists', 'json').lower()
+        schema = request.form.get('schema', 'full').lower()
+        separator = request.form.get('separator') or '|'
+
+        if not file or file.filename == '':
+            error_msg = "No file selected"
+        elif not common.allowed_file(file.filename):
+            error_msg = "Invalid file type. Please upload a .json file."
+        elif list_mode not in LIST_MODES:
+            error_msg = f"lists must be one of {', '.join(LIST_MODES)}."
+        elif schema not in SCHEMA_MODES:
+            error_msg = f"schema must be one of {', '.join(SCHEMA_MODES)}."
+        else:
+            cache_key = common.result_cache.key_for_upload(
+                file, 'json_to_csv', lists=list_mode, schema=schema, separator=separator
+            )
+            cached = common.send_cached(cache_key, download_name='converted_data.csv', mimetype='text/csv')
+            if cached:
+                return cached
+
+            # Generate unique filename
+            unique_id = str(uuid.uuid4())
+            ext = file.filename.rsplit('.', 1)[1].lower()
+            input_filename = f"{unique_id}.{ext}"
+
+            try:
+                # Convert straight from the spooled upload
+                with common.metrics.stage('convert'):
+                    csv_path, dropped = convert_json_to_csv(
+                        file.stream, common.output_folder, input_filename,
+                        list_mode=list_mode, schema=schema, separator=separator
+                    )
+
+                # A cache hit could not report the left-out keys
+                if not dropped:
+                    common.result_cache.put_file(cache_key, csv_path)
+
+                response = common.send_output(
+                    csv_path,
+                    download_name='converted_data.csv',
+                    mimetype='text/csv',
+                    delete=True
+                )
+                set_dropped_headers(response, dropped)
+                return response
+                
+            except Exception as e:
+                error_msg = f"Conversion Failed: {str(e)}"
+
+    return render('json_to_csv.html', error=error_msg)
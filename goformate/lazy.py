@@ -0,0 +1,132 @@
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# converter name -> modules it needs
+DEPENDENCIES = {}
+# module name -> seconds its first import took in this process
+IMPORT_SECONDS = {}
+# converter name -> seconds it took to import its blueprint module
+BLUEPRINT_SECONDS = {}
+
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is only imported on first attribute
+    access (or by warm_up), so workers never pay for converters they do
+    not serve.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    IMPORT_SECONDS.setdefault(self._name, time.perf_counter() - started)
+                    self._module = module
+
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+_modules = {}
+
+
+def lazy_import(name, converter):
+    """Returns a lazy proxy for module `name` and records it as a dependency of `converter`."""
+    with _lock:
+        deps = DEPENDENCIES.setdefault(converter, [])
+        if name not in deps:
+            deps.append(name)
+
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+
+        return module
+
+
+def warm_up(converters):
+    """Imports the dependencies of the given converters now ('all' for every one)."""
+    if 'all' in converters:
+        converters = list(DEPENDENCIES)
+
+    failed = {}
+
+    for converter in converters:
+        for name in DEPENDENCIES.get(converter, []):
+            try:
+                _modules[name]._load()
+            except Exception as e:
+                # e.g. Windows-only modules on Linux; the converter fails on use instead
+                failed[name] = str(e)
+
+    return failed
+
+
+def report():
+    """Import cost per converter, as measured in this process so far."""
+    converters = {}
+
+    for converter in BLUEPRINT_SECONDS.keys() | DEPENDENCIES.keys():
+        modules = {
+            name: (
+                round(IMPORT_SECONDS[name], 4)
+                if name in IMPORT_SECONDS else None
+            )
+            for name in DEPENDENCIES.get(converter, [])
+        }
+        converters[converter] = {
+            "blueprint_seconds": round(BLUEPRINT_SECONDS.get(converter, 0.0), 4),
+            # None = not imported yet; shared modules are charged to whoever loaded them first
+            "modules": modules,
+            "loaded": all(seconds is not None for seconds in modules.values()),
+        }
+
+    return converters
+
+
+def isolated_report():
+    """
+    Import cost of each converter's dependencies measured in a fresh
+    interpreter, so modules shared between converters are counted for
+    each of them. Slow: meant for the command line, not for requests.
+    """
+    results = {}
+
+    for converter, names in sorted(DEPENDENCIES.items()):
+        code = (
+            "import importlib, time\n"
+            "started = time.perf_counter()\n"
+            f"for name in {names!r}:\n"
+            "    importlib.import_module(name)\n"
+            "print(time.perf_counter() - started)\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True
+        )
+
+        if proc.returncode == 0:
+            results[converter] = {"seconds": round(float(proc.stdout.strip()), 4)}
+        else:
+            lines = proc.stderr.strip().splitlines()
+            results[converter] = {"error": lines[-1] if lines else "import failed"}
+
+    return results
@@ -0,0 +1,332 @@
+"""
+In-process request metrics in the Prometheus text format.
+
+Every request is timed per route (the URL rule, e.g. /pdf-jpg) and per
+stage. The stages every converter shares are:
+
+    receive   reading and spooling the multipart upload
+    save      copying an upload to disk
+    decode    parsing the input (image, PDF, ...)
+    convert   the conversion itself
+    encode    writing the output format
+    send      iterating the response body to the server
+
+`receive` and `send` are measured for every route; the others wrap the
+matching code in the converters with `metrics.stage(name)`. Streamed
+responses convert while the body is sent, so their work shows up under
+`send`.
+
+The registry only takes a lock around a few integer updates, so the
+cost per request is a handful of microseconds. Each process keeps its
+own numbers; with several worker processes every one of them answers
+/metrics for itself.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import has_request_context, request
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# The route label is kept in the WSGI environ, so it outlives the request context
+ROUTE_KEY = 'goformate.route'
+
+UNMATCHED = 'unmatched'
+BACKGROUND = 'background'
+
+
+def current_route():
+    """Route label of the current request, or 'background' outside of one."""
+    if not has_request_context():
+        return BACKGROUND
+    return request.environ.get(ROUTE_KEY, UNMATCHED)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Stage:
+    """Context manager returned by Metrics.stage()."""
+
+    __slots__ = ('metrics', 'route', 'name', 'started')
+
+    def __init__(self, metrics, name, route):
+        self.metrics = metrics
+        self.name = name
+        self.route = route
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        route = self.route or current_route()
+        self.metrics.observe(route, self.name, time.perf_counter() - self.started, error=exc_type is not None)
+        return False
+
+
+class _ResponseBody:
+    """
+    Wraps the WSGI response iterable to count the bytes sent and time
+    the `send` stage; the request is finished when the server closes it.
+    """
+
+    def __init__(self, metrics, environ, body, started, status):
+        self.metrics = metrics
+        self.environ = environ
+        self.body = body
+        self.started = started
+        self.status = status
+        self.sent = 0
+        self.failed = False
+        self.send_started = time.perf_counter()
+
+    def __iter__(self):
+        try:
+            for chunk in self.body:
+                self.sent += len(chunk)
+                yield chunk
+        except Exception:
+            self.failed = True
+            raise
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            now = time.perf_counter()
+            self.metrics.finish_request(
+                self.environ, self.status, now - self.started,
+                sent=self.sent, send_seconds=now - self.send_started, send_failed=self.failed
+            )
+
+
+class Metrics:
+    """
+    Latency histograms, byte and error counters and in-flight gauges per
+    route, rendered by render() for the /metrics endpoint.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+
+        # (route, stage) -> [count per bucket..., +Inf count, sum]
+        self._histograms = {}
+        # (route, status) -> count
+        self._requests = {}
+        # (route, stage) -> count
+        self._errors = {}
+        # route -> [received bytes, sent bytes]
+        self._bytes = {}
+        # route -> requests currently being handled
+        self._in_flight = {}
+        # (name, type, help, collect) of values owned by other components
+        self._collectors = []
+
+    # ---------------- RECORDING ----------------
+
+    def _observe(self, route, stage, seconds):
+        # Caller holds the lock
+        histogram = self._histograms.get((route, stage))
+        if histogram is None:
+            histogram = self._histograms[(route, stage)] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+    def _error(self, route, stage):
+        key = (route, stage)
+        self._errors[key] = self._errors.get(key, 0) + 1
+
+    def observe(self, route, stage, seconds, error=False):
+        """Records one `stage` of `route` that took `seconds`."""
+        with self._lock:
+            self._observe(route, stage, seconds)
+            if error:
+                self._error(route, stage)
+
+    def stage(self, name, route=None):
+        """
+        Times the block as stage `name`; an exception leaving the block
+        also counts as an error of that stage. Outside of a request (e.g.
+        in a streaming generator) pass the route explicitly.
+        """
+        return _Stage(self, name, route)
+
+    def start_request(self, environ, route):
+        """Marks a routed request as in flight (from a before_request hook)."""
+        environ[ROUTE_KEY] = route
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 0) + 1
+
+    def finish_request(self, environ, status, seconds, sent=0, send_seconds=None, send_failed=False):
+        routed = ROUTE_KEY in environ
+        route = environ.get(ROUTE_KEY, UNMATCHED)
+        code = status[0].split(' ', 1)[0] if status else '500'
+
+        try:
+            received = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            received = 0
+
+        with self._lock:
+            self._observe(route, 'request', seconds)
+            if send_seconds is not None:
+                self._observe(route, 'send', send_seconds)
+
+            key = (route, code)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            if code.startswith('5'):
+                self._error(route, 'request')
+            if send_failed:
+                self._error(route, 'send')
+
+            counts = self._bytes.get(route)
+            if counts is None:
+                counts = self._bytes[route] = [0, 0]
+            counts[0] += received
+            counts[1] += sent
+
+            if routed:
+                self._in_flight[route] -= 1
+
+    def add_collector(self, name, kind, help_text, collect):
+        """
+        Adds a metric that is read when /metrics is rendered, e.g. a queue
+        depth. `collect()` returns a list of (labels dict, value).
+        """
+        self._collectors.append((name, kind, help_text, collect))
+
+    # ---------------- FLASK / WSGI ----------------
+
+    def init_app(self, app):
+        """Hooks the registry into `app`: routes are labelled before the view runs."""
+        metrics = self
+
+        @app.before_request
+        def _start_metrics():
+            rule = request.url_rule
+            metrics.start_request(request.environ, rule.rule if rule is not None else UNMATCHED)
+
+        app.wsgi_app = self.wsgi_middleware(app.wsgi_app)
+
+    def wsgi_middleware(self, wsgi_app):
+        metrics = self
+
+        def middleware(environ, start_response):
+            started = time.perf_counter()
+            status = []
+
+            def _start_response(status_line, headers, exc_info=None):
+                status[:] = [status_line, headers]
+                return start_response(status_line, headers, exc_info)
+
+            try:
+                body = wsgi_app(environ, _start_response)
+            except Exception:
+                metrics.finish_request(environ, None, time.perf_counter() - started)
+                raise
+
+            # The server's own file wrapper (e.g. sendfile in gunicorn) must
+            # reach it unwrapped; its size comes from Content-Length instead
+            file_wrapper = environ.get('wsgi.file_wrapper')
+            if isinstance(file_wrapper, type) and isinstance(body, file_wrapper):
+                length = next((v for k, v in status[1] if k.lower() == 'content-length'), 0) if status else 0
+                metrics.finish_request(environ, status, time.perf_counter() - started, sent=int(length))
+                return body
+
+            return _ResponseBody(metrics, environ, body, started, status)
+
+        return middleware
+
+    # ---------------- EXPORT ----------------
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            requests = dict(self._requests)
+            errors = dict(self._errors)
+            transferred = {route: list(counts) for route, counts in self._bytes.items()}
+            in_flight = dict(self._in_flight)
+
+        lines = []
+
+        def histogram(name, help_text, stages):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+
+            for (route, stage), values in sorted(histograms.items()):
+                if stage not in stages:
+                    continue
+
+                labels = f'route="{_label(route)}"'
+                if stage != 'request':
+                    labels += f',stage="{_label(stage)}"'
+
+                total = 0
+                for bound, count in zip(self.buckets + (float('inf'),), values):
+                    total += count
+                    lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {total}')
+                lines.append(f"{name}_sum{{{labels}}} {_number(values[-1])}")
+                lines.append(f"{name}_count{{{labels}}} {total}")
+
+        histogram(
+            'goformate_request_duration_seconds',
+            'Time from receiving a request until its response is closed.',
+            ('request',)
+        )
+        histogram(
+            'goformate_stage_duration_seconds',
+            'Time spent per request stage (receive, save, decode, convert, encode, send).',
+            {stage for _, stage in histograms if stage != 'request'}
+        )
+
+        lines.append("# HELP goformate_requests_total Finished requests by status code.")
+        lines.append("# TYPE goformate_requests_total counter")
+        for (route, code), count in sorted(requests.items()):
+            lines.append(f'goformate_requests_total{{route="{_label(route)}",status="{code}"}} {count}')
+
+        lines.append("# HELP goformate_errors_total Failed stages, and requests answered with 5xx (stage=\"request\").")
+        lines.append("# TYPE goformate_errors_total counter")
+        for (route, stage), count in sorted(errors.items()):
+            lines.append(f'goformate_errors_total{{route="{_label(route)}",stage="{_label(stage)}"}} {count}')
+
+        lines.append("# HELP goformate_received_bytes_total Request body bytes (Content-Length).")
+        lines.append("# TYPE goformate_received_bytes_total counter")
+        for route, (received, _) in sorted(transferred.items()):
+            lines.append(f'goformate_received_bytes_total{{route="{_label(route)}"}} {received}')
+
+        lines.append("# HELP goformate_sent_bytes_total Response body bytes.")
+        lines.append("# TYPE goformate_sent_bytes_total counter")
+        for route, (_, sent) in sorted(transferred.items()):
+            lines.append(f'goformate_sent_bytes_total{{route="{_label(route)}"}} {sent}')
+
+        lines.append("# HELP goformate_requests_in_flight Requests currently being handled.")
+        lines.append("# TYPE goformate_requests_in_flight gauge")
+        for route, count in sorted(in_flight.items()):
+            lines.append(f'goformate_requests_in_flight{{route="{_label(route)}"}} {count}')
+
+        for name, kind, help_text, collect in self._collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in collect():
+                label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+import os
+import threading
+import uuid
+
+from flask import Blueprint, current_app, jsonify, request, render_template as render
+
+from . import common
+from .office_backend import check_backend, create_backend
+
+bp = Blueprint('office', __name__)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+@bp.record_once
+def _check_backend(state):
+    # Warn at startup rather than on the first conversion
+    check_backend(state.app.config)
+
+
+def get_backend():
+    """Returns the Office backend chosen by OFFICE_BACKEND, built on first use."""
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(current_app.config)
+
+    return _backend
+
+
+def convert_with_ms_office(input_path, output_dir):
+    """
+    Converts a PowerPoint presentation to PDF with the configured Office
+    backend (MS Office over COM, or the warm soffice pool).
+    """
+    return get_backend().convert(input_path, output_dir, 'presentation')
+
+
+@bp.route('/ppt-to-pdf', methods=['GET', 'POST'])
+def ppt_to_pdf():
+    if request.method == 'POST':
+        file = request.files.get('file')
+        
+        if not file or file.filename == '':
+            return "No file selected", 400
+            
+        if common.allowed_file(file.filename):
+            unique_id = str(uuid.uuid4())
+            ext = file.filename.rsplit('.', 1)[1].lower()
+            input_filename = f"{unique_id}.{ext}"
+            input_path = common.upload_path(input_filename)
+            
+            common.save_upload(file, input_path)
+            
+            try:
+                # --- CALL THE MS OFFICE FUNCTION ---
+                with common.metrics.stage('convert'):
+                    pdf_path = convert_with_ms_office(input_path, common.output_folder)
+                
+                return common.send_output(
+                    pdf_path,
+                    download_name='presentation.pdf',
+                    delete=True
+                )
+                
+            except Exception as e:
+                print(f"ERROR: {e}")
+                return f"Conversion Failed: {str(e)}", 500
+            finally:
+                if os.path.exists(input_path):
+                    os.remove(input_path)
+                    
+    return render('ppt_to_pdf.html')
+
+
+def convert_excel_to_pdf(input_path, output_dir):
+    """
+    Converts an Excel workbook to PDF with the configured Office backend.
+    """
+    return get_backend().convert(input_path, output_dir, 'spreadsheet')
+
+
+@bp.route('/excel-to-pdf', methods=['GET', 'POST'])
+def excel_to_pdf():
+    if request.method == 'POST':
+        file = request.files.get('file')
+        
+        if not file or file.filename == '':
+            return "No file selected", 400
+            
+        if common.allowed_file(file.filename):
+            unique_id = str(uuid.uuid4())
+            ext = file.filename.rsplit('.', 1)[1].lower()
+            input_filename = f"{unique_id}.{ext}"
+            input_path = common.upload_path(input_filename)
+            
+            common.save_upload(file, input_path)
+
+            if common.wants_async():
+                return common.submit_job(
+                    'excel_to_pdf',
+                    convert_excel_to_pdf, input_path, common.output_folder,
+                    download_name='spreadsheet.pdf',
+                    mimetype='application/pdf',
+                    cleanup=[input_path]
+                )
+            
+            try:
+                # --- CALL THE EXCEL FUNCTION ---
+                with common.metrics.stage('convert'):
+                    pdf_path = convert_excel_to_pdf(input_path, common.output_folder)
+                
+                return common.send_output(
+                    pdf_path,
+                    download_name='spreadsheet.pdf',
+                    delete=True
+                )
+                
+            except Exception as e:
+                print(f"ERROR: {e}")
+                return f"Conversion Failed: {str(e)}", 500
+            finally:
+                if os.path.exists(input_path):
+                    os.remove(input_path)
+                    
+    return render('excel_to_pdf.html')
+
+
+def convert_docx_to_pdf(input_path, output_dir):
+    """
+    Converts DOCX → PDF with the configured Office backend.
+    """
+    return get_backend().convert(input_path, output_dir, 'document')
+
+
+@bp.route('/docx-to-pdf', methods=['GET', 'POST'])
+def docx_to_pdf():
+    if request.method == 'POST':
+        file = request.files.get('file')
+
+        if not file or file.filename == '':
+            return "No file selected", 400
+
+        if file.filename.lower().endswith('.docx'):
+
+            unique_id = str(uuid.uuid4())
+            input_path = common.upload_path(f"{unique_id}.docx")
+
+            output_path = common.output_path(f"{unique_id}.pdf")
+
+            common.save_upload(file, input_path)
+
+            if common.wants_async():
+                return common.submit_job(
+                    'docx_to_pdf',
+                    convert_docx_to_pdf, input_path, common.output_folder,
+                    download_name='converted.pdf',
+                    mimetype='application/pdf',
+                    cleanup=[input_path]
+                )
+
+            try:
+                with common.metrics.stage('convert'):
+                    pdf_path = convert_docx_to_pdf(input_path, common.output_folder)
+
+                return common.send_output(
+                    pdf_path,
+                    download_name='converted.pdf',
+                    mimetype='application/pdf',
+                    delete=True
+                )
+
+            except Exception as e:
+                return f"Conversion error: {e}", 500
+
+            finally:
+                if os.path.exists(input_path):
+                    os.remove(input_path)
+
+    return render('docx_to_pdf.html')
+
+
+@bp.route('/office-stats')
+def office_stats():
+    """Backend in use and, for the soffice pool, worker usage and failures."""
+    return jsonify(get_backend().stats())
@@ -0,0 +1,535 @@
+"""
+Office document → PDF backends.
+
+MsOfficeBackend drives PowerPoint, Excel and Word over COM (Windows only).
+SofficePool keeps warm headless LibreOffice processes and reuses them
+across requests (Linux and anywhere else soffice is installed).
+"""
+import atexit
+import importlib.util
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+
+from .lazy import lazy_import
+
+# Windows only: Microsoft Office over COM
+comtypes_client = lazy_import('comtypes.client', 'office')
+pythoncom = lazy_import('pythoncom', 'office')
+
+# LibreOffice's Python bridge, shipped with LibreOffice itself
+uno = lazy_import('uno', 'office')
+
+class OfficeTimeout(Exception):
+    """A conversion ran longer than the pool's per-job timeout."""
+
+
+def pdf_path_for(input_path, output_dir):
+    """Absolute path of the PDF written for `input_path`."""
+    base_name = os.path.basename(input_path)
+    filename_no_ext = os.path.splitext(base_name)[0]
+    return os.path.abspath(os.path.join(output_dir, f"{filename_no_ext}.pdf"))
+
+
+class OfficeBackend:
+    """Converts an office document to PDF and returns the PDF path."""
+
+    name = None
+
+    def convert(self, input_path, output_dir, kind):
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.name}
+
+    def close(self):
+        pass
+
+
+# ---------------- MICROSOFT OFFICE (COM) ----------------
+
+class MsOfficeBackend(OfficeBackend):
+    """
+    Uses Microsoft Office to convert the file to PDF.
+    Requires MS Office to be installed on the server/machine.
+    Each job launches the application and quits it afterwards.
+    """
+
+    name = 'msoffice'
+
+    def convert(self, input_path, output_dir, kind):
+        # MS Office requires ABSOLUTE paths.
+        # Relative paths (like 'uploads/file.ppt') will fail.
+        abs_input_path = os.path.abspath(input_path)
+        abs_output_path = pdf_path_for(input_path, output_dir)
+
+        # Initialize COM library (Critical for Flask threading)
+        pythoncom.CoInitialize()
+
+        try:
+            if kind == 'presentation':
+                self._powerpoint(abs_input_path, abs_output_path)
+            elif kind == 'spreadsheet':
+                self._excel(abs_input_path, abs_output_path)
+            else:
+                self._word(abs_input_path, abs_output_path)
+
+            return abs_output_path
+
+        finally:
+            # Uninitialize COM
+            pythoncom.CoUninitialize()
+
+    def _powerpoint(self, abs_input_path, abs_output_path):
+        powerpoint = None
+        presentation = None
+
+        try:
+            powerpoint = comtypes_client.CreateObject("PowerPoint.Application")
+
+            # WithWindow=False prevents the window from popping up visibly
+            presentation = powerpoint.Presentations.Open(abs_input_path, WithWindow=False)
+
+            # 32 is the file format ID for PDF in Microsoft Office
+            presentation.SaveAs(abs_output_path, 32)
+
+        except Exception as e:
+            raise Exception(f"MS Office Error: {e}")
+
+        finally:
+            if presentation:
+                presentation.Close()
+            if powerpoint:
+                powerpoint.Quit()
+
+    def _excel(self, abs_input_path, abs_output_path):
+        excel = None
+        workbook = None
+
+        try:
+            excel = comtypes_client.CreateObject("Excel.Application")
+            excel.Visible = False # Run in background
+            excel.DisplayAlerts = False # Disable popups like "Overwrite file?"
+
+            workbook = excel.Workbooks.Open(abs_input_path)
+
+            # 0 represents 'xlTypePDF' in the Excel Object Model
+            # Using ExportAsFixedFormat is more reliable for PDF than SaveAs in Excel
+            workbook.ExportAsFixedFormat(0, abs_output_path)
+
+        except Exception as e:
+            raise Exception(f"Excel Error: {e}")
+
+        finally:
+            if workbook:
+                workbook.Close(SaveChanges=False) # Close without saving changes to the Excel file
+            if excel:
+                excel.Quit()
+
+    def _word(self, abs_input_path, abs_output_path):
+        word = None
+        doc = None
+
+        try:
+            word = comtypes_client.CreateObject("Word.Application")
+            word.Visible = False
+            word.DisplayAlerts = 0
+
+            doc = word.Documents.Open(abs_input_path)
+
+            # 17 = wdFormatPDF
+            doc.SaveAs(abs_output_path, FileFormat=17)
+
+        except Exception as e:
+            raise Exception(f"Word conversion error: {e}")
+
+        finally:
+            if doc:
+                doc.Close(False)
+            if word:
+                word.Quit()
+
+
+# ---------------- LIBREOFFICE (soffice) ----------------
+
+# PDF export filter per document kind
+SOFFICE_FILTERS = {
+    'presentation': 'impress_pdf_Export',
+    'spreadsheet': 'calc_pdf_Export',
+    'document': 'writer_pdf_Export',
+}
+
+
+def _file_url(path):
+    return urllib.parse.urljoin("file:", urllib.request.pathname2url(os.path.abspath(path)))
+
+
+# Without LibreOffice's Python bridge the pool cannot talk to a running
+# soffice, which is the usual case in a virtualenv or pyenv interpreter
+COLD_CLI_WARNING = (
+    "WARNING: the LibreOffice 'uno' module cannot be imported, so the soffice "
+    "pool runs in cold CLI mode: every Office conversion starts a new soffice "
+    "process. Run the app with a Python that has python3-uno (or LibreOffice's "
+    "bundled python) to keep soffice warm, or set OFFICE_REQUIRE_WARM_POOL to "
+    "refuse to start without it."
+)
+
+
+def uno_available():
+    return importlib.util.find_spec('uno') is not None
+
+
+class SofficeWorker:
+    """
+    One headless soffice process with its own user profile.
+
+    With the `uno` module available the process stays up and documents are
+    loaded into it over a named pipe. Without it, every job starts a cold
+    `soffice --convert-to` process (reusing only the worker's profile), so
+    there is nothing to keep warm, health-check or recycle.
+    """
+
+    def __init__(self, soffice, profile_dir, use_uno, startup_timeout):
+        self.soffice = soffice
+        self.profile_dir = profile_dir
+        self.use_uno = use_uno
+        self.startup_timeout = startup_timeout
+
+        self.pipe_name = f"goformate-{uuid.uuid4().hex}"
+        self.proc = None
+        self.desktop = None
+        # Jobs run by the current process, for recycling
+        self.jobs = 0
+
+    def _base_args(self):
+        return [
+            self.soffice,
+            "--headless", "--invisible", "--nologo", "--norestore",
+            "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={_file_url(self.profile_dir)}",
+        ]
+
+    # ---------------- LIFECYCLE ----------------
+
+    @property
+    def running(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        self.jobs = 0
+
+        if not self.use_uno:
+            return
+
+        self.proc = subprocess.Popen(
+            self._base_args() + [
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+
+        while True:
+            try:
+                self._connect()
+                return
+            except Exception:
+                if self.proc.poll() is not None:
+                    raise Exception(f"soffice exited during startup (code {self.proc.returncode})")
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise Exception("soffice did not start in time")
+                time.sleep(0.25)
+
+    def _connect(self):
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        ctx = resolver.resolve(
+            f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+        )
+        self.desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx
+        )
+
+    def healthy(self):
+        """True if the process is up and answers over the bridge."""
+        if not self.use_uno:
+            return True
+
+        if not self.running or self.desktop is None:
+            return False
+
+        try:
+            self.desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                # Bridge already gone; the process is killed below
+                pass
+            self.desktop = None
+
+        if self.proc is not None:
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            self.proc = None
+
+    # ---------------- CONVERT ----------------
+
+    def convert(self, input_path, output_path, kind, timeout):
+        self.jobs += 1
+
+        if self.use_uno:
+            self._convert_uno(input_path, output_path, kind, timeout)
+        else:
+            self._convert_cli(input_path, output_path, timeout)
+
+    def _properties(self, **values):
+        props = []
+        for name, value in values.items():
+            prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+            prop.Name = name
+            prop.Value = value
+            props.append(prop)
+        return tuple(props)
+
+    def _convert_uno(self, input_path, output_path, kind, timeout):
+        timed_out = threading.Event()
+
+        def kill():
+            # A stuck document blocks the bridge call; killing the process
+            # makes it fail and the pool restarts this worker.
+            timed_out.set()
+            if self.proc is not None:
+                self.proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+
+        doc = None
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                _file_url(input_path), "_blank", 0,
+                self._properties(Hidden=True, ReadOnly=True)
+            )
+            if doc is None:
+                raise Exception("soffice could not open the document")
+
+            doc.storeToURL(
+                _file_url(output_path),
+                self._properties(FilterName=SOFFICE_FILTERS[kind])
+            )
+
+        except Exception as e:
+            if timed_out.is_set():
+                raise OfficeTimeout(f"Office conversion timed out after {timeout}s")
+            raise Exception(f"soffice error: {e}")
+
+        finally:
+            timer.cancel()
+            if doc is not None and not timed_out.is_set():
+                try:
+                    doc.close(True)
+                except Exception:
+                    pass
+
+    def _convert_cli(self, input_path, output_path, timeout):
+        output_dir = os.path.dirname(output_path)
+
+        try:
+            proc = subprocess.run(
+                self._base_args() + [
+                    "--convert-to", "pdf", "--outdir", output_dir, input_path
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise OfficeTimeout(f"Office conversion timed out after {timeout}s")
+
+        if proc.returncode != 0 or not os.path.exists(output_path):
+            message = proc.stderr.decode(errors="replace").strip()
+            raise Exception(f"soffice error: {message or f'exit code {proc.returncode}'}")
+
+
+class SofficePool(OfficeBackend):
+    """
+    Pool of `size` warm soffice workers shared by all request threads.
+
+    A job waits at most `acquire_timeout` seconds for a free worker.
+    Workers are health-checked before each job, restarted when they die or
+    time out, and recycled after `max_jobs` jobs so leaks in long-lived
+    office processes stay bounded.
+
+    Without `uno` the workers only bound concurrency (cold CLI mode, see
+    COLD_CLI_WARNING); with `require_warm` the pool refuses to run that way.
+    """
+
+    name = 'soffice'
+
+    def __init__(self, soffice='soffice', size=2, max_jobs=50, job_timeout=120,
+                 acquire_timeout=30, startup_timeout=30, profile_folder='office-profiles',
+                 require_warm=False):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self.soffice = shutil.which(soffice) or soffice
+        self.use_uno = uno_available()
+
+        if not self.use_uno:
+            if require_warm:
+                raise Exception("OFFICE_REQUIRE_WARM_POOL is set, but the 'uno' module cannot be imported")
+
+        # Profiles are per process and slot; two soffice instances must never share one
+        self.profile_root = os.path.join(os.path.abspath(profile_folder), str(os.getpid()))
+
+        # LIFO hands out the most recently used (warmest) worker first
+        self._idle = queue.LifoQueue()
+        self._workers = []
+        for slot in range(size):
+            worker = SofficeWorker(
+                self.soffice,
+                os.path.join(self.profile_root, str(slot)),
+                self.use_uno,
+                startup_timeout
+            )
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        self._lock = threading.Lock()
+        self._counters = {"jobs": 0, "failures": 0, "timeouts": 0, "restarts": 0, "recycled": 0}
+
+        atexit.register(self.close)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def convert(self, input_path, output_dir, kind):
+        abs_input_path = os.path.abspath(input_path)
+        abs_output_path = pdf_path_for(input_path, output_dir)
+
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise Exception(f"All {self.size} office workers are busy, try again later")
+
+        try:
+            if worker.proc is not None:
+                if worker.jobs >= self.max_jobs:
+                    worker.stop()
+                    self._count("recycled")
+                elif not worker.healthy():
+                    print(f"Office worker unhealthy, restarting (pid {worker.proc.pid})")
+                    worker.stop()
+                    self._count("restarts")
+
+            if not worker.running:
+                worker.start()
+
+            self._count("jobs")
+            worker.convert(abs_input_path, abs_output_path, kind, self.job_timeout)
+            return abs_output_path
+
+        except OfficeTimeout:
+            self._count("failures")
+            self._count("timeouts")
+            worker.stop()
+            raise
+
+        except Exception:
+            self._count("failures")
+            raise
+
+        finally:
+            self._idle.put(worker)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+
+        idle = self._idle.qsize()
+
+        return {
+            "backend": self.name,
+            # 'cold-cli': no process is kept running between jobs
+            "mode": "uno" if self.use_uno else "cold-cli",
+            "warm": self.use_uno,
+            "size": self.size,
+            "idle": idle,
+            "busy": self.size - idle,
+            "running": sum(1 for worker in self._workers if worker.running),
+            "max_jobs": self.max_jobs,
+            "job_timeout": self.job_timeout,
+            **counters,
+        }
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+        shutil.rmtree(self.profile_root, ignore_errors=True)
+
+
+def check_backend(config):
+    """
+    Startup check of OFFICE_BACKEND, before the pool is built on first
+    use: a soffice pool that would run in cold CLI mode is reported, or
+    refused with OFFICE_REQUIRE_WARM_POOL.
+    """
+    name = config['OFFICE_BACKEND']
+    if name == 'auto':
+        name = 'msoffice' if os.name == 'nt' else 'soffice'
+
+    if name != 'soffice' or uno_available():
+        return
+
+    if config['OFFICE_REQUIRE_WARM_POOL']:
+        raise Exception("OFFICE_REQUIRE_WARM_POOL is set, but the 'uno' module cannot be imported")
+    print(COLD_CLI_WARNING)
+
+
+def create_backend(config):
+    """Builds the backend named by OFFICE_BACKEND ('auto' picks one for this platform)."""
+    name = config['OFFICE_BACKEND']
+
+    if name == 'auto':
+        name = 'msoffice' if os.name == 'nt' else 'soffice'
+
+    if name == 'msoffice':
+        return MsOfficeBackend()
+
+    if name == 'soffice':
+        return SofficePool(
+            soffice=config['SOFFICE_PATH'],
+            size=config['OFFICE_POOL_SIZE'],
+            max_jobs=config['OFFICE_MAX_JOBS_PER_PROCESS'],
+            job_timeout=config['OFFICE_JOB_TIMEOUT'],
+            acquire_timeout=config['OFFICE_ACQUIRE_TIMEOUT'],
+            startup_timeout=config['OFFICE_STARTUP_TIMEOUT'],
+            profile_folder=config['OFFICE_PROFILE_FOLDER'],
+            require_warm=config['OFFICE_REQUIRE_WARM_POOL']
+        )
+
+    raise ValueError(f"Unknown OFFICE_BACKEND: {name}")
@@ -0,0 +1,199 @@
+import math
+import os
+import tempfile
+import uuid
+from io import BytesIO
+
+from flask import Blueprint, current_app, request, render_template as render, send_file
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('pdf_docx', __name__)
+
+fitz = lazy_import('fitz', 'pdf_docx')
+pdf2docx = lazy_import('pdf2docx', 'pdf_docx')
+
+
+# ---------------- PDF → DOCX (PAGE RANGES, PARALLEL) ----------------
+
+def parse_docx_batch(pdf_path, page_indexes, json_path):
+    """
+    Pool worker: parses the layout of a batch of pages and serializes it
+    to `json_path`, to be merged into one DOCX by the parent process.
+    """
+    cv = pdf2docx.Converter(pdf_path)
+
+    try:
+        settings = cv.default_settings
+        cv.load_pages(pages=page_indexes)
+        cv.parse_document(**settings).parse_pages(**settings).serialize(json_path)
+    finally:
+        cv.close()
+
+
+def open_pdf_converter(pdf_source):
+    """pdf2docx Converter for a PDF path or an in-memory buffer."""
+    if isinstance(pdf_source, str):
+        return pdf2docx.Converter(pdf_source)
+    return pdf2docx.Converter(stream=pdf_source)
+
+
+def convert_pdf_to_docx_pages(pdf_source, docx_path, pages_spec='', parallel='auto'):
+    """
+    Converts the selected pages of a PDF to DOCX.
+
+    pdf_source is a path or a buffer (common.upload_buffer); docx_path a
+    path or a writable file object.
+    parallel: 'auto' splits large selections across the process pool,
+    a true value always does, anything else converts in this process.
+    """
+    if isinstance(pdf_source, str):
+        pdf_document = fitz.open(pdf_source)
+    else:
+        pdf_document = fitz.open(stream=pdf_source)
+
+    with pdf_document:
+        page_count = len(pdf_document)
+
+    page_indexes = common.parse_page_ranges(pages_spec, page_count)
+
+    if parallel == 'auto':
+        parallel = len(page_indexes) >= current_app.config['PDF_DOCX_PARALLEL_MIN_PAGES']
+    elif isinstance(parallel, str):
+        parallel = parallel.lower() in ('1', 'true', 'yes')
+
+    workers = min(common.PDF_RENDER_WORKERS, len(page_indexes))
+
+    if not parallel or workers < 2:
+        cv = open_pdf_converter(pdf_source)
+        try:
+            cv.convert(docx_path, pages=page_indexes)
+        finally:
+            cv.close()
+        return docx_path
+
+    # Pool workers open the PDF by path
+    pdf_path = pdf_source
+    if not isinstance(pdf_source, str):
+        pdf_path = common.upload_path(f"{uuid.uuid4()}.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_source)
+
+    # Contiguous page batches, one per worker
+    batch_size = math.ceil(len(page_indexes) / workers)
+    batches = [
+        page_indexes[i:i + batch_size]
+        for i in range(0, len(page_indexes), batch_size)
+    ]
+    json_paths = [
+        os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.json")
+        for _ in batches
+    ]
+
+    pool = common.get_render_pool()
+
+    try:
+        futures = [
+            pool.submit(parse_docx_batch, pdf_path, batch, json_path)
+            for batch, json_path in zip(batches, json_paths)
+        ]
+        for future in futures:
+            future.result()
+
+        # Merge the parsed pages and build the DOCX once
+        cv = pdf2docx.Converter(pdf_path)
+        try:
+            for json_path in json_paths:
+                cv.deserialize(json_path)
+            cv.make_docx(docx_path, **cv.default_settings)
+        finally:
+            cv.close()
+
+    finally:
+        for json_path in json_paths:
+            if os.path.exists(json_path):
+                os.remove(json_path)
+
+        if pdf_path is not pdf_source and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+    return docx_path
+
+
+@bp.route('/pdf-to-docx', methods=['GET', 'POST'])
+def pdf_to_docx():
+
+    if request.method == 'POST':
+
+        file = request.files.get('file')
+
+        if not file or file.filename == '':
+            return "No file selected", 400
+
+        if file and file.filename.lower().endswith('.pdf'):
+
+            # e.g. pages=1-3,7 ; preview=1 converts only the first page
+            pages_spec = request.values.get('pages', '').strip()
+            if request.values.get('preview'):
+                pages_spec = '1'
+            parallel = request.values.get('parallel', 'auto')
+
+            cache_key = common.result_cache.key_for_upload(file, 'pdf_to_docx', pages=pages_spec)
+
+            if common.wants_async():
+                return submit_pdf_to_docx_job(file, cache_key, pages_spec, parallel)
+
+            cached = common.send_cached(cache_key, download_name='converted.docx')
+            if cached:
+                return cached
+
+            # The upload is converted from memory; nothing is saved first
+            docx_buffer = BytesIO()
+
+            try:
+                with common.metrics.stage('convert'):
+                    convert_pdf_to_docx_pages(common.upload_buffer(file), docx_buffer, pages_spec, parallel)
+
+                common.result_cache.put_bytes(cache_key, docx_buffer.getvalue())
+
+                docx_buffer.seek(0)
+                return send_file(
+                    docx_buffer,
+                    as_attachment=True,
+                    download_name='converted.docx'
+                )
+
+            except ValueError as e:
+                return f"Conversion error: {e}", 400
+
+            except Exception as e:
+                return f"Conversion error: {e}", 500
+
+    return render('pdf_to_docx.html')
+
+
+# ---------------- ASYNC JOBS ----------------
+
+def run_pdf_to_docx(pdf_path, docx_path, cache_key=None, pages_spec='', parallel='auto'):
+    if not common.from_cache(cache_key, docx_path):
+        convert_pdf_to_docx_pages(pdf_path, docx_path, pages_spec, parallel)
+
+        if cache_key:
+            common.result_cache.put_file(cache_key, docx_path)
+
+    return docx_path
+
+
+def submit_pdf_to_docx_job(file, cache_key, pages_spec='', parallel='auto'):
+    unique_id = str(uuid.uuid4())
+    pdf_path = common.upload_path(f"{unique_id}.pdf")
+    docx_path = common.output_path(f"{unique_id}.docx")
+    common.save_upload(file, pdf_path)
+
+    return common.submit_job(
+        'pdf_to_docx',
+        run_pdf_to_docx, pdf_path, docx_path, cache_key, pages_spec, parallel,
+        download_name='converted.docx',
+        cleanup=[pdf_path]
+    )
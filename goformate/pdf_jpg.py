@@ -0,0 +1,508 @@
+import os
+import struct
+import uuid
+import zipfile
+import zlib
+from collections import deque
+from io import BytesIO
+
+from flask import Blueprint, current_app, request, render_template as render, redirect, url_for, flash, Response
+from werkzeug.utils import secure_filename
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('pdf_jpg', __name__)
+
+fitz = lazy_import('fitz', 'pdf_jpg')
+Image = lazy_import('PIL.Image', 'pdf_jpg')
+
+# ---------------- RENDER OPTIONS ----------------
+
+# format value -> file extension
+RENDER_FORMATS = {
+    'jpg': 'jpg',
+    'jpeg': 'jpg',
+    'png': 'png',
+    'webp': 'webp',
+}
+
+RENDER_MIN_DPI = 36
+
+# JPEG/WebP quality unless one is given
+RENDER_QUALITY = 95
+THUMBNAIL_QUALITY = 70
+
+# WebP cannot encode larger images
+WEBP_MAX_SIDE = 16383
+
+
+def render_options(values, config):
+    """
+    Reads dpi, format (jpg, png, webp), quality, grayscale and thumbnail
+    from request values. Thumbnails ignore dpi and are scaled so their
+    longest side is PDF_JPG_THUMBNAIL_SIZE pixels.
+    Raises ValueError for anything out of range.
+    """
+    fmt = str(values.get('format', 'jpg')).lower()
+    if fmt not in RENDER_FORMATS:
+        raise ValueError("format must be jpg, png or webp")
+
+    thumbnail = str(values.get('thumbnail', '')).lower() in ('1', 'on', 'true', 'yes')
+
+    try:
+        dpi = int(values.get('dpi') or config['PDF_JPG_DPI'])
+        quality = int(values.get('quality') or (THUMBNAIL_QUALITY if thumbnail else RENDER_QUALITY))
+    except (TypeError, ValueError):
+        raise ValueError("dpi and quality must be integers")
+
+    if not RENDER_MIN_DPI <= dpi <= config['PDF_JPG_MAX_DPI']:
+        raise ValueError(f"dpi must be between {RENDER_MIN_DPI} and {config['PDF_JPG_MAX_DPI']}")
+    if not 1 <= quality <= 100:
+        raise ValueError("quality must be between 1 and 100")
+
+    return {
+        'format': RENDER_FORMATS[fmt],
+        'dpi': dpi,
+        'quality': quality,
+        'grayscale': str(values.get('grayscale', '')).lower() in ('1', 'on', 'true', 'yes'),
+        'thumbnail': config['PDF_JPG_THUMBNAIL_SIZE'] if thumbnail else 0,
+    }
+
+
+# 2x zoom JPEGs, as before the options existed
+DEFAULT_OPTIONS = {'format': 'jpg', 'dpi': 144, 'quality': RENDER_QUALITY, 'grayscale': False, 'thumbnail': 0}
+
+# ---------------- PAGE RENDERING ----------------
+
+def encode_pixmap(pix, options):
+    """JPEG, PNG or WebP bytes of a pixmap (RGB or gray, no alpha)."""
+    fmt = options['format']
+
+    if fmt == 'jpg':
+        return pix.tobytes('jpg', jpg_quality=options['quality'])
+
+    if fmt == 'png':
+        return pix.tobytes('png')
+
+    if max(pix.width, pix.height) > WEBP_MAX_SIDE:
+        raise ValueError(f"WebP images are limited to {WEBP_MAX_SIDE} px, lower the dpi")
+
+    mode = 'L' if pix.n == 1 else 'RGB'
+    # Shares the pixmap's memory instead of copying the samples
+    img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, 'raw', mode, pix.stride, 1)
+
+    buffer = BytesIO()
+    img.save(buffer, format='WEBP', quality=options['quality'], method=4)
+    return buffer.getvalue()
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def encode_png_strips(width, height, gray, strips):
+    """
+    One PNG from horizontal strip pixmaps, compressed as they arrive, so
+    the raster of the whole page never exists at once.
+    """
+    chunks = [
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0 if gray else 2, 0, 0, 0)),
+    ]
+    compressor = zlib.compressobj(6)
+
+    for pix in strips:
+        samples = pix.samples_mv
+        stride = pix.stride
+
+        # Every scanline starts with its filter type (0 = none)
+        rows = b''.join(
+            b'\x00' + samples[offset:offset + stride]
+            for offset in range(0, stride * pix.height, stride)
+        )
+        data = compressor.compress(rows)
+        if data:
+            chunks.append(_png_chunk(b'IDAT', data))
+
+    chunks.append(_png_chunk(b'IDAT', compressor.flush()))
+    chunks.append(_png_chunk(b'IEND', b''))
+    return b''.join(chunks)
+
+
+def render_page_images(page, options, max_pixmap_bytes):
+    """
+    Renders one page and returns [(name suffix, image bytes)].
+
+    Pages whose raster would exceed `max_pixmap_bytes` are rendered in
+    horizontal strips from one display list. PNG strips are joined into
+    a single image; JPEG and WebP strips come out as separate
+    "_part_N" images.
+    """
+    if options['thumbnail']:
+        # Fast path: one small pixmap whatever the page size
+        scale = options['thumbnail'] / max(page.rect.width, page.rect.height)
+    else:
+        scale = options['dpi'] / 72
+
+    matrix = fitz.Matrix(scale, scale)
+    colorspace = fitz.csGRAY if options['grayscale'] else fitz.csRGB
+
+    bbox = (page.rect * matrix).irect
+    row_bytes = bbox.width * colorspace.n
+
+    if row_bytes * bbox.height <= max_pixmap_bytes:
+        pix = page.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=False)
+        return [("", encode_pixmap(pix, options))]
+
+    rows_per_strip = max(1, max_pixmap_bytes // row_bytes)
+    if options['format'] == 'webp':
+        rows_per_strip = min(rows_per_strip, WEBP_MAX_SIDE)
+
+    display_list = page.get_displaylist()
+
+    def strips():
+        for top in range(bbox.y0, bbox.y1, rows_per_strip):
+            bottom = min(top + rows_per_strip, bbox.y1)
+            # The clip is in page space; whole pixel rows map back exactly
+            clip = fitz.Rect(bbox.x0 / scale, top / scale, bbox.x1 / scale, bottom / scale)
+            yield display_list.get_pixmap(matrix=matrix, colorspace=colorspace, alpha=False, clip=clip)
+
+    if options['format'] == 'png':
+        return [("", encode_png_strips(bbox.width, bbox.height, options['grayscale'], strips()))]
+
+    return [
+        (f"_part_{index}", encode_pixmap(pix, options))
+        for index, pix in enumerate(strips(), start=1)
+    ]
+
+
+def page_image_names(base_filename, page_num, images, options):
+    """ZIP entry names for the images of one page (0-based page_num)."""
+    ext = options['format']
+    return [
+        (f"{base_filename}_page_{page_num + 1}{suffix}.{ext}", data)
+        for suffix, data in images
+    ]
+
+# --- Conversion & Zipping Logic ---
+
+def convert_pdf_to_jpg_and_zip(pdf_path, zip_filepath, pages_spec='', options=None, max_pixmap_bytes=None,
+                               base_filename=None):
+
+    """
+    Converts PDF pages to images and stores them in a ZIP file, one page
+    at a time in this process. `pages_spec` selects pages ("1-3,5");
+    entries are named after `base_filename` (default: the PDF's name).
+    """
+
+    options = options or DEFAULT_OPTIONS
+    max_pixmap_bytes = max_pixmap_bytes or current_app.config['PDF_JPG_MAX_PIXMAP_BYTES']
+
+    try:
+
+        pdf_document = fitz.open(pdf_path)
+
+        base_filename = base_filename or os.path.splitext(
+            os.path.basename(pdf_path)
+        )[0]
+
+        pages = common.parse_page_ranges(pages_spec, len(pdf_document))
+
+        # Image data is already compressed, so entries are stored as-is
+        with zipfile.ZipFile(
+            zip_filepath,
+            'w',
+            zipfile.ZIP_STORED
+        ) as zipf:
+
+            for page_num in pages:
+
+                page = pdf_document.load_page(page_num)
+                images = render_page_images(page, options, max_pixmap_bytes)
+
+                for name, data in page_image_names(base_filename, page_num, images, options):
+                    zipf.writestr(name, data)
+
+        pdf_document.close()
+
+        return True
+
+    except Exception as e:
+
+        print(f"Conversion error: {e}")
+
+        flash(
+            f"❌ Conversion failed: {e}",
+            "error"
+        )
+
+        return False
+
+
+# ---------------- PDF → JPG (PARALLEL, STREAMED) ----------------
+
+# Pages are rendered in a process pool and the encoded image bytes are
+# written straight into a ZIP that is streamed to the client, so no
+# per-page temp files are created.
+
+
+def render_pdf_page(pdf_path, page_num, options, max_pixmap_bytes):
+    """
+    Renders a single PDF page and returns [(name suffix, image bytes)].
+    Runs inside a pool worker.
+    """
+    doc = common.open_worker_document(pdf_path)
+    return render_page_images(doc.load_page(page_num), options, max_pixmap_bytes)
+
+
+def stream_pdf_as_jpg_zip(pdf_path, pages, base_filename, options, max_pixmap_bytes, cache_key=None):
+    """
+    Yields a ZIP archive of the selected pages (0-based indexes) as
+    images, chunk by chunk, as soon as each page has been rendered.
+    Pages are submitted to the pool in a bounded window so
+    finished-but-unsent pages stay few.
+    With a cache_key the streamed bytes are also stored in the result
+    cache once the archive is complete.
+    The uploaded PDF is removed when the stream ends (and by
+    common.remove_with_response if it never starts).
+    """
+    pool = common.get_render_pool()
+    window = common.PDF_RENDER_WORKERS * 2
+    pending = deque()
+    queue = deque(pages)
+    sink = common.ZipStream()
+
+    cache_path = None
+    cache_file = None
+    if cache_key:
+        cache_path = common.result_cache.pending_path(cache_key)
+        cache_file = open(cache_path, 'wb')
+
+    def emit():
+        data = sink.drain()
+        if cache_file:
+            cache_file.write(data)
+        return data
+
+    try:
+        # Image data is already compressed, so entries are stored as-is
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+
+            while queue or pending:
+
+                while queue and len(pending) < window:
+                    page_num = queue.popleft()
+                    future = pool.submit(render_pdf_page, pdf_path, page_num, options, max_pixmap_bytes)
+                    pending.append((page_num, future))
+
+                page_num, future = pending.popleft()
+
+                for name, data in page_image_names(base_filename, page_num, future.result(), options):
+                    zipf.writestr(name, data)
+                    yield emit()
+
+        # Central directory
+        yield emit()
+
+        if cache_file:
+            cache_file.close()
+            common.result_cache.commit(cache_key, cache_path)
+            cache_file = None
+
+    except Exception as e:
+        print(f"Conversion error: {e}")
+        # Abort the response so the client sees a truncated download
+        raise
+
+    finally:
+        for _, future in pending:
+            future.cancel()
+        common.release_worker_documents(pdf_path)
+
+        if cache_file:
+            # Incomplete archive (error or client went away)
+            cache_file.close()
+            common.result_cache.discard(cache_path)
+
+        try:
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+        except OSError:
+            # Still held open by a worker (Windows), retry later
+            common.delete_file_later(pdf_path)
+
+
+def stream_pdf_to_jpg(file, pages_spec, options):
+    """Saves the upload under a unique name and streams the image ZIP back."""
+    filename = secure_filename(file.filename)
+    base_filename = os.path.splitext(filename)[0]
+    zip_filename = f"{base_filename}_images.zip"
+
+    # Page names inside the ZIP depend on the upload name
+    cache_key = common.result_cache.key_for_upload(
+        file, 'pdf_to_jpg', base_filename=base_filename, pages=pages_spec, **options
+    )
+    cached = common.send_cached(cache_key, download_name=zip_filename, mimetype='application/zip')
+    if cached:
+        return cached
+
+    pdf_filepath = common.upload_path(f"{uuid.uuid4()}.pdf")
+    common.save_upload(file, pdf_filepath)
+
+    # Open once here so broken PDFs and bad page ranges fail before streaming starts
+    try:
+        with common.metrics.stage('decode'), fitz.open(pdf_filepath) as pdf_document:
+            pages = common.parse_page_ranges(pages_spec, len(pdf_document))
+    except Exception as e:
+        print(f"Conversion error: {e}")
+        flash(f"❌ Conversion failed: {e}", "error")
+        os.remove(pdf_filepath)
+        return redirect(url_for('pdf_jpg.pdf_to_jpg'))
+
+    response = Response(
+        stream_pdf_as_jpg_zip(
+            pdf_filepath, pages, base_filename, options,
+            current_app.config['PDF_JPG_MAX_PIXMAP_BYTES'], cache_key=cache_key
+        ),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename="{zip_filename}"'
+        }
+    )
+    return common.remove_with_response(response, [pdf_filepath])
+
+
+@bp.route("/pdf-to-jpg")
+def pdf_to_jpg():
+    return render("pdf_to_jpg.html")
+
+@bp.route('/pdf-jpg', methods=['GET', 'POST'])
+def convert_pdf():
+    """
+    Renders PDF pages to images in a ZIP. Options: `dpi`, `format` (jpg,
+    png, webp), `quality` (JPEG/WebP), `grayscale`, `pages` (e.g.
+    "1-3,5") and `thumbnail` (small previews at a fixed size).
+    """
+    if request.method == 'POST':
+        # Check if file exists in request
+        if 'file' not in request.files:
+            flash("No file part in the request.", "error")
+            return redirect(request.url)
+
+        file = request.files['file']
+
+        if file.filename == '':
+            flash("No selected file.", "error")
+            return redirect(request.url)
+
+        if file and common.allowed_file(file.filename):
+            try:
+                options = render_options(request.values, current_app.config)
+            except ValueError as e:
+                flash(f"❌ {e}", "error")
+                return redirect(url_for('pdf_jpg.pdf_to_jpg'))
+
+            pages_spec = request.values.get('pages', '').strip()
+
+            if common.wants_async():
+                return submit_pdf_to_jpg_job(file, pages_spec, options)
+
+            mode = request.form.get('mode', current_app.config['PDF_JPG_MODE'])
+
+            if mode == 'stream':
+                return stream_pdf_to_jpg(file, pages_spec, options)
+
+            # 1. Securely save the uploaded PDF
+            filename = secure_filename(file.filename)
+
+            # 2. Define output paths
+            base_filename = os.path.splitext(filename)[0]
+            zip_filename = f"{base_filename}_images.zip"
+            # Unique on disk; removed once the download is finished
+            zip_filepath = common.output_path(f"{uuid.uuid4()}.zip")
+
+            cache_key = common.result_cache.key_for_upload(
+                file, 'pdf_to_jpg', base_filename=base_filename, mode='file', pages=pages_spec, **options
+            )
+            cached = common.send_cached(cache_key, download_name=zip_filename, mimetype='application/zip')
+            if cached:
+                return cached
+
+            # Unique on disk, so uploads with the same name do not collide
+            pdf_filepath = common.upload_path(f"{uuid.uuid4()}.pdf")
+            common.save_upload(file, pdf_filepath)
+
+            # 3. Perform the conversion and zipping
+            with common.metrics.stage('convert'):
+                converted = convert_pdf_to_jpg_and_zip(
+                    pdf_filepath, zip_filepath, pages_spec, options, base_filename=base_filename
+                )
+
+            if converted:
+                common.result_cache.put_file(cache_key, zip_filepath)
+
+                # 4. Clean up the uploaded PDF file
+                os.remove(pdf_filepath)
+
+                # 5. Send the zipped images for download
+                return common.send_output(
+                    zip_filepath,
+                    download_name=zip_filename,
+                    mimetype='application/zip',
+                    delete=True
+                )
+            else:
+                # If conversion failed, clean up the uploaded file and redirect
+                if os.path.exists(pdf_filepath):
+                    os.remove(pdf_filepath)
+                if os.path.exists(zip_filepath):
+                    os.remove(zip_filepath)
+                return redirect(url_for('pdf_jpg.pdf_to_jpg'))
+
+        # Path for disallowed file extension (if someone tries to upload non-pdf)
+        flash("Disallowed file type. Only PDF is allowed.", "error")
+        return redirect(request.url)
+
+    return render("pdf_to_jpg.html")
+
+
+# ---------------- ASYNC JOBS ----------------
+
+def run_pdf_to_jpg(pdf_path, zip_path, base_filename, cache_key=None, pages_spec='', options=None):
+    if common.from_cache(cache_key, zip_path):
+        return zip_path
+
+    with fitz.open(pdf_path) as pdf_document:
+        pages = common.parse_page_ranges(pages_spec, len(pdf_document))
+
+    with open(zip_path, 'wb') as f:
+        for chunk in stream_pdf_as_jpg_zip(
+            pdf_path, pages, base_filename, options or DEFAULT_OPTIONS,
+            current_app.config['PDF_JPG_MAX_PIXMAP_BYTES'], cache_key=cache_key
+        ):
+            f.write(chunk)
+
+    return zip_path
+
+
+def submit_pdf_to_jpg_job(file, pages_spec='', options=None):
+    options = options or DEFAULT_OPTIONS
+    filename = secure_filename(file.filename)
+    base_filename = os.path.splitext(filename)[0]
+    cache_key = common.result_cache.key_for_upload(
+        file, 'pdf_to_jpg', base_filename=base_filename, pages=pages_spec, **options
+    )
+
+    unique_id = str(uuid.uuid4())
+    pdf_path = common.upload_path(f"{unique_id}.pdf")
+    zip_path = common.output_path(f"{unique_id}.zip")
+    common.save_upload(file, pdf_path)
+
+    return common.submit_job(
+        'pdf_to_jpg',
+        run_pdf_to_jpg, pdf_path, zip_path, base_filename, cache_key, pages_spec, options,
+        download_name=f"{base_filename}_images.zip",
+        mimetype='application/zip',
+        cleanup=[pdf_path]
+    )
@@ -0,0 +1,454 @@
+import hashlib
+import json
+import os
+import uuid
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+
+from flask import Blueprint, Response, current_app, jsonify, request, render_template as render, send_file
+
+from . import common
+from .lazy import lazy_import
+
+bp = Blueprint('qr', __name__)
+
+qrcode = lazy_import('qrcode', 'qr')
+qrcode_svg = lazy_import('qrcode.image.svg', 'qr')
+pyzbar = lazy_import('pyzbar.pyzbar', 'qr')
+Image = lazy_import('PIL.Image', 'qr')
+cv2 = lazy_import('cv2', 'qr')
+np = lazy_import('numpy', 'qr')
+fitz = lazy_import('fitz', 'qr')
+
+
+@bp.route('/qr')
+def QR():
+    """Render the main page."""
+    return render('qr.html')
+
+# ---------------- GENERATE ----------------
+
+# Bump when the rendering changes, so clients drop their cached codes
+QR_RENDER_VERSION = 1
+
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def qr_options(values):
+    """
+    Reads error_correction (L/M/Q/H), box_size, border and format from
+    request values. Raises ValueError for anything out of range.
+    """
+    error_correction = str(values.get('error_correction', 'L')).upper()
+    if error_correction not in ('L', 'M', 'Q', 'H'):
+        raise ValueError("error_correction must be one of L, M, Q, H")
+
+    try:
+        box_size = int(values.get('box_size', 10))
+        border = int(values.get('border', 4))
+    except (TypeError, ValueError):
+        raise ValueError("box_size and border must be integers")
+
+    if not 1 <= box_size <= 50:
+        raise ValueError("box_size must be between 1 and 50")
+    if not 0 <= border <= 20:
+        raise ValueError("border must be between 0 and 20")
+
+    fmt = str(values.get('format', 'png')).lower()
+    if fmt not in QR_FORMATS:
+        raise ValueError("format must be png or svg")
+
+    return error_correction, box_size, border, fmt
+
+
+def qr_etag(data, error_correction, box_size, border, fmt):
+    """Strong ETag derived from the inputs, so it is known before rendering."""
+    key = f"{QR_RENDER_VERSION}\0{error_correction}\0{box_size}\0{border}\0{fmt}\0{data}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def build_qr(data, error_correction='L', box_size=10, border=4, fmt='png'):
+    """Renders a QR code and returns the encoded PNG or SVG bytes (memoized)."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}"),
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if fmt == 'svg':
+        # One <path> for all modules
+        img = qr.make_image(image_factory=qrcode_svg.SvgPathImage)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
+
+    # Save image to a memory buffer (BytesIO) instead of disk
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+@bp.route('/generate', methods=['GET', 'POST'])
+def generate_qr():
+    """
+    Generates a QR code from the provided text data.
+    Returns the image directly as a response stream.
+    GET requests can be cached by browsers and CDNs; both methods answer
+    If-None-Match with 304 Not Modified.
+    """
+    data = request.values.get('data', '')
+    
+    if not data:
+        return "No data provided", 400
+
+    try:
+        options = qr_options(request.values)
+    except ValueError as e:
+        return str(e), 400
+
+    etag = qr_etag(data, *options)
+    fmt = options[3]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        try:
+            with common.metrics.stage('encode'):
+                image = build_qr(data, *options)
+        except (ValueError, qrcode.exceptions.DataOverflowError):
+            return "Data too long for a QR code", 400
+
+        response = send_file(
+            BytesIO(image),
+            mimetype=QR_FORMATS[fmt],
+            as_attachment=False,
+            download_name=f'qrcode.{fmt}'
+        )
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+
+def build_qr_batch_item(args):
+    """Pool worker: (index, data, options) -> (index, bytes or None, error)."""
+    index, data, options = args
+    try:
+        return index, build_qr(data, *options), None
+    except Exception as e:
+        return index, None, f"{type(e).__name__}: {e}"
+
+
+@bp.route('/generate-batch', methods=['POST'])
+def generate_qr_batch():
+    """
+    Builds one QR code per payload and returns them as a ZIP, with a
+    manifest.json mapping file names to payloads. Payloads come as a JSON
+    body {"payloads": [...], "format": ..., ...} or as a newline-separated
+    `payloads` form field; options are the same as for /generate.
+    """
+    body = request.get_json(silent=True)
+
+    if isinstance(body, dict):
+        payloads = body.get('payloads')
+        values = {key: value for key, value in body.items() if key != 'payloads'}
+    else:
+        payloads = request.values.get('payloads', '').splitlines()
+        values = request.values
+
+    if not isinstance(payloads, list) or not all(isinstance(p, str) for p in payloads):
+        return jsonify({"error": "payloads must be a list of strings"}), 400
+
+    payloads = [p for p in payloads if p]
+    max_payloads = current_app.config['QR_BATCH_MAX']
+
+    if not payloads:
+        return jsonify({"error": "No payloads provided"}), 400
+    if len(payloads) > max_payloads:
+        return jsonify({"error": f"At most {max_payloads} payloads per batch"}), 400
+
+    try:
+        options = qr_options(values)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    fmt = options[3]
+    jobs = [(index, data, options) for index, data in enumerate(payloads)]
+
+    # Small batches are not worth the round trip to the worker processes
+    if len(jobs) < current_app.config['QR_BATCH_PARALLEL_MIN']:
+        results = map(build_qr_batch_item, jobs)
+    else:
+        chunksize = max(1, len(jobs) // (common.PDF_RENDER_WORKERS * 4))
+        results = common.get_render_pool().map(build_qr_batch_item, jobs, chunksize=chunksize)
+
+    manifest = []
+    buffer = BytesIO()
+
+    # PNGs are already compressed; SVG text shrinks well
+    compression = zipfile.ZIP_DEFLATED if fmt == 'svg' else zipfile.ZIP_STORED
+
+    with zipfile.ZipFile(buffer, 'w', compression) as zipf:
+        for index, image, error in results:
+            entry = {"data": payloads[index]}
+
+            if image is None:
+                entry["error"] = error
+            else:
+                entry["file"] = f"qr_{index + 1:05d}.{fmt}"
+                zipf.writestr(entry["file"], image)
+
+            manifest.append(entry)
+
+        zipf.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+    buffer.seek(0)
+    return send_file(buffer, mimetype='application/zip', as_attachment=True, download_name='qrcodes.zip')
+
+# ---------------- SCAN ----------------
+
+# Longest image side of the pyramid levels tried before full size
+QR_SCAN_LEVELS = (800, 1600, 2400)
+# Larger images are only scanned at full size with thorough=1
+QR_SCAN_FULL_MAX = 3200
+
+_decoder = None
+
+
+def decode_codes(gray):
+    """
+    Decodes every code in a grayscale uint8 array. Uses zbar through
+    pyzbar (QR and barcodes); when the zbar library is not installed it
+    falls back to OpenCV's QR detector. Returns (type, text, polygon).
+    """
+    global _decoder
+
+    if _decoder is None:
+        try:
+            pyzbar.decode
+            _decoder = 'zbar'
+        except ImportError as e:
+            print(f"QR scan: {e}, using OpenCV's QR detector")
+            _decoder = 'opencv'
+
+    if _decoder == 'zbar':
+        return [
+            (
+                code.type,
+                code.data.decode("utf-8", errors="replace"),
+                [(point.x, point.y) for point in code.polygon],
+            )
+            for code in pyzbar.decode(gray)
+        ]
+
+    found, texts, points, _ = cv2.QRCodeDetector().detectAndDecodeMulti(gray)
+    if not found:
+        return []
+
+    return [
+        ("QRCODE", text, [tuple(point) for point in polygon.tolist()])
+        for text, polygon in zip(texts, points)
+        if text
+    ]
+
+
+def _same_code(a, b):
+    """True if two results are the same code found at two pyramid levels."""
+    if a["data"] != b["data"]:
+        return False
+    ra, rb = a["rect"], b["rect"]
+    dx = (ra["left"] + ra["width"] / 2) - (rb["left"] + rb["width"] / 2)
+    dy = (ra["top"] + ra["height"] / 2) - (rb["top"] + rb["height"] / 2)
+    return abs(dx) <= max(ra["width"], rb["width"]) and abs(dy) <= max(ra["height"], rb["height"])
+
+
+def scan_gray(gray, thorough=False, scale=1.0):
+    """
+    Scans a grayscale image from coarse to fine. Each pyramid level is
+    decoded as is and adaptively thresholded; the scan stops once a level
+    finds no codes beyond those already seen, unless `thorough`.
+    Coordinates are multiplied by `scale` (e.g. to turn rendered PDF
+    pixels into points).
+    """
+    height, width = gray.shape[:2]
+    longest = max(height, width)
+
+    sizes = [size for size in QR_SCAN_LEVELS if size < longest]
+    if thorough or longest <= QR_SCAN_FULL_MAX:
+        sizes.append(longest)
+
+    codes = []
+
+    for size in sizes:
+        factor = size / longest
+        if factor < 1:
+            level = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        else:
+            level = gray
+
+        # Thresholding evens out shadows and glare on phone photos
+        block = max(11, (min(level.shape[:2]) // 30) | 1)
+        binary = cv2.adaptiveThreshold(
+            level, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block, 5
+        )
+
+        new_codes = 0
+
+        for code_type, text, polygon in decode_codes(level) + decode_codes(binary):
+            polygon = [(round(x / factor * scale, 1), round(y / factor * scale, 1)) for x, y in polygon]
+            xs = [x for x, _ in polygon]
+            ys = [y for _, y in polygon]
+            code = {
+                "type": code_type,
+                "data": text,
+                "rect": {
+                    "left": min(xs),
+                    "top": min(ys),
+                    "width": round(max(xs) - min(xs), 1),
+                    "height": round(max(ys) - min(ys), 1),
+                },
+                "polygon": polygon,
+            }
+            if not any(_same_code(code, seen) for seen in codes):
+                codes.append(code)
+                new_codes += 1
+
+        if codes and not new_codes and not thorough:
+            break
+
+    return codes
+
+
+def read_gray_image(data):
+    """Decodes upload bytes to a grayscale array (EXIF rotation applied)."""
+    gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    if gray is None:
+        # Formats OpenCV does not read, e.g. GIF
+        gray = np.asarray(Image.open(BytesIO(data)).convert("L"))
+
+    return gray
+
+
+def scan_pdf_page(pdf_path, page_num, dpi, thorough):
+    """Pool worker: rasterizes one PDF page in gray and scans it. Positions are in points."""
+    doc = common.open_worker_document(pdf_path)
+    pix = doc.load_page(page_num).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+
+    gray = np.frombuffer(pix.samples, np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    return scan_gray(gray, thorough, scale=72 / dpi)
+
+
+def scan_pdf(pdf_path, pages, dpi, thorough):
+    """Scans the selected pages on the process pool; returns codes tagged with their page."""
+    pool = common.get_render_pool()
+    futures = [
+        (page_num, pool.submit(scan_pdf_page, pdf_path, page_num, dpi, thorough))
+        for page_num in pages
+    ]
+
+    codes = []
+    try:
+        for page_num, future in futures:
+            for code in future.result():
+                codes.append({"page": page_num + 1, **code})
+    finally:
+        for _, future in futures:
+            future.cancel()
+        common.release_worker_documents(pdf_path)
+
+    return codes
+
+
+@bp.route('/scan', methods=['POST'])
+def scan_qr():
+    """
+    Receives an uploaded image or PDF, finds every QR code / barcode in
+    it and returns them as JSON with their bounding boxes (pixels for
+    images, points for PDF pages). PDFs accept `pages` (e.g. "1-3,5");
+    `thorough=1` tries every pyramid level instead of stopping early.
+    """
+    if 'qr_image' not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files['qr_image']
+    
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+
+    thorough = request.values.get('thorough', '').lower() in ('1', 'true', 'yes')
+    data = common.upload_buffer(file)
+
+    if data[:5] == b'%PDF-' or file.filename.lower().endswith('.pdf'):
+        return scan_pdf_upload(data, thorough)
+
+    try:
+        with common.metrics.stage('decode'):
+            gray = read_gray_image(data)
+    except Exception as e:
+        return jsonify({"error": f"Could not read image: {e}"}), 400
+
+    try:
+        with common.metrics.stage('convert'):
+            codes = scan_gray(gray, thorough)
+    except Exception as e:
+        return jsonify({"error": f"Error processing image: {e}"}), 500
+
+    return jsonify({
+        "count": len(codes),
+        "units": "px",
+        "width": gray.shape[1],
+        "height": gray.shape[0],
+        "codes": codes,
+    })
+
+
+def scan_pdf_upload(data, thorough):
+    pdf_path = common.upload_path(f"{uuid.uuid4()}.pdf")
+
+    with open(pdf_path, 'wb') as f:
+        f.write(data)
+
+    try:
+        try:
+            with common.metrics.stage('decode'), fitz.open(pdf_path) as doc:
+                page_count = len(doc)
+        except Exception as e:
+            return jsonify({"error": f"Could not read PDF: {e}"}), 400
+
+        try:
+            pages = common.parse_page_ranges(request.values.get('pages', ''), page_count)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        max_pages = current_app.config['QR_SCAN_MAX_PAGES']
+        if len(pages) > max_pages:
+            return jsonify({"error": f"At most {max_pages} pages per scan, use `pages`"}), 400
+
+        try:
+            with common.metrics.stage('convert'):
+                codes = scan_pdf(pdf_path, pages, current_app.config['QR_SCAN_PDF_DPI'], thorough)
+        except Exception as e:
+            return jsonify({"error": f"Error processing PDF: {e}"}), 500
+
+        return jsonify({
+            "count": len(codes),
+            "units": "pt",
+            "pages": page_count,
+            "scanned_pages": [page_num + 1 for page_num in pages],
+            "codes": codes,
+        })
+
+    finally:
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            # Still held open by a worker (Windows), retry later
+            common.delete_file_later(pdf_path)
@@ -0,0 +1,207 @@
+"""
+Measured text layout for ReportLab canvases.
+
+Lines are broken with the real glyph widths of the font instead of a
+characters-per-line estimate. A document is laid out once into per-page
+lists of drawing operations, which are then drawn in a single pass.
+"""
+from functools import lru_cache
+
+from .lazy import lazy_import
+
+pdfmetrics = lazy_import('reportlab.pdfbase.pdfmetrics', 'cv')
+
+# font name -> {char: width at font size 1}
+_glyph_widths = {}
+
+
+def _char_width(char, font_name):
+    widths = _glyph_widths.get(font_name)
+    if widths is None:
+        widths = _glyph_widths.setdefault(font_name, {})
+
+    width = widths.get(char)
+    if width is None:
+        width = widths[char] = pdfmetrics.stringWidth(char, font_name, 1)
+
+    return width
+
+
+@lru_cache(maxsize=16384)
+def _word_width(word, font_name):
+    # Standard fonts are not kerned, so a word is the sum of its glyphs
+    return sum(_char_width(char, font_name) for char in word)
+
+
+def text_width(text, font_name, font_size):
+    """Width of `text` in points, from the memoized glyph widths."""
+    if len(text) <= 32:
+        return _word_width(text, font_name) * font_size
+    return sum(_char_width(char, font_name) for char in text) * font_size
+
+
+def fit_font_size(text, font_name, font_size, max_width, min_size):
+    """Largest size up to `font_size` (but not below `min_size`) at which `text` fits."""
+    width = text_width(text, font_name, 1)
+    if width * font_size <= max_width or width == 0:
+        return font_size
+    return max(min_size, max_width / width)
+
+
+def wrap_text(text, font_name, font_size, max_width):
+    """
+    Greedy line breaking on measured widths. Words wider than the line
+    are broken between characters.
+    """
+    space = _char_width(" ", font_name) * font_size
+    lines = []
+    line = []
+    line_width = 0.0
+
+    for word in text.split():
+        width = text_width(word, font_name, font_size)
+
+        if width > max_width:
+            # Flush the current line and hard-break the long word
+            if line:
+                lines.append(" ".join(line))
+                line, line_width = [], 0.0
+
+            chunk = ""
+            chunk_width = 0.0
+            for char in word:
+                char_width = _char_width(char, font_name) * font_size
+                if chunk and chunk_width + char_width > max_width:
+                    lines.append(chunk)
+                    chunk, chunk_width = "", 0.0
+                chunk += char
+                chunk_width += char_width
+
+            line, line_width = [chunk], chunk_width
+            continue
+
+        if line and line_width + space + width > max_width:
+            lines.append(" ".join(line))
+            line, line_width = [], 0.0
+
+        line_width += (space if line else 0.0) + width
+        line.append(word)
+
+    if line:
+        lines.append(" ".join(line))
+
+    return lines
+
+
+class PageLayout:
+    """Per-page lists of drawing operations, filled by Columns."""
+
+    def __init__(self):
+        self.pages = [[]]
+
+    def page(self, index):
+        while len(self.pages) <= index:
+            self.pages.append([])
+        return self.pages[index]
+
+    def text(self, page, x, y, text, font_name, font_size, color):
+        self.page(page).append((x, y, text, font_name, font_size, color))
+
+    def draw(self, c, before_page=None):
+        """
+        Draws every page onto canvas `c`. `before_page(c, index)` can add
+        page decoration (backgrounds, running headers) first.
+        """
+        font = None
+        color = None
+
+        for index, ops in enumerate(self.pages):
+            if index:
+                c.showPage()
+                font = color = None
+
+            if before_page:
+                before_page(c, index)
+                # The callback may have changed the graphics state
+                font = color = None
+
+            for x, y, text, font_name, font_size, fill in ops:
+                if (font_name, font_size) != font:
+                    c.setFont(font_name, font_size)
+                    font = (font_name, font_size)
+                if fill is not color:
+                    c.setFillColor(fill)
+                    color = fill
+                c.drawString(x, y, text)
+
+
+class Column:
+    """
+    A column of text at `x` with a fixed width that continues on the next
+    page when it reaches `bottom`. It starts at `top` on its first page
+    and at `continued_top` on later pages, where the heading of the
+    current section is repeated with " (Cont.)".
+    """
+
+    def __init__(self, layout, x, width, top, bottom, continued_top, page=0):
+        self.layout = layout
+        self.x = x
+        self.width = width
+        self.bottom = bottom
+        self.continued_top = continued_top
+        self.page = page
+        self.y = top
+        self.section = None
+
+    def new_page(self):
+        self.page += 1
+        self.y = self.continued_top
+
+        if self.section:
+            title, font_name, font_size, leading, color = self.section
+            self.layout.text(self.page, self.x, self.y, f"{title} (Cont.)", font_name, font_size, color)
+            self.y -= leading
+
+    def ensure(self, height):
+        """Moves to the next page unless `height` points are left."""
+        if self.y - height < self.bottom:
+            self.new_page()
+
+    def space(self, height):
+        self.y -= height
+
+    def line(self, text, font_name, font_size, leading, color, indent=0):
+        if self.y < self.bottom:
+            self.new_page()
+
+        if text:
+            self.layout.text(self.page, self.x + indent, self.y, text, font_name, font_size, color)
+        self.y -= leading
+
+    def heading(self, title, font_name, font_size, leading, color, keep=0):
+        """Starts a section; it stays with the next `keep` points of content."""
+        self.section = None
+        self.ensure(leading + keep)
+        self.section = (title, font_name, font_size, leading, color)
+        self.line(title, font_name, font_size, leading, color)
+
+    def paragraphs(self, text, font_name, font_size, leading, color, indent=0):
+        """Wraps each newline-separated paragraph; blank ones leave an empty line."""
+        for paragraph in text.split("\n"):
+            if paragraph.strip():
+                for ln in wrap_text(paragraph, font_name, font_size, self.width - indent):
+                    self.line(ln, font_name, font_size, leading, color, indent)
+            else:
+                self.line("", font_name, font_size, leading, color, indent)
+
+    def bullet(self, text, font_name, font_size, leading, color, indent=0):
+        """A "• " item whose wrapped lines hang under its first word."""
+        prefix = u"• "
+        hang = text_width(prefix, font_name, font_size)
+        lines = wrap_text(text, font_name, font_size, self.width - indent - hang)
+
+        for i, ln in enumerate(lines):
+            if i == 0:
+                self.line(prefix + ln, font_name, font_size, leading, color, indent)
+            else:
+                self.line(ln, font_name, font_size, leading, color, indent + hang)
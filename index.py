@@ -1,1272 +1,21 @@
-from flask import Flask, request, render_template as render, send_file, redirect, url_for, flash
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.colors import HexColor, black, white
-from reportlab.lib.utils import ImageReader
-from io import BytesIO
-from PIL import Image, ImageDraw
-from textwrap import wrap
-from werkzeug.utils import secure_filename
-from PIL import Image
-from fpdf import FPDF
-import os
-import zipfile
-from pdf2image import convert_from_path
-from werkzeug.utils import secure_filename
-from io import BytesIO
-import yt_dlp
-import uuid
-import comtypes.client
-import pythoncom 
-import qrcode
-from io import BytesIO
-from pyzbar.pyzbar import decode
-from PIL import Image
-import tempfile
-from pdf2docx import Converter
-import pandas as pd
 import json
-import fitz
-import tempfile
-from flask import after_this_request
 import os
-import uuid
-import json
-import zipfile
-import tempfile
-import threading
-from flask import Flask, request, send_file
-from werkzeug.utils import secure_filename
-import io
-
-app = Flask(__name__)
-app.secret_key = 'super_secret_key_for_flash'
-
-import os
-import time
-import threading
-
-def delete_file_later(filepath, delay=120):
-    """
-    Deletes a file after a delay.
-    
-    delay=120 means 2 minutes
-    """
-
-    def delete():
-
-        time.sleep(delay)
-
-        try:
-
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                print(f"Deleted: {filepath}")
-
-        except Exception as e:
-            print(f"Delete Error: {e}")
-
-    threading.Thread(target=delete).start()
-
-def make_circular_image(file_stream, size_px):
-    """Crops an image into a circle, resizes it, and returns a ReportLab ImageReader."""
-    try:
-        img = Image.open(file_stream).convert("RGBA")
-        # crop to square
-        min_side = min(img.size)
-        left = (img.width - min_side) // 2
-        top = (img.height - min_side) // 2
-        img = img.crop((left, top, left + min_side, top + min_side))
-        img = img.resize((size_px, size_px), Image.LANCZOS)
-
-        mask = Image.new("L", (size_px, size_px), 0)
-        d = ImageDraw.Draw(mask)
-        d.ellipse((0, 0, size_px - 1, size_px - 1), fill=255)
-
-        out = Image.new("RGBA", (size_px, size_px))
-        out.paste(img, (0, 0), mask=mask)
-
-        # optional white border
-        border = Image.new("RGBA", (size_px, size_px))
-        bd = ImageDraw.Draw(border)
-        bd.ellipse((1, 1, size_px - 2, size_px - 2), outline=(255, 255, 255, 255), width=3)
-        out = Image.alpha_composite(out, border)
-
-        b = BytesIO()
-        out.save(b, format="PNG")
-        b.seek(0)
-        return ImageReader(b)
-    except Exception:
-        return None
-
-def draw_wrapped(canvas_obj, x, y, text, max_width, font_name="Helvetica", font_size=10, leading=14):
-    """Draws wrapped text onto the canvas."""
-    canvas_obj.setFont(font_name, font_size)
-    lines = []
-    
-    # Calculate approx chars per line based on font size and max width
-    approx_chars = max(30, int(max_width / (font_size * 0.55)))
-    
-    for paragraph in text.split("\n"):
-        if paragraph.strip():
-            # Use textwrap to split the paragraph into lines
-            for ln in wrap(paragraph, width=approx_chars):
-                lines.append(ln)
-        # Handle explicit newlines/empty paragraphs for spacing
-        else:
-            lines.append("")
-            
-    for ln in lines:
-        canvas_obj.drawString(x, y, ln)
-        y -= leading
-    return y
-
-@app.route('/')
-def home():
-    # Placeholder to serve the main HTML file
-    return render("index.html")
-
-@app.route('/form')
-def form():
-    # Placeholder to serve the form HTML file
-    return render("form.html")
-
-@app.route('/generate-pdf', methods=['POST'])
-def generate_pdf():
-    # Collect fields
-    name = request.form.get("name", "Your Name")
-    title = request.form.get("title", "Job Title")
-    profile = request.form.get("profile_text", "A brief professional summary...")
-    experiences = request.form.get("experiences", "")
-    education = request.form.get("education", "")
-    skills = request.form.get("skills", "")
-    languages = request.form.get("languages", "")
-    hobbies = request.form.get("hobbies", "")
-    phone = request.form.get("phone", "")
-    email = request.form.get("email", "")
-    address = request.form.get("address", "")
-
-    # Profile image processing
-    profile_file = request.files.get("photo")
-    image_reader = None
-    if profile_file and profile_file.filename:
-        image_reader = make_circular_image(profile_file.stream, 120)
-    
-    # Create PDF
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # Colors and layout constants
-    blue = HexColor("#2C3E50")  # Dark professional blue
-    light_gray = HexColor("#F5F7FA")
-    left_col_w = 190
-    margin = 40
-    
-    # --- New Top Section Layout (Name, Title, Image) ---
-    
-    img_size = 120
-    img_x = margin
-    # Define top content start Y coordinate (40 pts from top margin)
-    y_start = height - margin 
-    img_y = y_start - img_size - 10 
-    
-    # 1. Image placement (top-left)
-    if image_reader:
-        c.drawImage(image_reader, img_x, img_y, width=img_size, height=img_size, mask='auto')
-
-    # 2. Name and Title (next to image)
-    name_x = img_x + img_size + 20
-    name_y = img_y + img_size - 35 # Align slightly below top of image
-    
-    c.setFillColor(blue) # Use dark blue for the name
-    c.setFont("Helvetica-Bold", 32)
-    c.drawString(name_x, name_y, name)
-    
-    name_y -= 30
-    c.setFont("Helvetica", 16)
-    c.drawString(name_x, name_y, title)
-    
-    # New Y position for subsequent main content blocks (below the image area)
-    content_y_start = img_y - 30 
-    
-    # --- Left Column Background (Sidebar) ---
-    left_col_end_y = margin
-    c.setFillColor(light_gray)
-    # The gray rect starts from the new content Y position
-    c.rect(margin, left_col_end_y, left_col_w - margin + 10, content_y_start - left_col_end_y, fill=1, stroke=0)
-
-    # --- Left Column Content ---
-    left_x = margin + 10
-    current_y = content_y_start - 10 # Start content inside the gray box
-    leading = 16 # Increased vertical spacing in left column
-    
-    # CONTACT block (left)
-    c.setFillColor(blue)
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(left_x, current_y, "CONTACT")
-    c.setFillColor(black)
-    current_y -= leading
-    c.setFont("Helvetica", 10)
-    if phone: c.drawString(left_x, current_y, phone); current_y -= leading
-    if email: c.drawString(left_x, current_y, email); current_y -= leading
-    if address:
-        current_y -= 4
-        # draw_wrapped is used with increased leading
-        current_y = draw_wrapped(c, left_x, current_y, address, left_col_w - 30, font_size=9, leading=14) 
-    
-    current_y -= 15
-
-    # SKILLS block
-    c.setFont("Helvetica-Bold", 12)
-    c.setFillColor(blue)
-    c.drawString(left_x, current_y, "SKILLS")
-    current_y -= leading
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-    for s in [s.strip() for s in skills.split(",") if s.strip()]:
-        c.drawString(left_x + 6, current_y, u"• " + s)
-        current_y -= leading
-
-    current_y -= 10
-
-    # LANGUAGES block
-    c.setFont("Helvetica-Bold", 12)
-    c.setFillColor(blue)
-    c.drawString(left_x, current_y, "LANGUAGES")
-    current_y -= leading
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-    for ln in [l.strip() for l in languages.split(",") if l.strip()]:
-        c.drawString(left_x + 6, current_y, u"• " + ln)
-        current_y -= leading
-
-    current_y -= 10
-
-    # HOBBIES block
-    c.setFont("Helvetica-Bold", 12)
-    c.setFillColor(blue)
-    c.drawString(left_x, current_y, "HOBBIES")
-    current_y -= leading
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-    for h in [h.strip() for h in hobbies.split(",") if h.strip()]:
-        c.drawString(left_x + 6, current_y, u"• " + h)
-        current_y -= leading
-
-    # --- Right Column Main Content ---
-    right_x = left_col_w + 30
-    right_w = width - right_x - margin
-    leading_r = 16 # Increased vertical spacing in right column
-
-    # PROFILE (right) - Aligned with the start of the left column content
-    cur_y = content_y_start - 10 
-    
-    c.setFillColor(blue)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(right_x, cur_y, "PROFILE")
-    cur_y -= leading_r
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-    # Use draw_wrapped for the profile section
-    cur_y = draw_wrapped(c, right_x, cur_y, profile, right_w, font_size=10, leading=14)
-    cur_y -= 15
-
-    # WORK EXPERIENCE
-    c.setFillColor(blue)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(right_x, cur_y, "WORK EXPERIENCE")
-    cur_y -= leading_r
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-
-    # Parse experiences
-    exp_blocks = []
-    raw_blocks = [b.strip() for b in experiences.split("\n\n") if b.strip()]
-    for b in raw_blocks:
-        lines = [l for l in b.split("\n") if l.strip()]
-        if not lines: continue
-        title_line = lines[0]
-        company_dates = lines[1] if len(lines) > 1 else ""
-        bullets = lines[2:] if len(lines) > 2 else []
-        exp_blocks.append((title_line, company_dates, bullets))
-
-    for (job, company_dates, bullets) in exp_blocks:
-        # Job title bold
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(right_x, cur_y, job)
-        cur_y -= 14 # Space down for the next line
-
-        # Company / dates
-        if company_dates:
-            c.setFont("Helvetica", 9)
-            # Use draw_wrapped for company/dates in case it's long
-            cur_y = draw_wrapped(c, right_x, cur_y, company_dates, right_w, font_size=9, leading=12)
-            cur_y += 1 # Correction from draw_wrapped's automatic leading step
-        
-        # bullets
-        c.setFont("Helvetica", 10)
-        bullet_x = right_x + 8
-        bullet_w = right_w - 8
-        bullet_leading = 14 # Bullet leading
-        
-        for bt in bullets:
-            # Re-implementing wrapping for bullet points for better control
-            lines = []
-            approx_chars = max(30, int(bullet_w / (10 * 0.55))) # 10 is font size
-            for ln in wrap(bt, width=approx_chars):
-                lines.append(ln)
-
-            first = True
-            for bl in lines:
-                prefix = u"• " if first else "  " # Indent subsequent lines
-                c.drawString(bullet_x, cur_y, prefix + bl)
-                cur_y -= bullet_leading
-                first = False
-
-        cur_y -= 18 # Increased vertical spacing between experience blocks
-
-        # Basic page overflow check (simplified, only checks against bottom margin)
-        if cur_y < margin + 60:
-            c.showPage()
-            # Reset Y position for new page
-            cur_y = height - margin - 10 # Start content lower than top margin
-            c.setFillColor(blue)
-            c.setFont("Helvetica-Bold", 14)
-            # Add a small header/title on continuation pages
-            c.drawString(margin, height - 30, f"{name} - Continuation")
-            c.drawString(right_x, cur_y, "WORK EXPERIENCE (Cont.)")
-            cur_y -= leading_r
-            c.setFillColor(black)
-            c.setFont("Helvetica", 10)
-
-    # EDUCATION
-    c.setFillColor(blue)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(right_x, cur_y, "EDUCATION")
-    cur_y -= leading_r
-    c.setFillColor(black)
-    c.setFont("Helvetica", 10)
-    
-    for line in [l for l in education.split("\n") if l.strip()]:
-        # Each education line may be "Degree - Institution (dates)"
-        cur_y = draw_wrapped(c, right_x, cur_y, line, right_w, font_size=10, leading=14)
-        cur_y -= 6
-
-    # Finish and save
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-
-    return send_file(buffer, as_attachment=True,
-                     download_name=f"{name.replace(' ', '_')}_Resume.pdf",
-                     mimetype="application/pdf")
-
-
-# Set a safe directory for uploads
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-# Define allowed extensions
-ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'pdf', 'docx', 'ppt', 'pptx', 'ico', 'png', 'csv', 'xlsx', 'xls', 'json'}
-
-def allowed_file(filename):
-    """Checks if the file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-# --- Conversion Logic ---
-
-def convert_jpg_to_pdf(jpg_path, pdf_path):
-    """
-    Converts a single JPG image to a PDF file using Pillow and fpdf2, 
-    matching the PDF page size to the image size.
-    """
-    try:
-        # 1. Open the image
-        img = Image.open(jpg_path)
-        width_px, height_px = img.size
-
-        # 2. Initialize PDF object with custom size (in points, 1pt = 1/72 inch)
-        pdf = FPDF(unit='pt', format=[width_px, height_px]) 
-        pdf.add_page()
-        
-        # 3. Add the image to the PDF, covering the entire page
-        # w and h are set to the full page dimensions (width_px, height_px)
-        pdf.image(jpg_path, x=0, y=0, w=width_px, h=height_px)
-
-        # 4. Output the PDF file
-        pdf.output(pdf_path)
-        return True
-    except Exception as e:
-        print(f"Conversion error: {e}")
-        return False
-
-
-@app.route('/jpg-to-pdf')
-def jpg_to_pdf():
-    return render('jpg_to_pdf.html')
-
-@app.route('/jpgtopdf', methods=['POST'])
-def jpgToPdf():
-    
-    if request.method == 'POST':
-        # Check if the post request has the file part
-        if 'file' not in request.files:
-            return redirect(request.url)
-        
-        file = request.files['file']
-        
-        # If user does not select file, browser also submits an empty part
-        if file.filename == '':
-            return redirect(request.url)
-        
-        if file and allowed_file(file.filename):
-            # 1. Securely save the uploaded file
-            filename = secure_filename(file.filename)
-            jpg_filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(jpg_filepath)
-            
-            # 2. Define the output PDF filename and path
-            # e.g., 'myimage.jpg' -> 'myimage.pdf'
-            base_filename = os.path.splitext(filename)[0]
-            pdf_filename = f"{base_filename}.pdf"
-            pdf_filepath = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename)
-            
-            # 3. Perform the conversion
-            if convert_jpg_to_pdf(jpg_filepath, pdf_filepath):
-                # 4. Send the converted PDF for download
-                convertedFile = send_file(
-                    pdf_filepath,
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=pdf_filename   
-                )
-                delete_file_later(pdf_filepath)
-                delete_file_later(jpg_filepath)
-                return convertedFile
-            else:
-                return "Error during conversion.", 500
-
-
-def allowed_file(filename):
-    """Checks if the file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-# --- Conversion & Zipping Logic ---
-
-def convert_pdf_to_jpg_and_zip(pdf_path, temp_dir, zip_filepath):
-
-    """
-    Converts PDF pages to JPG images and stores them in a ZIP file.
-    Temporary JPG files are deleted immediately after zipping.
-    """
-
-    try:
-
-        pdf_document = fitz.open(pdf_path)
-
-        base_filename = os.path.splitext(
-            os.path.basename(pdf_path)
-        )[0]
-
-        with zipfile.ZipFile(
-            zip_filepath,
-            'w',
-            zipfile.ZIP_DEFLATED
-        ) as zipf:
-
-            for page_num in range(len(pdf_document)):
-
-                page = pdf_document.load_page(page_num)
-
-                # Better quality
-                pix = page.get_pixmap(
-                    matrix=fitz.Matrix(2, 2)
-                )
-
-                output_filename = (
-                    f"{base_filename}_page_{page_num + 1}.jpg"
-                )
-
-                output_filepath = os.path.join(
-                    temp_dir,
-                    output_filename
-                )
-
-                # Save temporary JPG
-                pix.save(output_filepath)
-
-                # Add to ZIP
-                zipf.write(
-                    output_filepath,
-                    arcname=output_filename
-                )
-                delete_file_later(output_filepath)
-
-                # Delete JPG immediately
-                if os.path.exists(output_filepath):
-                    os.remove(output_filepath)
-
-        pdf_document.close()
-
-        return True
-
-    except Exception as e:
-
-        print(f"Conversion error: {e}")
-
-        flash(
-            f"❌ Conversion failed: {e}",
-            "error"
-        )
-
-        return False
-
-
-@app.route("/pdf-to-jpg")
-def pdf_to_jpg():
-    return render("pdf_to_jpg.html")
-
-@app.route('/pdf-jpg', methods=['GET', 'POST'])
-def convert_pdf():
-    if request.method == 'POST':
-        # Check if file exists in request
-        if 'file' not in request.files:
-            flash("No file part in the request.", "error")
-            return redirect(request.url)
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            flash("No selected file.", "error")
-            return redirect(request.url)
-        
-        if file and allowed_file(file.filename):
-            # 1. Securely save the uploaded PDF
-            filename = secure_filename(file.filename)
-            pdf_filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(pdf_filepath)
-            
-            # 2. Define output paths
-            base_filename = os.path.splitext(filename)[0]
-            zip_filename = f"{base_filename}_images.zip"
-            zip_filepath = os.path.join(app.config['UPLOAD_FOLDER'], zip_filename)
-            
-            # 3. Perform the conversion and zipping
-            if convert_pdf_to_jpg_and_zip(pdf_filepath, app.config['UPLOAD_FOLDER'], zip_filepath):
-                # 4. Clean up the uploaded PDF file
-                os.remove(pdf_filepath)
-                
-                # 5. Send the zipped JPGs for download
-                return send_file(
-                    zip_filepath,
-                    mimetype='application/zip',
-                    as_attachment=True,
-                    download_name=zip_filename
-                )
-            else:
-                # If conversion failed, clean up the uploaded file and redirect
-                if os.path.exists(pdf_filepath):
-                    os.remove(pdf_filepath)
-                return redirect(url_for('pdf_to_jpg'))
-
-
-# @app.route('/pdf-to-docx', methods=['GET', 'POST'])
-# def pdf_to_docx():
-    """Handles the PDF to DOCX conversion form submission."""
-    if request.method == 'POST':
-        if 'file' not in request.files:
-            flash("No file part in the request.", "error")
-            return redirect(request.url)
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            flash("No selected file.", "error")
-            return redirect(request.url)
-        
-        if file and allowed_file(file.filename):
-            # 1. Securely save the uploaded PDF to disk (pdf2docx needs a file path)
-            filename = secure_filename(file.filename)
-            pdf_filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(pdf_filepath)
-            
-            # 2. Define the output DOCX buffer and filename
-            docx_buffer = BytesIO()
-            base_filename = os.path.splitext(filename)[0]
-            docx_filename = f"{base_filename}.docx"
-
-            # 3. Perform the conversion
-            if convert_pdf_to_docx(pdf_filepath, docx_buffer):
-                # 4. Clean up the uploaded PDF file immediately
-                os.remove(pdf_filepath)
-                
-                # 5. Send the converted DOCX for download
-                return send_file(
-                    docx_buffer,
-                    mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                    as_attachment=True,
-                    download_name=docx_filename
-                )
-            else:
-                # 4. Clean up the uploaded PDF file on failure
-                if os.path.exists(pdf_filepath):
-                    os.remove(pdf_filepath)
-                return redirect(url_for('pdf_to_docx'))
-        
-        # Path for disallowed file extension (if someone tries to upload non-pdf)
-        flash("Disallowed file type. Only PDF is allowed.", "error")
-        return redirect(request.url)
-
-    # Handles GET request or fallback after failure
-    return render('pdf_to_docx.html')
-
-
-@app.route('/jpg-to-ico')
-def Jpg_To_Ico():
-    return render('jpg_to_ico.html')
-
-@app.route('/jpgtoico', methods=['GET', 'POST'])
-def jpgTo_ico():
-    if request.method == 'POST':
-        # 1. Get the file from the request
-        file = request.files.get('image')
-
-        if file:
-            try:
-                # 2. Open the image using Pillow
-                # file.stream allows us to read the upload directly without saving it
-                img = Image.open(file.stream)
-
-                # 3. Create an in-memory bytes buffer
-                img_io = BytesIO()
-
-                # 4. Save the image to the buffer as ICO
-                # 'sizes' ensures the icon contains standard dimensions (optional but recommended)
-                img.save(img_io, format='ICO', sizes=[(32, 32), (64, 64), (128, 128)])
-
-                # 5. Rewind the buffer to the beginning so it can be read
-                img_io.seek(0)
-
-                # 6. Send the file back to the user
-                return send_file(
-                    img_io,
-                    mimetype='image/x-icon',
-                    as_attachment=True,
-                    download_name='converted_icon.ico'
-                )
-            except Exception as e:
-                return f"Error processing image: {e}", 500
-
-def convert_with_ms_office(input_path, output_dir):
-    """
-    Uses Microsoft PowerPoint to convert the file to PDF.
-    Requires MS Office to be installed on the server/machine.
-    """
-    
-    # 1. MS Office requires ABSOLUTE paths. 
-    # Relative paths (like 'uploads/file.ppt') will fail.
-    abs_input_path = os.path.abspath(input_path)
-    
-    base_name = os.path.basename(input_path)
-    filename_no_ext = os.path.splitext(base_name)[0]
-    abs_output_path = os.path.abspath(os.path.join(output_dir, f"{filename_no_ext}.pdf"))
-
-    # 2. Initialize COM library (Critical for Flask threading)
-    pythoncom.CoInitialize()
-    
-    powerpoint = None
-    presentation = None
-
-    try:
-        # 3. Launch PowerPoint
-        powerpoint = comtypes.client.CreateObject("PowerPoint.Application")
-        
-        # Optional: Keep it invisible (might not work on all Windows versions)
-        # powerpoint.Visible = 1 
-
-        # 4. Open the presentation
-        # WithWindow=False prevents the window from popping up visibly
-        presentation = powerpoint.Presentations.Open(abs_input_path, WithWindow=False)
-        
-        # 5. Save as PDF
-        # 32 is the file format ID for PDF in Microsoft Office
-        presentation.SaveAs(abs_output_path, 32)
-        
-        return abs_output_path
-
-    except Exception as e:
-        raise Exception(f"MS Office Error: {e}")
-        
-    finally:
-        # 6. Clean up and close PowerPoint safely
-        if presentation:
-            presentation.Close()
-        if powerpoint:
-            # Only quit if you want to close the main app. 
-            # In high-traffic apps, you might keep it open, but for this, we Quit to save RAM.
-            powerpoint.Quit()
-        
-        # Uninitialize COM
-        pythoncom.CoUninitialize()
-
-OUTPUT_FOLDER = 'converted'
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-
-@app.route('/ppt-to-pdf', methods=['GET', 'POST'])
-def ppt_to_pdf():
-    if request.method == 'POST':
-        file = request.files.get('file')
-        
-        if not file or file.filename == '':
-            return "No file selected", 400
-            
-        if allowed_file(file.filename):
-            unique_id = str(uuid.uuid4())
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            input_filename = f"{unique_id}.{ext}"
-            input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-            
-            file.save(input_path)
-            
-            try:
-                # --- CALL THE MS OFFICE FUNCTION ---
-                pdf_path = convert_with_ms_office(input_path, OUTPUT_FOLDER)
-                
-                return send_file(
-                    pdf_path,
-                    as_attachment=True,
-                    download_name='presentation.pdf'
-                )
-                
-            except Exception as e:
-                print(f"ERROR: {e}")
-                return f"Conversion Failed: {str(e)}", 500
-            finally:
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-                    
-    return render('ppt_to_pdf.html')
-
-
-def convert_excel_to_pdf(input_path, output_dir):
-    """
-    Uses Microsoft Excel to convert the file to PDF.
-    """
-    # 1. Excel requires ABSOLUTE paths
-    abs_input_path = os.path.abspath(input_path)
-    
-    base_name = os.path.basename(input_path)
-    filename_no_ext = os.path.splitext(base_name)[0]
-    abs_output_path = os.path.abspath(os.path.join(output_dir, f"{filename_no_ext}.pdf"))
-
-    # 2. Initialize COM (Critical for Flask)
-    pythoncom.CoInitialize()
-    
-    excel = None
-    workbook = None
-
-    try:
-        # 3. Launch Excel
-        excel = comtypes.client.CreateObject("Excel.Application")
-        excel.Visible = False # Run in background
-        excel.DisplayAlerts = False # Disable popups like "Overwrite file?"
-
-        # 4. Open the workbook
-        workbook = excel.Workbooks.Open(abs_input_path)
-        
-        # 5. Export as PDF
-        # 0 represents 'xlTypePDF' in the Excel Object Model
-        # Using ExportAsFixedFormat is more reliable for PDF than SaveAs in Excel
-        workbook.ExportAsFixedFormat(0, abs_output_path)
-        
-        return abs_output_path
-
-    except Exception as e:
-        raise Exception(f"Excel Error: {e}")
-        
-    finally:
-        # 6. Clean up
-        if workbook:
-            workbook.Close(SaveChanges=False) # Close without saving changes to the Excel file
-        if excel:
-            excel.Quit()
-        
-        # Release COM resources
-        pythoncom.CoUninitialize()
-
-@app.route('/excel-to-pdf', methods=['GET', 'POST'])
-def excel_to_pdf():
-    if request.method == 'POST':
-        file = request.files.get('file')
-        
-        if not file or file.filename == '':
-            return "No file selected", 400
-            
-        if allowed_file(file.filename):
-            unique_id = str(uuid.uuid4())
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            input_filename = f"{unique_id}.{ext}"
-            input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-            
-            file.save(input_path)
-            
-            try:
-                # --- CALL THE EXCEL FUNCTION ---
-                pdf_path = convert_excel_to_pdf(input_path, OUTPUT_FOLDER)
-                
-                return send_file(
-                    pdf_path,
-                    as_attachment=True,
-                    download_name='spreadsheet.pdf'
-                )
-                
-            except Exception as e:
-                print(f"ERROR: {e}")
-                return f"Conversion Failed: {str(e)}", 500
-            finally:
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-                    
-    return render('excel_to_pdf.html')
-
-
-@app.route('/pdf-to-docx')
-def pdf2msword():
-    return render('pdf_to_docx.html')
-
-
-def convert_pdf_to_docx(pdf_buffer):
-    try:
-        # Step 1: Create temporary files
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            temp_pdf.write(pdf_buffer.getvalue())
-            pdf_path = temp_pdf.name
-
-        temp_docx_path = pdf_path.replace(".pdf", ".docx")
+import sys
 
-        # Step 2: Convert PDF → DOCX
-        cv = Converter(pdf_path)
-        cv.convert(temp_docx_path)
-        cv.close()
-
-        # Step 3: Read DOCX result into BytesIO
-        with open(temp_docx_path, "rb") as f:
-            docx_buffer = BytesIO(f.read())
-
-        # Step 4: Cleanup
-        os.remove(pdf_path)
-        os.remove(temp_docx_path)
-
-        return docx_buffer
-    except Exception as e:
-        print("Conversion error:", e)
-        return None
-
-@app.route('/pdf-to-docx', methods=['GET', 'POST'])
-def pdf_to_docx():
-
-    if request.method == 'POST':
-
-        file = request.files.get('file')
-
-        if not file or file.filename == '':
-            return "No file selected", 400
-
-        if file and file.filename.lower().endswith('.pdf'):
-
-            unique_id = str(uuid.uuid4())
-
-            pdf_path = os.path.join(
-                UPLOAD_FOLDER,
-                f"{unique_id}.pdf"
-            )
-
-            docx_path = os.path.join(
-                OUTPUT_FOLDER,
-                f"{unique_id}.docx"
-            )
-
-            file.save(pdf_path)
-
-            try:
-                cv = Converter(pdf_path)
-                cv.convert(docx_path)
-                cv.close()
-
-                return send_file(
-                    docx_path,
-                    as_attachment=True,
-                    download_name='converted.docx'
-                )
-
-            except Exception as e:
-                return f"Conversion error: {e}", 500
-
-            finally:
-                if os.path.exists(pdf_path):
-                    os.remove(pdf_path)
-
-    return render('pdf_to_docx.html')
-
-@app.route('/json-to-csv')
-def Json2CSV():
-    return render('json_to_csv.html')
-
-def convert_json_to_csv(input_path, output_dir):
-
-    base_name = os.path.basename(input_path)
-    filename_no_ext = os.path.splitext(base_name)[0]
-
-    output_path = os.path.join(
-        output_dir,
-        f"{filename_no_ext}.csv"
-    )
-
-    try:
-
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # CASE 1: List
-        if isinstance(data, list):
-
-            # List of dictionaries
-            if all(isinstance(item, dict) for item in data):
-                df = pd.json_normalize(data)
-
-            # List of simple values
-            else:
-                df = pd.DataFrame(data, columns=["value"])
-
-        # CASE 2: Dictionary
-        elif isinstance(data, dict):
-
-            found_list = False
-
-            for key, value in data.items():
-
-                # Dictionary contains list of dictionaries
-                if isinstance(value, list):
-
-                    if all(isinstance(item, dict) for item in value):
-                        df = pd.json_normalize(value)
-
-                    else:
-                        df = pd.DataFrame(value, columns=[key])
-
-                    found_list = True
-                    break
-
-            # Normal dictionary
-            if not found_list:
-                df = pd.json_normalize(data)
-
-        else:
-            raise Exception("Unsupported JSON structure")
-
-        df.to_csv(output_path, index=False)
-
-        return output_path
-
-    except Exception as e:
-        raise Exception(f"JSON conversion error: {e}")
-    
-@app.route('/json-to-csv', methods=['GET', 'POST'])
-def json_to_csv():
-    # error_msg = None
-    if request.method == 'POST':
-        file = request.files.get('file')
-        
-        if not file or file.filename == '':
-            error_msg = "No file selected"
-        elif not allowed_file(file.filename):
-            error_msg = "Invalid file type. Please upload a .json file."
-        else:
-            # Generate unique filename
-            unique_id = str(uuid.uuid4())
-            ext = file.filename.rsplit('.', 1)[1].lower()
-            input_filename = f"{unique_id}.{ext}"
-            input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-            
-            file.save(input_path)
-            
-            try:
-                # Convert
-                csv_path = convert_json_to_csv(input_path, OUTPUT_FOLDER)
-                
-                return send_file(
-                    csv_path,
-                    as_attachment=True,
-                    download_name='converted_data.csv',
-                    mimetype='text/csv'
-                )
-                
-            except Exception as e:
-                error_msg = f"Conversion Failed: {str(e)}"
-                # Clean up if something broke
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-            finally:
-                # Clean up input file
-                # (Note: We keep the output file briefly so send_file can stream it, 
-                # usually cleaned up via background tasks in production)
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-
-    return render('json_to_csv.html', error=error_msg)
-
-
-@app.route('/qr')
-def QR():
-    """Render the main page."""
-    return render('qr.html')
-
-@app.route('/generate', methods=['POST'])
-def generate_qr():
-    """
-    Generates a QR code from the provided text data.
-    Returns the image directly as a response stream.
-    """
-    data = request.form.get('data', '')
-    
-    if not data:
-        return "No data provided", 400
-
-    # Generate QR Code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    # Save image to a memory buffer (BytesIO) instead of disk
-    buffer = BytesIO()
-    img.save(buffer)
-    buffer.seek(0)
-
-    return send_file(buffer, mimetype='image/png', as_attachment=False, download_name='qrcode.png')
-
-@app.route('/scan', methods=['POST'])
-def scan_qr():
-    """
-    Receives an uploaded image file, attempts to read a QR code from it,
-    and returns the decoded text.
-    """
-    if 'qr_image' not in request.files:
-        return "No file uploaded", 400
-
-    file = request.files['qr_image']
-    
-    if file.filename == '':
-        return "No file selected", 400
-
-    try:
-        # Open image using Pillow
-        img = Image.open(file)
-        
-        # Decode using pyzbar
-        decoded_objects = decode(img)
-
-        if not decoded_objects:
-            return "No QR code detected in the image.", 200
-
-        # Extract data from the first detected QR code
-        result_data = decoded_objects[0].data.decode("utf-8")
-        return f"Decoded Data: {result_data}"
-
-    except Exception as e:
-        return f"Error processing image: {str(e)}", 500
-
-
-
-
-def convert_docx_to_pdf(input_path, output_dir):
-    """
-    Converts DOCX → PDF using Microsoft Word (COM automation).
-    Requires MS Word installed (Windows only).
-    """
-
-    abs_input_path = os.path.abspath(input_path)
-
-    base_name = os.path.basename(input_path)
-    filename_no_ext = os.path.splitext(base_name)[0]
-    abs_output_path = os.path.abspath(
-        os.path.join(output_dir, f"{filename_no_ext}.pdf")
-    )
-
-    pythoncom.CoInitialize()
-
-    word = None
-    doc = None
-
-    try:
-        word = comtypes.client.CreateObject("Word.Application")
-        word.Visible = False
-        word.DisplayAlerts = 0
-
-        doc = word.Documents.Open(abs_input_path)
-
-        # 17 = wdFormatPDF
-        doc.SaveAs(abs_output_path, FileFormat=17)
-
-        return abs_output_path
-
-    except Exception as e:
-        raise Exception(f"Word conversion error: {e}")
-
-    finally:
-        if doc:
-            doc.Close(False)
-        if word:
-            word.Quit()
-
-        pythoncom.CoUninitialize()
-
-
-@app.route('/docx-to-pdf', methods=['GET', 'POST'])
-def docx_to_pdf():
-    if request.method == 'POST':
-        file = request.files.get('file')
-
-        if not file or file.filename == '':
-            return "No file selected", 400
-
-        if file.filename.lower().endswith('.docx'):
-
-            unique_id = str(uuid.uuid4())
-            input_path = os.path.join(
-                UPLOAD_FOLDER,
-                f"{unique_id}.docx"
-            )
-
-            output_path = os.path.join(
-                OUTPUT_FOLDER,
-                f"{unique_id}.pdf"
-            )
-
-            file.save(input_path)
-
-            try:
-                pdf_path = convert_docx_to_pdf(input_path, OUTPUT_FOLDER)
-
-                return send_file(
-                    pdf_path,
-                    as_attachment=True,
-                    download_name='converted.pdf',
-                    mimetype='application/pdf'
-                )
-
-            except Exception as e:
-                return f"Conversion error: {e}", 500
-
-            finally:
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-
-    return render('docx_to_pdf.html')
-
-
-
-
-# ---------------- DELETE TEMP FILE ----------------
-def delete_file(path, delay=60):
-    def remove():
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except:
-            pass
-
-    threading.Timer(delay, remove).start()
-
-
-# ---------------- PDF COMPRESSION ----------------
-def compress_pdf(file_path):
-    doc = fitz.open(file_path)
-
-    for page in doc:
-        for img in page.get_images(full=True):
-            xref = img[0]
-            base = doc.extract_image(xref)
-            img_bytes = base["image"]
-
-            image = Image.open(io.BytesIO(img_bytes))
-
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-
-            image.thumbnail((1200, 1200))
-
-            buf = io.BytesIO()
-            image.save(buf, format="JPEG", quality=40)
-
-            doc.update_stream(xref, buf.getvalue())
-
-    out = io.BytesIO()
-    doc.save(out, garbage=4, deflate=True, clean=True)
-    doc.close()
-    out.seek(0)
-    return out
-
-
-# ---------------- JSON COMPRESSION ----------------
-def compress_json(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    compressed = json.dumps(data, separators=(",", ":"))
-
-    return io.BytesIO(compressed.encode("utf-8"))
-
-
-# ---------------- ROUTE ----------------
-@app.route("/compress", methods=["POST"])
-def compress():
-    file = request.files["file"]
-    filename = secure_filename(file.filename)
-    ext = filename.split(".")[-1].lower()
-
-    temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}_{filename}")
-    file.save(temp_path)
-
-    delete_file(temp_path, 60)
-
-    if ext == "pdf":
-        output = compress_pdf(temp_path)
-        return send_file(output, as_attachment=True, download_name="compressed.pdf")
-
-    elif ext == "json":
-        output = compress_json(temp_path)
-        return send_file(output, as_attachment=True, download_name="compressed.json")
-
-    else:
-        return "Unsupported file type"
-
-@app.route('/compress-pdf')
-def CompressPDF():
-    return render("compress_pdf.html")
-
-@app.route('/compress-json')
-def CompressJSON():
-    return render("compress_json.html")
-
-@app.route('/compress-img')
-def CompressImage():
-    return render("compress_img.html")
+from goformate import create_app, lazy
 
+app = create_app()
 
 
 if __name__ == '__main__':
+    if '--startup-report' in sys.argv:
+        # Import cost of each converter, each measured in a fresh interpreter
+        print(json.dumps(lazy.isolated_report(), indent=2))
+        sys.exit(0)
+
     # Clean up the uploads folder on server start (optional but recommended)
-    for f in os.listdir(UPLOAD_FOLDER):
-        os.remove(os.path.join(UPLOAD_FOLDER, f))
-        
+    upload_folder = app.config['UPLOAD_FOLDER']
+    for f in os.listdir(upload_folder):
+        os.remove(os.path.join(upload_folder, f))
+
     app.run(debug=True)
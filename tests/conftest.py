@@ -0,0 +1,44 @@
+import pytest
+from werkzeug.test import EnvironBuilder
+
+from goformate import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app whose folders, cache and manifests live in a temp directory."""
+    app = create_app({
+        'TESTING': True,
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'OUTPUT_FOLDER': str(tmp_path / 'converted'),
+        'CACHE_FOLDER': str(tmp_path / 'cache'),
+        'JANITOR_MANIFEST': str(tmp_path / 'janitor.sqlite3'),
+        'JOBS_DB': str(tmp_path / 'jobs.sqlite3'),
+    })
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def open_stream(app):
+    """
+    Calls the WSGI app like a server does and returns (status, body)
+    without reading the body. The test client reads the first chunk
+    itself, which hides what happens when a client leaves before that.
+    """
+    def call(path, **kwargs):
+        environ = EnvironBuilder(path=path, method='POST', **kwargs).get_environ()
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(status_line)
+
+        body = app(environ, start_response)
+        return status[0], body
+
+    return call
@@ -0,0 +1,111 @@
+import io
+import os
+import time
+
+from goformate import common
+from goformate.cache import ConversionCache
+
+
+def test_link_survives_eviction(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache', max_items=1)
+    cache.put_bytes('a', b'first')
+
+    dest = tmp_path / 'served'
+    assert cache.link('a', dest)
+
+    # Another process stores a result and evicts 'a' before it is served
+    cache.put_bytes('b', b'second')
+    assert not os.path.exists(cache._path('a'))
+    assert dest.read_bytes() == b'first'
+
+
+def test_link_treats_a_vanished_file_as_a_miss(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache')
+    cache.put_bytes('a', b'first')
+    os.remove(cache._path('a'))
+
+    assert not cache.link('a', tmp_path / 'served')
+    assert not os.path.exists(tmp_path / 'served')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['items']) == (0, 1, 0)
+
+
+def test_cached_result_removed_before_serving_is_converted_again(client):
+    def post():
+        data = {'file': (io.BytesIO(b'[{"a": 1}]'), 'records.json')}
+        return client.post('/json-to-csv', data=data, content_type='multipart/form-data')
+
+    assert post().data == b'a\n1\n'
+
+    for name in os.listdir(common.result_cache.directory):
+        if not name.startswith('index.sqlite3'):
+            os.remove(os.path.join(common.result_cache.directory, name))
+
+    response = post()
+    assert response.status_code == 200
+    assert response.data == b'a\n1\n'
+    response.close()
+
+    # The link a hit is served from is removed like any other result
+    assert post().data == b'a\n1\n'
+    assert common.result_cache.stats()['hits'] == 1
+    assert os.listdir(common.output_folder) == []
+
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache', max_bytes=10, max_items=3)
+
+    def use(key, data=None):
+        # Keeps last_used distinct on coarse clocks
+        time.sleep(0.02)
+        if data is None:
+            return cache.link(key, tmp_path / f'{key}.{time.time()}')
+        cache.put_bytes(key, data)
+
+    use('a', b'1')
+    use('b', b'2')
+    use('c', b'3')
+
+    # Using 'a' makes 'b' the oldest entry
+    assert use('a')
+    use('d', b'4')
+
+    assert [use(key) for key in 'abcd'] == [True, False, True, True]
+    assert not os.path.exists(cache._path('b'))
+
+    # Too many bytes evicts the oldest entries until the total fits again
+    use('e', b'12345678')
+
+    stats = cache.stats()
+    assert (stats['items'], stats['bytes'], stats['evictions']) == (3, 10, 2)
+    assert sorted(os.listdir(cache.directory)) == ['c', 'd', 'e', 'index.sqlite3']
+
+
+def test_counters_are_shared_across_instances(tmp_path):
+    cache = ConversionCache(tmp_path / 'cache')
+    cache.put_bytes('a', b'result')
+
+    other = ConversionCache(tmp_path / 'cache')
+    assert other.link('a', tmp_path / 'a')
+    assert not other.link('missing', tmp_path / 'missing')
+    assert cache.link('a', tmp_path / 'b')
+
+    assert cache.stats() == {
+        'hits': 2,
+        'misses': 1,
+        'evictions': 0,
+        'items': 1,
+        'bytes': 6,
+        'max_items': 1000,
+        'max_bytes': 1024 * 1024 * 1024,
+    }
+
+
+def test_keys_depend_on_content_converter_and_params():
+    key = ConversionCache.make_key('hash', 'pdf_to_jpg', dpi=144, pages='1-2')
+
+    assert key == ConversionCache.make_key('hash', 'pdf_to_jpg', pages='1-2', dpi=144)
+    assert key != ConversionCache.make_key('other', 'pdf_to_jpg', dpi=144, pages='1-2')
+    assert key != ConversionCache.make_key('hash', 'compress', dpi=144, pages='1-2')
+    assert key != ConversionCache.make_key('hash', 'pdf_to_jpg', dpi=150, pages='1-2')
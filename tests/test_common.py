@@ -0,0 +1,24 @@
+import pytest
+
+from goformate.common import parse_page_ranges
+
+
+@pytest.mark.parametrize('spec, expected', [
+    (None, [0, 1, 2, 3, 4]),
+    ('', [0, 1, 2, 3, 4]),
+    ('  ', [0, 1, 2, 3, 4]),
+    ('2', [1]),
+    ('1-3,5', [0, 1, 2, 4]),
+    ('4-', [3, 4]),
+    ('-2', [0, 1]),
+    ('3, 1-2 ,2', [0, 1, 2]),
+    ('5,,1', [0, 4]),
+])
+def test_parse_page_ranges(spec, expected):
+    assert parse_page_ranges(spec, 5) == expected
+
+
+@pytest.mark.parametrize('spec', ['0', '6', '3-2', '4-9', 'a', '1-b', ',', '1--2'])
+def test_parse_page_ranges_rejects_bad_input(spec):
+    with pytest.raises(ValueError):
+        parse_page_ranges(spec, 5)
@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import Future
+
+import fitz
+import pytest
+from PIL import Image
+
+from goformate import common
+from goformate.compress import JSON_READ_BYTES, compress_pdf, minify_json_chunks, unique_name
+
+
+def jpeg_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class CountingPool:
+    """Runs tasks inline and tracks how many results are not collected yet."""
+
+    def __init__(self):
+        self.outstanding = 0
+        self.max_outstanding = 0
+
+    def submit(self, func, *args):
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+
+        future = Future()
+        future.set_result(func(*args))
+        result = future.result
+
+        def collect(timeout=None):
+            self.outstanding -= 1
+            return result(timeout)
+
+        future.result = collect
+        return future
+
+
+def test_compress_pdf_keeps_a_bounded_window_of_images(app, monkeypatch):
+    pool = CountingPool()
+    monkeypatch.setattr(common, 'get_render_pool', lambda: pool)
+    monkeypatch.setattr(common, 'PDF_RENDER_WORKERS', 2)
+
+    images = 12
+    doc = fitz.open()
+    for _ in range(images):
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (200, 200), os.urandom(200 * 200 * 3)).save(buffer, 'PNG')
+        doc.new_page().insert_image(fitz.Rect(0, 0, 200, 200), stream=buffer.getvalue())
+    pdf = doc.tobytes()
+
+    stats = {}
+    with fitz.open(stream=compress_pdf(pdf, stats).getvalue()) as compressed:
+        assert len(compressed) == images
+
+    assert stats["images"] == images
+    assert stats["recompressed"] + stats["kept"] == images
+    assert pool.max_outstanding == 4
+
+
+def test_unique_name_skips_taken_candidates():
+    used = set()
+    names = [unique_name(name, used) for name in ('a.jpg', '1_a.jpg', 'a.jpg', 'a.jpg')]
+
+    assert names == ['a.jpg', '1_a.jpg', '2_a.jpg', '3_a.jpg']
+    assert used == set(names)
+
+
+def test_compress_images_with_colliding_names(client):
+    # 'a.jpg' twice plus a name the old loop would pick for the duplicate
+    response = client.post('/compress', data={
+        'file': [
+            (io.BytesIO(jpeg_bytes('red')), 'a.jpg'),
+            (io.BytesIO(jpeg_bytes('green')), '2_a.jpg'),
+            (io.BytesIO(jpeg_bytes('blue')), 'a.jpg'),
+        ],
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+        names = zipf.namelist()
+        report = json.loads(zipf.read('report.json'))
+
+    assert sorted(names) == ['1_a.jpg', '2_a.jpg', 'a.jpg', 'report.json']
+    assert [entry['file'] for entry in report] == ['a.jpg', '2_a.jpg', '1_a.jpg']
+    response.close()
+
+
+def minify(data, read_bytes):
+    return b"".join(minify_json_chunks(io.BytesIO(data), read_bytes))
+
+
+@pytest.mark.parametrize("read_bytes", [1, 2, 3, 7, 64, JSON_READ_BYTES])
+@pytest.mark.parametrize("text", [
+    b'{"a": [1, 2.5, {"b": "x ]} \\" {"}], "c": null, "d": true}',
+    b' [ "\\\\", "\\"", "a\\\\\\"b" ]\n',
+    b'"a string [ with { brackets"',
+    b'-12.5',
+    b'[' * 50 + b']' * 50,
+])
+def test_minify_json_matches_json_dumps(text, read_bytes):
+    # Small reads split strings, escapes and brackets across blocks
+    expected = json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False).encode()
+    assert minify(text, read_bytes) == expected
+
+
+def test_minify_json_handles_deep_nesting():
+    text = b'[ ' * 5000 + b'] ' * 5000
+    assert minify(text, JSON_READ_BYTES) == text.replace(b' ', b'')
+
+
+@pytest.mark.parametrize("read_bytes", [1, 3, JSON_READ_BYTES])
+@pytest.mark.parametrize("text", [
+    b'',
+    b'   ',
+    b'hello',
+    b'{"a": 1',
+    b'{"a": 1}}',
+    b'[1, 2}',
+    b'{"a": [}]',
+    b'{"a": "b}',
+    b'{}{}',
+    b'[1] 2',
+    b'[1]{"a": 2}',
+    b'1 [',
+    b'[' * 5000 + b']' * 4999 + b'}',
+])
+def test_minify_json_rejects_malformed_input(text, read_bytes):
+    with pytest.raises(ValueError):
+        minify(text, read_bytes)
+
+
+def test_compress_route_rejects_malformed_json(client):
+    response = client.post('/compress', data={
+        'file': (io.BytesIO(b'{"a": [1, 2}'), 'data.json'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 400
@@ -0,0 +1,31 @@
+import io
+import json
+import os
+import zipfile
+
+from PIL import Image
+
+
+def photos_zip():
+    photo = io.BytesIO()
+    Image.new('RGB', (40, 40), 'blue').save(photo, 'JPEG')
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zipf:
+        zipf.writestr('1.jpg', photo.getvalue())
+    return buffer.getvalue()
+
+
+def test_photos_zip_is_removed_when_the_stream_never_starts(app, open_stream):
+    records = json.dumps([{"name": "Ada Lovelace", "email": "ada@example.com"}]).encode()
+
+    status, body = open_stream('/bulk-cv', data={
+        'records': (io.BytesIO(records), 'people.json'),
+        'photos': (io.BytesIO(photos_zip()), 'photos.zip'),
+    })
+    assert status.startswith('200')
+    assert len(os.listdir(app.config['UPLOAD_FOLDER'])) == 1
+
+    body.close()
+
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
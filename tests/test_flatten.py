@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+
+import pytest
+
+from goformate.flatten import RecordFlattener, RecordList, write_records_csv
+
+RECORDS = [
+    {"id": 1, "user": {"name": "a", "address": {"city": "x"}}, "tags": ["p", "q"], "score": 1.5},
+    {"id": 2, "extra": True, "user": {"name": "b", "age": 3}, "tags": []},
+]
+
+
+def convert(tmp_path, records, **options):
+    schema = options.pop('schema', 'full')
+    sample_size = options.pop('sample_size', 1000)
+    path = tmp_path / 'out.csv'
+
+    columns, dropped = write_records_csv(records, path, RecordFlattener(**options), schema, sample_size)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == columns
+    if schema == 'full':
+        assert dropped == []
+    return rows, dropped
+
+
+def test_columns_are_ordered_like_json_normalize(tmp_path):
+    pd = pytest.importorskip('pandas')
+
+    rows, _ = convert(tmp_path, RecordList(RECORDS))
+
+    assert rows[0] == list(pd.json_normalize(RECORDS).columns)
+    assert rows[0] == ['id', 'tags', 'score', 'user.name', 'user.address.city', 'extra', 'user.age']
+    assert rows[1:] == [
+        ['1', '["p","q"]', '1.5', 'a', 'x', '', ''],
+        ['2', '[]', '', 'b', '', 'True', '3'],
+    ]
+
+
+def test_sample_schema_leaves_out_later_keys(tmp_path):
+    rows, dropped = convert(tmp_path, RecordList(RECORDS), schema='sample', sample_size=1)
+
+    assert rows[0] == ['id', 'tags', 'score', 'user.name', 'user.address.city']
+    assert rows[2] == ['2', '[]', '', 'b', '']
+    assert dropped == ['extra', 'user.age']
+
+
+def test_route_reports_left_out_keys(app, client):
+    def post(schema):
+        data = {'file': (io.BytesIO(json.dumps(RECORDS).encode()), 'records.json'), 'schema': schema}
+        return client.post('/json-to-csv', data=data, content_type='multipart/form-data')
+
+    app.config['JSON_CSV_SCHEMA_SAMPLE'] = 1
+
+    for _ in range(2):
+        response = post('sample')
+        assert response.headers['X-Dropped-Columns'] == '2'
+        assert json.loads(response.headers['X-Dropped-Column-Names']) == ['extra', 'user.age']
+        response.close()
+
+    response = post('full')
+    assert 'X-Dropped-Columns' not in response.headers
+    response.close()
+
+
+def test_join_lists(tmp_path):
+    records = RecordList([{"tags": ["a", 1, None, {"k": "v"}, [2]]}])
+
+    rows, _ = convert(tmp_path, records, list_mode='join', separator=';')
+
+    assert rows == [['tags'], ['a;1;;{"k":"v"};[2]']]
+
+
+def test_explode_lists_side_by_side(tmp_path):
+    records = RecordList([
+        {"id": 1, "items": [{"sku": "a", "qty": 2}, {"sku": "b", "opts": [1]}], "tags": ["x"]},
+        {"id": 2, "items": [], "tags": []},
+    ])
+
+    rows, _ = convert(tmp_path, records, list_mode='explode')
+
+    assert rows == [
+        ['id', 'items.sku', 'items.qty', 'items.opts', 'tags'],
+        ['1', 'a', '2', '', 'x'],
+        ['1', 'b', '', '[1]', ''],
+        ['2', '', '', '', ''],
+    ]
+
+
+def test_records_that_are_not_objects_use_one_column(tmp_path):
+    rows, _ = convert(tmp_path, RecordList([1, [2, 3], {"a": 4}], column='items'))
+
+    assert rows == [['items'], ['1'], ['[2,3]'], ['{"a":4}']]
+
+
+def test_invalid_modes_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RecordFlattener('nested')
+
+    with pytest.raises(ValueError):
+        write_records_csv(RecordList([]), tmp_path / 'out.csv', RecordFlattener(), schema='partial')
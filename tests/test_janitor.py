@@ -0,0 +1,74 @@
+import sqlite3
+import time
+
+from goformate.janitor import Janitor
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def manifest_rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT path, deadline FROM deletions").fetchall()
+
+
+def make_file(path):
+    path.write_bytes(b"x")
+    return path
+
+
+def test_deletes_files_in_deadline_order(tmp_path):
+    janitor = Janitor(tmp_path / 'manifest.sqlite3')
+    late = make_file(tmp_path / 'late')
+    soon = make_file(tmp_path / 'soon')
+
+    janitor.schedule(late, 0.3)
+    janitor.schedule(soon, 0)
+
+    wait_for(lambda: not soon.exists())
+    assert late.exists()
+
+    wait_for(lambda: not late.exists())
+    wait_for(lambda: janitor.pending() == 0)
+    assert janitor.stats()['deleted'] == 2
+    assert manifest_rows(tmp_path / 'manifest.sqlite3') == []
+
+
+def test_rescheduling_replaces_the_deadline(tmp_path):
+    janitor = Janitor(tmp_path / 'manifest.sqlite3')
+    path = make_file(tmp_path / 'kept')
+
+    janitor.schedule(path, 0.1)
+    janitor.schedule(path, 3600)
+    time.sleep(0.3)
+
+    assert path.exists()
+    assert janitor.pending() == 1
+    (_, deadline), = manifest_rows(tmp_path / 'manifest.sqlite3')
+    assert deadline > time.time() + 3000
+
+
+def test_restart_picks_up_the_manifest(tmp_path):
+    manifest = tmp_path / 'manifest.sqlite3'
+    expired = make_file(tmp_path / 'expired')
+    waiting = make_file(tmp_path / 'waiting')
+
+    before = Janitor(manifest)
+    before.schedule(expired, 3600)
+    before.schedule(waiting, 3600)
+
+    # The deadline of one file passes while the process is down
+    with sqlite3.connect(manifest) as db:
+        db.execute("UPDATE deletions SET deadline = 0 WHERE path = ?", (str(expired),))
+
+    after = Janitor(manifest)
+
+    wait_for(lambda: len(manifest_rows(manifest)) == 1)
+    assert not expired.exists()
+    assert waiting.exists()
+    assert after.pending() == 1
+    assert manifest_rows(manifest)[0][0] == str(waiting)
@@ -0,0 +1,107 @@
+import json
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from goformate import common
+from goformate.jobs import JobManager, JobQueueFull
+
+
+def dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def insert_job(db_path, job_id, status, pid, cleanup):
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "INSERT INTO jobs (id, converter, status, created, pid, cleanup) VALUES (?, 'compress', ?, ?, ?, ?)",
+            (job_id, status, time.time(), pid, json.dumps([str(path) for path in cleanup]))
+        )
+
+
+def test_interrupted_jobs_fail_on_startup(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    JobManager(db_path)
+
+    upload = tmp_path / "upload.pdf"
+    upload.write_bytes(b"%PDF")
+    insert_job(db_path, "gone", "running", dead_pid(), [upload])
+    insert_job(db_path, "legacy", "queued", None, [])
+
+    manager = JobManager(db_path, result_ttl=60)
+
+    for job_id in ("gone", "legacy"):
+        job = manager.get(job_id)
+        assert job["status"] == "failed"
+        assert job["expires"] > time.time()
+
+    assert not upload.exists()
+    assert manager.queue_depths() == {}
+
+
+def test_jobs_of_a_process_that_died_later_are_reclaimed(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    manager = JobManager(db_path)
+
+    # A worker process that exited after this manager started
+    insert_job(db_path, "orphan", "queued", dead_pid(), [])
+
+    assert manager.get("orphan")["status"] == "failed"
+
+
+def test_submit_is_bounded_per_converter(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.sqlite3"), limits={"compress": 1}, max_queued=1)
+    release = threading.Event()
+
+    def convert():
+        release.wait(5)
+        path = tmp_path / "out.bin"
+        path.write_bytes(b"x")
+        return str(path)
+
+    try:
+        first = manager.submit("compress", convert)
+        manager.submit("compress", convert)
+
+        with pytest.raises(JobQueueFull) as full:
+            manager.submit("compress", convert)
+        assert full.value.retry_after >= 1
+
+        # Other converters have their own queue
+        manager.submit("pdf_to_jpg", lambda: str(tmp_path / "out.bin"))
+    finally:
+        release.set()
+
+    for _ in range(100):
+        if manager.get(first)["status"] == "done":
+            break
+        time.sleep(0.05)
+
+    assert manager.get(first)["status"] == "done"
+    manager.submit("compress", convert)
+
+
+def test_full_queue_answers_503_and_removes_the_upload(app, tmp_path):
+    common.job_manager.limits['compress'] = 1
+    common.job_manager.max_queued = 0
+    release = threading.Event()
+
+    upload = tmp_path / "upload.pdf"
+    upload.write_bytes(b"%PDF")
+
+    try:
+        with app.test_request_context():
+            common.job_manager.submit("compress", lambda: release.wait(5) and str(upload))
+            response = common.submit_job("compress", str, download_name="x.pdf", cleanup=[str(upload)])
+    finally:
+        release.set()
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert not upload.exists()
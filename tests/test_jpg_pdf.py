@@ -0,0 +1,83 @@
+import io
+import os
+
+import fitz
+import pytest
+from PIL import Image
+
+from goformate.jpg_pdf import PAGE_MARGIN, PAGE_SIZES, ImagePdfWriter, load_pdf_image
+
+
+def image_bytes(fmt, size=(60, 40), mode='RGB'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, 'red' if mode == 'RGB' else 128).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def test_streamed_images_are_removed_when_the_stream_never_starts(app, open_stream):
+    app.config['JPG_PDF_STREAM_MIN_BYTES'] = 0
+    status, body = open_stream('/jpgtopdf', data={'file': [
+        (io.BytesIO(image_bytes('JPEG')), 'a.jpg'),
+        (io.BytesIO(image_bytes('PNG')), 'b.png'),
+    ]})
+    assert status.startswith('200')
+    assert len(os.listdir(app.config['UPLOAD_FOLDER'])) == 2
+
+    body.close()
+
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+
+
+def write_pdf(images, page_size='fit'):
+    writer = ImagePdfWriter()
+    chunks = writer.header()
+    for data in images:
+        chunks += writer.add_page(load_pdf_image(io.BytesIO(data)), page_size)
+    chunks += writer.close()
+    return b"".join(chunks)
+
+
+def rotated_jpeg(orientation):
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    Image.new('RGB', (60, 40), 'red').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def test_image_pdf_writer_output_opens_in_pymupdf():
+    images = [
+        image_bytes('JPEG'),
+        image_bytes('JPEG', mode='L'),
+        image_bytes('JPEG', mode='CMYK'),
+        image_bytes('PNG', mode='RGBA'),
+        image_bytes('PNG', mode='P'),
+        rotated_jpeg(6),
+    ]
+
+    with fitz.open(stream=write_pdf(images), filetype='pdf') as doc:
+        # A wrong xref offset makes PyMuPDF repair the file
+        assert not doc.is_repaired
+        assert len(doc) == len(images)
+        assert [tuple(page.rect)[2:] for page in doc] == [(60, 40)] * 5 + [(40, 60)]
+
+        for page in doc:
+            (xref, *_), = page.get_images()
+            pixmap = fitz.Pixmap(doc, xref)
+            assert (pixmap.width, pixmap.height) == (60, 40)
+
+
+def test_image_pdf_writer_centers_images_on_paper():
+    data = write_pdf([image_bytes('JPEG'), image_bytes('JPEG', size=(40, 60))], page_size='a4')
+
+    with fitz.open(stream=data, filetype='pdf') as doc:
+        assert not doc.is_repaired
+        landscape, portrait = doc
+        assert tuple(portrait.rect)[2:] == pytest.approx(PAGE_SIZES['a4'])
+        assert tuple(landscape.rect)[2:] == pytest.approx(PAGE_SIZES['a4'][::-1])
+
+        for page in doc:
+            box = page.get_image_rects(page.get_images()[0][0])[0]
+            assert box.x0 == pytest.approx(page.rect.width - box.x1)
+            assert box.y0 == pytest.approx(page.rect.height - box.y1)
+            assert min(box.x0, box.y0) == pytest.approx(PAGE_MARGIN)
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from goformate import json_csv
+from goformate.json_csv import JsonRecords, JsonStreamReader
+
+
+class CountingText(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.chars_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.chars_read += len(data)
+        return data
+
+
+def records(text, max_record_chars, ndjson=False):
+    return list(JsonRecords(io.BytesIO(text.encode()), ndjson, max_record_chars))
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    monkeypatch.setattr(json_csv, 'JSON_READ_SIZE', 16)
+
+
+def test_reader_decodes_records_across_reads(small_reads):
+    text = '[{"a": "' + 'x' * 100 + '"}, 12345678901234567890, [1, 2]]'
+
+    assert records(text, 1000) == [{"a": "x" * 100}, 12345678901234567890, [1, 2]]
+
+
+def test_malformed_record_does_not_read_the_rest_of_the_input(small_reads):
+    f = CountingText('[{"a": 1}, {"a": tru}, ' + '{"a": 1}, ' * 100000 + '{"a": 1}]')
+    reader = JsonStreamReader(f, 64)
+
+    items = reader.items()
+    assert next(items) == {"a": 1}
+    with pytest.raises(ValueError, match="64 characters"):
+        next(items)
+
+    assert f.chars_read < 256
+
+
+def test_truncated_input_still_fails(small_reads):
+    with pytest.raises(ValueError):
+        records('[{"a": 1}, {"a": ', 1000)
+
+
+def test_ndjson_lines_are_limited():
+    assert records('{"a": 1}\n\n{"a": 2}\n', 9, ndjson=True) == [{"a": 1}, {"a": 2}]
+
+    with pytest.raises(ValueError, match="over 9 characters"):
+        records('{"a": 1}\n{"a": 22}\n', 9, ndjson=True)
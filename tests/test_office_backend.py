@@ -0,0 +1,33 @@
+import pytest
+
+from goformate.office_backend import SofficePool, check_backend, uno_available
+
+pytestmark = pytest.mark.skipif(uno_available(), reason="needs an interpreter without LibreOffice's uno module")
+
+
+def config(**overrides):
+    return {'OFFICE_BACKEND': 'soffice', 'OFFICE_REQUIRE_WARM_POOL': False, **overrides}
+
+
+def test_cold_cli_pool_reports_its_mode(tmp_path):
+    pool = SofficePool(size=1, profile_folder=str(tmp_path))
+    try:
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert stats["mode"] == "cold-cli"
+    assert stats["warm"] is False
+
+
+def test_cold_cli_is_refused_when_a_warm_pool_is_required(tmp_path):
+    with pytest.raises(Exception, match="OFFICE_REQUIRE_WARM_POOL"):
+        SofficePool(size=1, profile_folder=str(tmp_path), require_warm=True)
+
+    with pytest.raises(Exception, match="OFFICE_REQUIRE_WARM_POOL"):
+        check_backend(config(OFFICE_REQUIRE_WARM_POOL=True))
+
+
+def test_startup_check_warns_about_cold_cli(capsys):
+    check_backend(config())
+    assert "cold CLI mode" in capsys.readouterr().out
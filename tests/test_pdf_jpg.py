@@ -0,0 +1,107 @@
+import io
+import os
+import zipfile
+
+import fitz
+import pytest
+
+from goformate import common
+
+
+def pdf_bytes(pages=2):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((50, 100), f"Page {number + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def post_pdf(client):
+    return client.post('/pdf-jpg', data={
+        'file': (io.BytesIO(pdf_bytes()), 'doc.pdf'),
+        'dpi': '72',
+    }, content_type='multipart/form-data')
+
+
+def test_streamed_zip_has_every_page(app, client):
+    response = post_pdf(client)
+    assert response.status_code == 200
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as zipf:
+        assert len(zipf.namelist()) == 2
+    response.close()
+
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+
+
+def test_upload_is_removed_when_the_stream_never_starts(app, open_stream):
+    # The client went away before the first chunk: the body is closed unread
+    status, body = open_stream('/pdf-jpg', data={'file': (io.BytesIO(pdf_bytes()), 'doc.pdf')})
+    assert status.startswith('200')
+    assert len(os.listdir(app.config['UPLOAD_FOLDER'])) == 1
+
+    body.close()
+
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+
+
+def test_file_mode_saves_the_upload_under_a_unique_name(app, client, monkeypatch):
+    saved = []
+    save_upload = common.save_upload
+    monkeypatch.setattr(common, 'save_upload', lambda file, path: saved.append(path) or save_upload(file, path))
+
+    response = client.post('/pdf-jpg', data={
+        'file': (io.BytesIO(pdf_bytes()), 'doc.pdf'),
+        'mode': 'file',
+        'dpi': '72',
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as zipf:
+        assert zipf.namelist() == ['doc_page_1.jpg', 'doc_page_2.jpg']
+    response.close()
+
+    (path,) = saved
+    assert os.path.basename(path) != 'doc.pdf'
+    assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+
+
+def test_worker_document_is_dropped_when_its_file_goes(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, '_worker_docs', {})
+    path = str(tmp_path / 'doc.pdf')
+
+    with open(path, 'wb') as f:
+        f.write(pdf_bytes(1))
+    first = common.open_worker_document(path)
+    assert common.open_worker_document(path) is first
+
+    # Replaced at the same path: opened again
+    with open(path, 'wb') as f:
+        f.write(pdf_bytes(3))
+    os.utime(path, ns=(0, 0))
+    second = common.open_worker_document(path)
+    assert first.is_closed
+    assert len(second) == 3
+
+    os.remove(path)
+    with pytest.raises(FileNotFoundError):
+        common.open_worker_document(path)
+    assert second.is_closed
+    assert common._worker_docs == {}
+
+
+def test_close_worker_documents_only_closes_the_given_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, '_worker_docs', {})
+    path = str(tmp_path / 'doc.pdf')
+    with open(path, 'wb') as f:
+        f.write(pdf_bytes(1))
+
+    doc = common.open_worker_document(path)
+    common.close_worker_documents(str(tmp_path / 'other.pdf'))
+    assert not doc.is_closed
+
+    common.close_worker_documents(path)
+    assert doc.is_closed
+    assert common._worker_docs == {}